@@ -0,0 +1,230 @@
+"""Micro-benchmarks por etapa del análisis fonológico, con control de regresiones.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_analisis [--combinados 2000] [--repeticiones 5]
+    python -m benchmarks.bench_analisis --guardar-base      # fija la línea base
+    python -m benchmarks.bench_analisis --umbral 0.2        # compara contra ella
+    python -m benchmarks.bench_analisis --por-detector      # desglose de procesos
+
+Sobre el corpus sintético de ``corpus_errores`` (producciones con PSF
+inyectados en las 37 palabras meta) se mide cada etapa por separado:
+  fonemas     texto_a_fonemas sobre lo que tipea el evaluador
+  silabeo     silabear_texto_mejorado sobre la producción transcrita
+  alineacion  alinear(meta, producción)
+  rasgos      comparar_rasgos sobre cada par sustituido de la alineación
+  procesos    analizar_procesos completo (alineación incluida)
+Todas se miden en frío: las cachés se vacían al inicio de cada repetición y el
+corpus no repite entradas. Por etapa se informan operaciones por segundo (mejor
+pasada sin cronometrar cada llamada) y p50/p99 por llamada, descontando el costo
+del propio reloj. Se mide tiempo de CPU, no de pared, para que las pausas que
+impone el sistema (máquinas virtuales, otros procesos) no aparezcan como
+regresiones. Los resultados se escriben en JSON; si existe una línea base, el
+proceso termina con código 1 cuando alguna etapa empeora más que `--umbral`.
+La línea base depende de la máquina: conviene regenerarla en cada equipo.
+
+Con ``--por-detector`` se agrega el tiempo medio de cada detector de PSF sobre
+los pares de la etapa procesos; cada rasgo derivado se carga al primer detector
+que lo pide.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from teprosif import alinear, analizar_procesos, comparar_rasgos, silabear_texto_mejorado, texto_a_fonemas
+from teprosif import fonologia
+from teprosif import detectores
+from teprosif.alineacion import CACHE_ALINEACION
+from teprosif.analisis import CACHE_ANALISIS, CACHE_DIFF
+
+from benchmarks.corpus_errores import generar_corpus
+
+VERSION = 1
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+SALIDA = os.path.join(CARPETA, "resultados_analisis.json")
+BASE = os.path.join(CARPETA, "base_analisis.json")
+
+
+def limpiar_caches():
+    fonologia._transcribir.cache_clear()
+    CACHE_ALINEACION.limpiar()
+    CACHE_ANALISIS.limpiar()
+    CACHE_DIFF.limpiar()
+
+
+def preparar_etapas(corpus):
+    """Argumentos de cada etapa: (nombre, función, lista de tuplas de argumentos)"""
+    textos = sorted({prod.texto for prod in corpus})
+    producciones = sorted({prod.prod_fon for prod in corpus})
+    pares = sorted({(prod.item.meta_fon, prod.prod_fon) for prod in corpus})
+    analisis = sorted({(prod.item.meta_fon, prod.prod_fon, prod.item.num) for prod in corpus})
+
+    rasgos = []
+    for meta, prod in pares:
+        for tag, i1, i2, j1, j2 in alinear(meta, prod).opcodes:
+            if tag == "replace":
+                for k in range(min(i2 - i1, j2 - j1)):
+                    rasgos.append((meta[i1 + k], prod[j1 + k], prod, j1 + k))
+
+    return [
+        ("fonemas", texto_a_fonemas, [(t,) for t in textos]),
+        ("silabeo", silabear_texto_mejorado, [(p,) for p in producciones]),
+        ("alineacion", alinear, pares),
+        ("rasgos", comparar_rasgos, rasgos),
+        ("procesos", analizar_procesos, analisis),
+    ]
+
+
+def _costo_reloj(muestras=20000):
+    reloj = time.thread_time_ns
+    costos = []
+    for _ in range(muestras):
+        inicio = reloj()
+        costos.append(reloj() - inicio)
+    return statistics.median(costos)
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def medir(funcion, argumentos, repeticiones, costo_reloj, minimo=0.1):
+    """ops/s de la mejor pasada completa y latencias por llamada de todas las pasadas"""
+    reloj = time.thread_time_ns
+    mejor, tiempos = None, []
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            duracion, vueltas = 0.0, 0
+            while duracion < minimo:
+                limpiar_caches()
+                inicio = time.process_time()
+                for args in argumentos:
+                    funcion(*args)
+                duracion += time.process_time() - inicio
+                vueltas += 1
+            duracion /= vueltas
+            mejor = duracion if mejor is None else min(mejor, duracion)
+
+            limpiar_caches()
+            for args in argumentos:
+                t0 = reloj()
+                funcion(*args)
+                tiempos.append(max(0, reloj() - t0 - costo_reloj))
+    finally:
+        if gc_activo: gc.enable()
+
+    tiempos.sort()
+    return {
+        "n": len(argumentos),
+        "ops_s": round(len(argumentos) / mejor, 1) if mejor else 0.0,
+        "p50_us": round(_percentil(tiempos, 0.50) / 1000, 3),
+        "p99_us": round(_percentil(tiempos, 0.99) / 1000, 3),
+        "media_us": round(statistics.fmean(tiempos) / 1000, 3),
+    }
+
+
+def medir_detectores(argumentos, repeticiones):
+    """µs medios por par de cada detector (mejor repetición), en frío"""
+    mejores = {}
+    for _ in range(repeticiones):
+        limpiar_caches()
+        tiempos = {}
+        for args in argumentos:
+            detectores.ejecutar(*args, tiempos=tiempos)
+        for nombre, (llamadas, segundos) in tiempos.items():
+            us = round(segundos / llamadas * 1e6, 3)
+            mejores[nombre] = min(mejores.get(nombre, us), us)
+    return mejores
+
+
+def entorno():
+    return {"python": platform.python_version(), "implementacion": platform.python_implementation(),
+            "plataforma": platform.platform(), "procesador": platform.machine()}
+
+
+def comparar(resultado, base, umbral):
+    """Lista de regresiones (texto) de `resultado` respecto de `base`"""
+    regresiones = []
+    for nombre, actual in resultado["etapas"].items():
+        previo = base.get("etapas", {}).get(nombre)
+        if not previo:
+            continue
+        if previo["p50_us"] and actual["p50_us"] > previo["p50_us"] * (1 + umbral):
+            regresiones.append(f"{nombre}: p50 {previo['p50_us']:.2f} → {actual['p50_us']:.2f} µs")
+        if previo["ops_s"] and actual["ops_s"] < previo["ops_s"] * (1 - umbral):
+            regresiones.append(f"{nombre}: {previo['ops_s']:,.0f} → {actual['ops_s']:,.0f} ops/s")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_analisis")
+    parser.add_argument("--combinados", type=int, default=2000, help="producciones con dos PSF en el corpus")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--etapas", nargs="*", help="medir solo estas etapas")
+    parser.add_argument("--salida", default=SALIDA, help="JSON con los resultados de esta corrida")
+    parser.add_argument("--base", default=BASE, help="JSON de la línea base a comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar esta corrida como línea base")
+    parser.add_argument("--umbral", type=float, default=0.20, help="empeoramiento tolerado (0.20 = 20 %%)")
+    parser.add_argument("--por-detector", action="store_true", help="desglosar procesos por detector")
+    args = parser.parse_args(argv)
+
+    corpus = generar_corpus(args.combinados, args.semilla)
+    etapas = todas = preparar_etapas(corpus)
+    if args.etapas:
+        etapas = [e for e in etapas if e[0] in args.etapas]
+    costo_reloj = _costo_reloj()
+
+    resultado = {
+        "version": VERSION, "entorno": entorno(),
+        "corpus": {"producciones": len(corpus), "combinados": args.combinados, "semilla": args.semilla},
+        "etapas": {},
+    }
+    print(f"Corpus: {len(corpus):,} producciones · {args.repeticiones} repeticiones en frío")
+    print(f"  {'etapa':<11} {'n':>7} {'ops/s':>11} {'p50 µs':>9} {'p99 µs':>9}")
+    for nombre, funcion, argumentos in etapas:
+        r = medir(funcion, argumentos, args.repeticiones, costo_reloj)
+        resultado["etapas"][nombre] = r
+        print(f"  {nombre:<11} {r['n']:>7,} {r['ops_s']:>11,.0f} {r['p50_us']:>9.2f} {r['p99_us']:>9.2f}")
+    if args.por_detector:
+        pares = next(a for n, _, a in todas if n == "procesos")
+        resultado["detectores"] = medir_detectores(pares, args.repeticiones)
+        print(f"  {'detector':<22} {'µs/par':>8}")
+        for nombre, us in resultado["detectores"].items():
+            print(f"  {nombre:<22} {us:>8.2f}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.base}")
+        return 0
+
+    if not os.path.exists(args.base):
+        print("Sin línea base (usar --guardar-base para crearla)")
+        return 0
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("version") != VERSION or base.get("corpus") != resultado["corpus"]:
+        print("AVISO: la línea base se midió con otra versión del benchmark o del corpus", file=sys.stderr)
+    if base.get("entorno") != resultado["entorno"]:
+        print("AVISO: la línea base se midió en otro entorno; los tiempos pueden no ser comparables", file=sys.stderr)
+    regresiones = comparar(resultado, base, args.umbral)
+    for texto in regresiones:
+        print(f"REGRESIÓN {texto}", file=sys.stderr)
+    if regresiones:
+        return 1
+    print(f"Sin regresiones mayores al {args.umbral:.0%} respecto de la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Costo de arranque en frío: tiempo de importación y dependencias pesadas cargadas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_arranque [--repeticiones 5]
+
+Cada módulo se importa en un intérprete nuevo con ``python -X importtime`` y se
+toma el mínimo del tiempo acumulado de su importación. También se informa si la
+importación dejó cargado pandas, numpy, altair, fpdf o streamlit, y cuánto
+cuesta importar cada uno de esos por separado (lo que se paga en el primer
+gráfico o el primer informe).
+
+Por último corre el camino de puntuación (``/lote`` del servicio: análisis,
+conteos y diagnóstico) en un intérprete sin site-packages (``python -S``),
+como si ninguna de esas dependencias estuviera instalada. El proceso termina con
+código 1 si algún módulo carga una dependencia pesada o si ese camino falla.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULOS = ("teprosif", "teprosif.lote", "teprosif.informe", "teprosif.grafico", "teprosif.cohorte", "teprosif.servicio")
+PESADAS = ("pandas", "numpy", "altair", "fpdf", "streamlit")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta con `python -S`: sin site-packages, ninguna dependencia pesada existe
+_PUNTUAR_SIN_DEPENDENCIAS = """
+import asyncio, json, sys
+from teprosif import informe, servicio
+assert not informe.fpdf_available
+filas = [
+    {"paciente": "P1", "edad": 4, "modo": "Barrido", "item": "1", "transcripcion": "tasa"},
+    {"paciente": "P1", "edad": 4, "modo": "Barrido", "item": "2", "transcripcion": "pato"},
+    {"paciente": "P1", "edad": 4, "modo": "Barrido", "item": "3", "tipo": "No Responde (NR)"},
+]
+estado, datos = asyncio.run(servicio.RUTAS["/lote"]["POST"](json.dumps({"filas": filas}).encode()))
+assert estado == 200 and len(datos["items"]) == 3 and datos["diagnosticos"], datos
+print(json.dumps(datos["diagnosticos"][0], ensure_ascii=False))
+"""
+
+
+def tiempo_importacion(modulo):
+    """(µs acumulados de `import modulo`, dependencias pesadas que quedaron cargadas)"""
+    codigo = f"import sys, {modulo}; print(','.join(p for p in {PESADAS!r} if p in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                          cwd=RAIZ, capture_output=True, text=True, check=True)
+    acumulado = None
+    for linea in proc.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            acumulado = int(partes[1])
+    return acumulado, [p for p in proc.stdout.strip().split(",") if p]
+
+
+def _mejor(modulo, repeticiones):
+    resultados = [tiempo_importacion(modulo) for _ in range(repeticiones)]
+    return min(t for t, _ in resultados), resultados[0][1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_arranque")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cargan = []
+    print(f"Importación en frío (mínimo de {args.repeticiones} intérpretes nuevos)")
+    for modulo in MODULOS:
+        micros, pesadas = _mejor(modulo, args.repeticiones)
+        if pesadas: cargan.append((modulo, pesadas))
+        print(f"  {modulo:<20}: {micros / 1000:7.1f} ms" + (f"  carga {', '.join(pesadas)}" if pesadas else ""))
+
+    print("Dependencias pesadas (se cargan recién al usarlas)")
+    for paquete in PESADAS:
+        try:
+            micros, _ = _mejor(paquete, args.repeticiones)
+            print(f"  {paquete:<20}: {micros / 1000:7.1f} ms")
+        except subprocess.CalledProcessError:
+            print(f"  {paquete:<20}:  no instalado")
+
+    proc = subprocess.run([sys.executable, "-S", "-c", _PUNTUAR_SIN_DEPENDENCIAS], cwd=RAIZ, capture_output=True, text=True)
+    if proc.returncode:
+        print(f"ERROR: la puntuación falla sin dependencias pesadas:\n{proc.stderr}", file=sys.stderr)
+        return 1
+    print(f"Puntuación sin site-packages: ok ({proc.stdout.strip()})")
+
+    for modulo, pesadas in cargan:
+        print(f"ERROR: importar {modulo} carga {', '.join(pesadas)}", file=sys.stderr)
+    return 1 if cargan else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
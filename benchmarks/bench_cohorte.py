@@ -0,0 +1,123 @@
+"""Tiempo de carga del panel de cohorte sobre una base sintética.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_cohorte [--evaluaciones 50000] [--limite 1.0]
+
+Genera una base SQLite temporal con N evaluaciones de 37 ítems (transcripciones
+con un fonema omitido, como las del benchmark de silabeo) y mide:
+  1. el resumen de una base escrita sin resúmenes (las anteriores a que el
+     almacén los mantuviera; se hace una sola vez),
+  2. la primera carga del panel en un proceso nuevo: lectura de resúmenes a
+     columnas + todas las agregaciones que muestra la página,
+  3. lo que agrega a cada escritura mantener el resumen: guardar una
+     evaluación y anotar un cambio del autoguardado,
+  4. la actualización del panel tras esas escrituras (solo relee esa fila).
+Termina con código 1 si la carga del panel supera `--limite` segundos.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from teprosif import ITEMS_TEST, TIPOS_RESPUESTA, AlmacenSesiones
+from teprosif.cohorte import CacheCohorte
+
+ITEMS = len(ITEMS_TEST)
+
+
+def _variantes(palabra):
+    return [palabra] + [palabra[:k] + palabra[k + 1:] for k in range(len(palabra))]
+
+
+def poblar(ruta, n, semilla=0):
+    """Inserta N evaluaciones sintéticas directamente en la base (sin pasar por guardar)"""
+    rnd = random.Random(semilla)
+    variantes = [_variantes(item.palabra) for item in ITEMS_TEST]
+    hoy = date(2024, 6, 1)
+    AlmacenSesiones(ruta)  # crea el esquema
+    con = sqlite3.connect(ruta)
+    with con:
+        evaluaciones, items = [], []
+        for ev_id in range(1, n + 1):
+            nacimiento = hoy - timedelta(days=rnd.randint(3 * 365, 7 * 365))
+            modo = "Barrido" if rnd.random() < 0.3 else "Completo"
+            evaluaciones.append((ev_id, f"Paciente {ev_id % (n // 2 or 1)}", nacimiento.isoformat(), hoy.isoformat(),
+                                 modo, hoy.isoformat(), ev_id))
+            for i in range(ITEMS):
+                ok = rnd.random() < 0.6
+                tipo = TIPOS_RESPUESTA[0] if rnd.random() < 0.95 else rnd.choice(TIPOS_RESPUESTA[1:])
+                transcripcion = "" if ok else rnd.choice(variantes[i])
+                items.append((ev_id, i, tipo, int(ok), transcripcion,
+                               rnd.randint(0, 2), rnd.randint(0, 1), rnd.randint(0, 1)))
+        con.executemany(
+            "INSERT INTO evaluaciones (id, paciente, fecha_nac, fecha_eval, modo, actualizado, revision) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", evaluaciones)
+        con.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", items)
+    con.close()
+
+
+def cargar_panel(cohorte):
+    """Lo que hace la página al abrirse: actualizar + cada agregación que dibuja"""
+    cohorte.actualizar()
+    for modo in (None, "Completo"):
+        cohorte.prevalencia_procesos(modo=modo)
+        cohorte.prevalencia_procesos(por="banda", modo=modo)
+        cohorte.prevalencia_categorias(por="banda", modo=modo)
+        cohorte.distribucion_diagnosticos(modo=modo)
+        cohorte.distribucion_diagnosticos(por="banda", modo=modo)
+        cohorte.histograma_z(modo=modo)
+
+
+def _cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_cohorte")
+    parser.add_argument("--evaluaciones", type=int, default=50000)
+    parser.add_argument("--limite", type=float, default=1.0, help="segundos máximos para cargar el panel")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "cohorte.db")
+        t_poblar = _cronometrar(poblar, ruta, args.evaluaciones)
+        almacen = AlmacenSesiones(ruta)
+        t_resumen = _cronometrar(CacheCohorte(almacen).actualizar)
+
+        cohorte = CacheCohorte(almacen)
+        t_panel = _cronometrar(cargar_panel, cohorte)
+        t_memo = _cronometrar(cargar_panel, cohorte)
+
+        estados = almacen.cargar(1)
+        estados["e_0"] = estados.get("e_0", 0) + 1
+        t_guardar = _cronometrar(almacen.guardar, estados, 1)
+        t_anotar = _cronometrar(almacen.anotar, 1, {"e_0": estados["e_0"] + 1, "in_0": "pacha"})
+        t_incremental = _cronometrar(cargar_panel, cohorte)
+        # Lo anotado (sin compactar) ya debe verse: la evaluación 1 es la última revisión
+        al_dia = not almacen.sin_resumen(1) and cohorte.evaluaciones.loc[1, "revision"] == cohorte.revision
+
+    print(f"{args.evaluaciones:,} evaluaciones × {ITEMS} ítems (base generada en {t_poblar:.1f} s)")
+    print(f"  base sin resúmenes (una vez)   : {t_resumen:8.2f} s")
+    print(f"  carga del panel (proceso nuevo): {t_panel * 1000:8.1f} ms")
+    print(f"  recarga sin cambios            : {t_memo * 1000:8.1f} ms")
+    print(f"  guardar una evaluación         : {t_guardar * 1000:8.1f} ms (con su resumen)")
+    print(f"  anotar un cambio (autoguardado): {t_anotar * 1000:8.1f} ms (con su resumen)")
+    print(f"  panel tras esas escrituras     : {t_incremental * 1000:8.1f} ms")
+    if not al_dia:
+        print("ERROR: el panel no refleja lo anotado por el autoguardado", file=sys.stderr)
+        return 1
+    if t_panel > args.limite:
+        print(f"ERROR: la carga del panel supera {args.limite:.2f} s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Diagnóstico escalar vs. por lotes: igualdad exacta y velocidad.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_diagnostico [--evaluaciones 200000]
+
+Primero recorre todas las combinaciones de total (0 a 120), edad (0 a 10 años)
+y modo (incluido uno desconocido) y exige que ``diagnosticar_lote`` dé
+exactamente el mismo diagnóstico, color y puntajes Z (E/A/S incluidos) que
+``obtener_diagnostico``. Después mide ambos sobre una cohorte aleatoria.
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from teprosif import diagnosticar_lote, obtener_diagnostico
+
+MODOS = ("Completo", "Barrido", "Otro")
+
+
+def _z_escalar(valor, stats, categoria):
+    if not stats:
+        return None
+    prom, de_val = stats[categoria]
+    return (valor - prom) / de_val
+
+
+def _iguales(z_escalar, z_lote):
+    if z_escalar is None:
+        return math.isnan(z_lote)
+    return z_escalar == z_lote
+
+
+def verificar():
+    """Lista de discrepancias (vacía si el lote coincide con el escalar en toda la grilla)"""
+    casos = [(t, edad, modo, t // 2, t // 3, t - t // 2 - t // 3)
+             for t in range(121) for edad in range(11) for modo in MODOS]
+    totales, edades, modos, e, a, s = (list(c) for c in zip(*casos))
+    lote = diagnosticar_lote(totales, edades, modos, e, a, s)
+    errores = []
+    for k, (t, edad, modo, ve, va, vs) in enumerate(casos):
+        diag, color, _, z, stats = obtener_diagnostico(t, edad, modo)
+        fila = lote.iloc[k]
+        esperado = (diag, color, z, _z_escalar(ve, stats, "E"), _z_escalar(va, stats, "A"), _z_escalar(vs, stats, "S"))
+        obtenido = (fila["diagnostico"], fila["color"], fila["z"], fila["z_e"], fila["z_a"], fila["z_s"])
+        if esperado[:2] != obtenido[:2] or not all(_iguales(x, y) for x, y in zip(esperado[2:], obtenido[2:])):
+            errores.append(((t, edad, modo), esperado, obtenido))
+    # La ruta de columnas categóricas (la que usa CacheCohorte) debe dar lo mismo
+    import pandas as pd
+    columnas = diagnosticar_lote(pd.Series(totales), pd.Series(edades), pd.Series(modos, dtype="category"), e, a, s)
+    if not columnas.equals(lote):
+        errores.append(("columnas categóricas", "≠", "listas"))
+    return errores, len(casos)
+
+
+def _mejor(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_diagnostico")
+    parser.add_argument("--evaluaciones", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    errores, n_casos = verificar()
+    if errores:
+        print(f"ERROR: {len(errores)} de {n_casos} casos difieren, p. ej. {errores[0]}", file=sys.stderr)
+        return 1
+    print(f"{n_casos} combinaciones total/edad/modo: lote idéntico al escalar")
+
+    rnd = random.Random(0)
+    n = args.evaluaciones
+    totales = [rnd.randint(0, 80) for _ in range(n)]
+    edades = [rnd.randint(3, 7) for _ in range(n)]
+    modos = [rnd.choice(MODOS[:2]) for _ in range(n)]
+
+    inicio = time.perf_counter()
+    for t, edad, modo in zip(totales, edades, modos):
+        obtener_diagnostico(t, edad, modo)
+    t_escalar = time.perf_counter() - inicio
+
+    import pandas as pd
+    # Columnas como las de CacheCohorte: enteros y modo categórico
+    cohorte = pd.DataFrame({"total": totales, "anos": edades, "modo": pd.Categorical(modos)})
+
+    t_listas = _mejor(lambda: diagnosticar_lote(totales, edades, modos))
+    t_columnas = _mejor(lambda: diagnosticar_lote(cohorte["total"], cohorte["anos"], cohorte["modo"]))
+
+    print(f"{n:,} evaluaciones")
+    print(f"  escalar (bucle)       : {t_escalar * 1000:8.1f} ms")
+    print(f"  lote desde listas     : {t_listas * 1000:8.1f} ms  ({t_escalar / t_listas:.1f}x)")
+    print(f"  lote desde columnas   : {t_columnas * 1000:8.1f} ms  ({t_escalar / t_columnas:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Informe PDF con plantillas en caché vs. dibujado entero: igualdad y velocidad.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_informe [--informes 200]
+
+``crear_pdf_avanzado`` dibuja la parte fija de cada página (rótulos, bordes,
+grilla de 37 ítems, leyenda) una vez por proceso y luego solo escribe los datos.
+"Sin plantillas" es el camino que se usa cuando fpdf no es la versión probada
+(``con_plantillas = False``): cada informe dibuja la página entera, como antes
+de las plantillas. Primero exige que ambos caminos den exactamente el mismo PDF
+(salvo la fecha de creación) para evaluaciones al azar de los dos modos; después
+mide ms por informe y el pico de memoria de uno. El costo de armar las
+plantillas (una vez por proceso y diseño) se informa aparte.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from teprosif import ITEMS_TEST, TIPOS_RESPUESTA
+from teprosif import informe
+
+STATS = {"Total": (20.5, 8.1), "E": (5.0, 2.0), "A": (3.0, 1.5), "S": (9.0, 4.0)}
+
+
+def evaluacion_azar(rnd, modo):
+    lista = list(ITEMS_TEST) if modo == "Completo" else list(ITEMS_TEST[:15])
+    estados = {}
+    for i in range(len(lista)):
+        estados[f"type_{i}"] = rnd.choice(TIPOS_RESPUESTA) if rnd.random() < 0.1 else "Respuesta Válida"
+        estados[f"ok_{i}"] = rnd.random() < 0.5
+        estados[f"in_{i}"] = rnd.choice(("kasa", "pato", "ñandú", "tío (x)"))
+        for c in "eas": estados[f"{c}_{i}"] = rnd.randint(0, 2)
+    e, a, s = rnd.randint(0, 30), rnd.randint(0, 20), rnd.randint(0, 30)
+    stats = STATS if modo == "Completo" else None
+    return dict(nombre="Paciente de Prueba", fecha_nac="2018-03-04", edad_txt="5 años, 2 meses",
+                fecha_eval="2023-05-06", total=e + a + s, e=e, a=a, s=s, diag="Normal",
+                z_score=(e + a + s - 20.5) / 8.1 if stats else None, modo=modo, stats=stats,
+                lista_items=lista, estados_sesion=estados, observaciones="Sin antecedentes relevantes. " * rnd.randint(0, 8))
+
+
+def _sin_fecha(pdf):
+    return re.sub(rb"/CreationDate \(D:\d+\)", b"", pdf)
+
+
+def sin_plantillas(**datos):
+    clase = informe._clase_pdf()
+    previo, clase.con_plantillas = clase.con_plantillas, False
+    try:
+        return informe.crear_pdf_avanzado(**datos)
+    finally:
+        clase.con_plantillas = previo
+
+
+def verificar(rnd, casos=40):
+    """Casos en que la plantilla en caché da otro PDF que dibujar la página entera"""
+    errores = []
+    for k in range(casos):
+        datos = evaluacion_azar(rnd, ("Completo", "Barrido")[k % 2])
+        if _sin_fecha(informe.crear_pdf_avanzado(**datos)) != _sin_fecha(sin_plantillas(**datos)):
+            errores.append(k)
+    return errores, casos
+
+
+def armar_plantillas(repeticiones=20):
+    """ms de armar las plantillas de un diseño (lo que paga el primer informe de cada proceso)"""
+    lista = list(ITEMS_TEST)
+    tiempos = []
+    for _ in range(repeticiones):
+        informe._PLANTILLAS.clear()
+        inicio = time.perf_counter()
+        informe._plantillas(lista, True)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _tiempos(funcion, evaluaciones):
+    tiempos = []
+    for datos in evaluaciones:
+        inicio = time.perf_counter()
+        funcion(**datos)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return tiempos[0], tiempos[len(tiempos) // 2]
+
+
+def _pico(funcion, datos):
+    tracemalloc.start()
+    funcion(**datos)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_informe")
+    parser.add_argument("--informes", type=int, default=200)
+    args = parser.parse_args(argv)
+    if not informe.fpdf_available:
+        print("Falta FPDF. Instala con: pip install fpdf", file=sys.stderr)
+        return 1
+    if not informe._clase_pdf().con_plantillas:
+        print(f"fpdf no es la versión probada ({informe.FPDF_PROBADA}): las plantillas están desactivadas", file=sys.stderr)
+        return 1
+
+    rnd = random.Random(0)
+    errores, casos = verificar(rnd)
+    if errores:
+        print(f"ERROR: {len(errores)} de {casos} informes difieren entre plantilla y dibujo completo", file=sys.stderr)
+        return 1
+    print(f"{casos} informes: con plantillas, byte a byte igual que sin ellas")
+
+    evaluaciones = [evaluacion_azar(rnd, "Completo") for _ in range(args.informes)]
+    caliente = informe.crear_pdf_avanzado
+    # Intercalados, para que el ruido de la máquina afecte a ambos por igual
+    entero_min = entero_p50 = caliente_min = caliente_p50 = float("inf")
+    for _ in range(3):
+        m, p = _tiempos(sin_plantillas, evaluaciones)
+        entero_min, entero_p50 = min(entero_min, m), min(entero_p50, p)
+        m, p = _tiempos(caliente, evaluaciones)
+        caliente_min, caliente_p50 = min(caliente_min, m), min(caliente_p50, p)
+
+    print(f"{args.informes} informes Completo ({len(ITEMS_TEST)} ítems, con análisis estadístico)")
+    print(f"  sin plantillas (todo)    : mín {entero_min * 1000:6.2f} ms  p50 {entero_p50 * 1000:6.2f} ms"
+          f"  pico {_pico(sin_plantillas, evaluaciones[0]) / 1024:7.1f} KiB")
+    print(f"  con plantillas           : mín {caliente_min * 1000:6.2f} ms  p50 {caliente_p50 * 1000:6.2f} ms"
+          f"  pico {_pico(caliente, evaluaciones[0]) / 1024:7.1f} KiB  ({entero_p50 / caliente_p50:.1f}x)")
+    print(f"  armar las plantillas     : {armar_plantillas() * 1000:6.2f} ms (una vez por proceso y diseño)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Latencia por llamada del silabeo: implementación anterior vs. autómata por tablas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_silabeo [--repeticiones 20]
+
+El corpus son las 37 palabras meta transcritas y todas sus variantes con un
+fonema omitido. Antes de medir se comprueba que ambas versiones silabean igual.
+"""
+
+import argparse
+import sys
+import timeit
+
+from teprosif import ITEMS_TEST, silabear_texto_mejorado, texto_a_fonemas
+
+
+def _silabear_anterior(texto):
+    """Copia literal de la versión previa (listas rearmadas en cada llamada)"""
+    t = texto_a_fonemas(texto) if not all(c in "aeioupcdfghjklmnñbtvwxyzĉɲRyw" for c in texto.lower()) else texto
+    if not t:
+        return []
+
+    excepciones = {
+        "indio": ["in", "dio"], "remedio": ["re", "me", "dio"], "edifisio": ["e", "di", "fi", "sio"],
+        "dinosaurio": ["di", "no", "sau", "rio"], "auto": ["au", "to"], "xaula": ["xau", "la"],
+        "rueda": ["rue", "da"], "peineta": ["pei", "ne", "ta"], "kuaderno": ["kua", "der", "no"],
+        "puente": ["puen", "te"], "guante": ["guan", "te"], "planĉa": ["plan", "ĉa"],
+        "mariposa": ["ma", "ri", "po", "sa"], "bisicleta": ["bi", "si", "cle", "ta"],
+        "helikoptero": ["he", "li", "kop", "te", "ro"], "bufanda": ["bu", "fan", "da"],
+        "kaperusita": ["ka", "pe", "ru", "si", "ta"], "alfombra": ["al", "fom", "bra"],
+        "refrixerador": ["re", "fri", "xe", "ra", "dor"], "kalsetin": ["kal", "se", "tin"],
+        "telefono": ["te", "le", "fo", "no"], "mikro": ["mi", "kro"], "tren": ["tren"],
+        "platano": ["pla", "ta", "no"], "xugo": ["xu", "go"], "enĉufe": ["en", "ĉu", "fe"],
+        "xabon": ["xa", "bon"], "tambor": ["tam", "bor"], "bolantin": ["bo", "lan", "tin"],
+        "xirafa": ["xi", "ra", "fa"], "goRo": ["go", "Ro"], "arbol": ["ar", "bol"],
+        "dulse": ["dul", "se"], "gitaRa": ["gi", "ta", "Ra"], "relox": ["re", "lox"],
+        "pantalon": ["pan", "ta", "lon"], "kamion": ["ka", "mion"],
+    }
+    if t in excepciones:
+        return excepciones[t]
+
+    silabas = []
+    i = 0
+    vocales_fuertes = ['a', 'e', 'o']
+    vocales_debiles = ['i', 'u']
+    vocales = vocales_fuertes + vocales_debiles
+    consonantes = [c for c in "bcdfghjklmnpqrstvwxyzĉɲRyw"]
+    while i < len(t):
+        silaba = ""
+        while i < len(t) and t[i] in consonantes:
+            silaba += t[i]
+            i += 1
+        if i < len(t) and t[i] in vocales:
+            v1 = t[i]
+            silaba += v1
+            i += 1
+            if i < len(t) and t[i] in vocales:
+                v2 = t[i]
+                es_diptongo = False
+                if v1 in vocales_debiles and v2 in vocales_fuertes:
+                    es_diptongo = True
+                elif v1 in vocales_fuertes and v2 in vocales_debiles:
+                    es_diptongo = True
+                elif v1 in vocales_debiles and v2 in vocales_debiles:
+                    es_diptongo = True
+                if v1 == 'i' and v2 == 'o':
+                    es_diptongo = len(silaba) != 2
+                if v1 == 'i' and v2 == 'a':
+                    es_diptongo = len(silaba) != 2
+                if es_diptongo:
+                    silaba += v2
+                    i += 1
+        if i < len(t) and t[i] in consonantes:
+            if i + 1 < len(t):
+                if t[i + 1] in consonantes:
+                    grupo = t[i:i+2]
+                    grupos_iniciales = ['pl', 'bl', 'pr', 'br', 'tr', 'dr', 'kr', 'gr', 'fl', 'kl', 'gl', 'fr']
+                    if grupo not in grupos_iniciales:
+                        silaba += t[i]
+                        i += 1
+            else:
+                silaba += t[i]
+                i += 1
+        if silaba:
+            silabas.append(silaba)
+    return silabas
+
+
+def corpus():
+    """Metas transcritas y cada una con un fonema omitido (producciones típicas)"""
+    textos = []
+    for item in ITEMS_TEST:
+        mf = item.meta_fon
+        textos.append(mf)
+        textos.extend(mf[:k] + mf[k + 1:] for k in range(len(mf)))
+    return textos
+
+
+def medir(funcion, textos, repeticiones):
+    """Mejor latencia media por llamada (µs) entre las repeticiones"""
+    tiempos = timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=repeticiones)
+    return min(tiempos) / len(textos) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_silabeo")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    textos = corpus()
+    distintos = [t for t in textos if _silabear_anterior(t) != silabear_texto_mejorado(t)]
+    if distintos:
+        print(f"ERROR: {len(distintos)} silabeos difieren, p. ej. {distintos[0]!r}", file=sys.stderr)
+        return 1
+
+    antes = medir(_silabear_anterior, textos, args.repeticiones)
+    despues = medir(silabear_texto_mejorado, textos, args.repeticiones)
+    print(f"{len(textos)} textos, mejor de {args.repeticiones} repeticiones")
+    print(f"  anterior : {antes:7.2f} µs/llamada")
+    print(f"  autómata : {despues:7.2f} µs/llamada  ({antes / despues:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Corpus de referencia del analizador: ejemplos de DEFINICIONES + pares etiquetados.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.corpus_dorado [--extra pares.jsonl] [--procesos 4]
+    python -m benchmarks.corpus_dorado --matriz confusion.csv
+    python -m benchmarks.corpus_dorado --aceptar     # registra una salida nueva
+
+Los casos salen de los ejemplos "/meta/ → /producción/" de cada definición
+(etiquetados con su código), de ``pares_dorados.jsonl`` (pares fijados a mano,
+p. ej. metátesis) y, opcionalmente, de otros JSONL con una fila por par:
+``{"meta": "tren", "prod": "ten", "procesos": ["E.1"], "item": "22"}``
+(``item`` es opcional: si la meta es una palabra del test se usa su ítem).
+Cada caso se evalúa con ``analizar_procesos`` en un pool de procesos y se
+informa precisión y exhaustividad por código y una matriz de confusión
+(código esperado × código sugerido).
+
+La salida de cada caso se guarda en ``corpus_dorado.json`` junto con la huella
+de su entrada y la versión de las reglas (``VERSION_REGLAS`` + huella del código
+del analizador). En cada corrida solo se reevalúan los casos cuya entrada o
+versión cambió. Si cambia lo que se sugiere para algún caso sin que haya subido
+``VERSION_REGLAS`` (p. ej. al optimizar), el proceso termina con código 1 y no
+sobrescribe el registro, salvo que se pase ``--aceptar``.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter, defaultdict, namedtuple
+from multiprocessing import Pool
+
+import teprosif
+from teprosif import DEFINICIONES, FONEMAS, ITEMS_TEST, NOMBRES_PROCESOS, analizar_procesos, obtener_item, texto_a_fonemas
+from teprosif.analisis import VERSION_REGLAS
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+REGISTRO = os.path.join(CARPETA, "corpus_dorado.json")
+# Pares etiquetados que siempre forman parte del corpus
+PARES_DORADOS = os.path.join(CARPETA, "pares_dorados.jsonl")
+# Módulos cuyo código decide qué PSF se sugieren
+MODULOS_REGLAS = ("analisis.py", "detectores.py", "alineacion.py", "alfabeto.py", "fonologia.py", "indice.py", "datos.py")
+SIN_PSF = "∅"
+
+Caso = namedtuple("Caso", [
+    "clave",      # identificador estable: "meta → producción"
+    "esperados",  # códigos etiquetados (tupla ordenada)
+    "meta",       # transcripción de la meta
+    "prod",       # transcripción de la producción
+    "item",       # número de ítem (str) o None
+    "origen",     # "DEFINICIONES" o la ruta del archivo extra
+    "error",      # motivo por el que no se puede evaluar, o ""
+])
+
+_EJEMPLO = re.compile(r"/([^/<>]+)/\s*→\s*/([^/<>]+)/")
+_ITEMS_POR_META = {item.meta_fon: item for item in ITEMS_TEST}
+
+
+def _sin_tildes(texto):
+    """Quita los acentos gráficos pero conserva ñ, ĉ y ĵ"""
+    letras = (c for c in unicodedata.normalize("NFD", texto) if unicodedata.category(c) != "Mn" or c in "\u0303\u0302")
+    return unicodedata.normalize("NFC", "".join(letras))
+
+
+def fonemas_ejemplo(texto):
+    """Transcripción de un ejemplo de la guía, escrito en notación fonológica.
+
+    '_' marca el fonema omitido, /j/ es la yod y /ĵ/ la palatal sonora, que el
+    analizador representa como /y/; el resto se transcribe como lo tipea el evaluador.
+    """
+    return texto_a_fonemas(_sin_tildes(texto).replace("_", "").replace("ĵ", "y").replace("j", "y"))
+
+
+def _caso(meta, prod, esperados, origen, item=None, convertir=texto_a_fonemas):
+    meta_fon = texto_a_fonemas(meta.strip())
+    item_obj = obtener_item(item) if item else _ITEMS_POR_META.get(meta_fon)
+    prod_fon = convertir(prod.strip())
+    raros = sorted({c for c in meta_fon + prod_fon if c not in FONEMAS})
+    error = ""
+    if raros:
+        error = f"caracteres sin fonema: {''.join(raros)}"
+    elif not prod_fon or prod_fon == meta_fon:
+        error = "la producción coincide con la meta"
+    desconocidos = [c for c in esperados if c not in NOMBRES_PROCESOS]
+    if desconocidos:
+        error = f"códigos desconocidos: {', '.join(desconocidos)}"
+    return Caso(f"{meta_fon} → {prod_fon}", tuple(sorted(set(esperados))), meta_fon, prod_fon,
+                item_obj.num if item_obj else None, origen, error)
+
+
+def casos_definiciones():
+    """Un caso por cada ejemplo '/meta/ → /producción/' de las definiciones"""
+    casos = []
+    for codigo, texto in DEFINICIONES.items():
+        for meta, prod in _EJEMPLO.findall(texto):
+            casos.append(_caso(meta, prod, [codigo], "DEFINICIONES", convertir=fonemas_ejemplo))
+    return casos
+
+
+def casos_extra(ruta):
+    """Pares etiquetados de un JSONL: meta, prod, procesos (lista o "E.1, S.2") e item opcional"""
+    casos = []
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            fila = json.loads(linea)
+            procesos = fila.get("procesos") or []
+            if isinstance(procesos, str):
+                procesos = [p.strip() for p in procesos.split(",") if p.strip()]
+            item = str(fila["item"]).split(".")[0].strip() if fila.get("item") else None
+            casos.append(_caso(fila["meta"], fila["prod"], procesos, ruta, item))
+    return casos
+
+
+def unir_casos(casos):
+    """Une los casos repetidos (mismo par e ítem) sumando sus etiquetas"""
+    unidos = {}
+    for caso in casos:
+        previo = unidos.get(caso.clave)
+        if previo is None:
+            unidos[caso.clave] = caso
+        else:
+            unidos[caso.clave] = previo._replace(esperados=tuple(sorted(set(previo.esperados) | set(caso.esperados))))
+    return list(unidos.values())
+
+
+# --- Versión de reglas y huellas para la reevaluación incremental ---
+
+def version_reglas():
+    carpeta = os.path.dirname(os.path.abspath(teprosif.__file__))
+    huella = hashlib.sha256()
+    for nombre in MODULOS_REGLAS:
+        with open(os.path.join(carpeta, nombre), "rb") as f:
+            huella.update(f.read())
+    return f"{VERSION_REGLAS}-{huella.hexdigest()[:12]}"
+
+
+def huella_entrada(caso):
+    return hashlib.sha256(json.dumps([caso.meta, caso.prod, caso.item]).encode("utf-8")).hexdigest()[:16]
+
+
+def evaluar_caso(caso):
+    """(clave, códigos sugeridos) de un caso; se ejecuta en los procesos del pool"""
+    return caso.clave, analizar_procesos(caso.meta, caso.prod, caso.item)
+
+
+def leer_registro(ruta):
+    if not os.path.exists(ruta):
+        return {"version": None, "casos": {}}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def evaluar(casos, registro, version, procesos=None):
+    """Sugerencias de cada caso: reutiliza el registro si la entrada y la versión no cambiaron.
+
+    Devuelve (sugerencias {clave: [códigos]}, claves reevaluadas).
+    """
+    previos = registro.get("casos", {})
+    sugerencias, pendientes = {}, []
+    for caso in casos:
+        previo = previos.get(caso.clave)
+        if previo and previo.get("entrada") == huella_entrada(caso) and previo.get("version") == version:
+            sugerencias[caso.clave] = previo["sugeridos"]
+        else:
+            pendientes.append(caso)
+
+    procesos = min(procesos or os.cpu_count() or 1, len(pendientes))
+    if procesos > 1:
+        with Pool(procesos) as pool:
+            resultados = pool.map(evaluar_caso, pendientes, chunksize=max(1, len(pendientes) // (procesos * 4)))
+    else:
+        resultados = map(evaluar_caso, pendientes)
+    for clave, sugeridos in resultados:
+        sugerencias[clave] = list(sugeridos)
+    return sugerencias, [c.clave for c in pendientes]
+
+
+# --- Métricas ---
+
+def metricas(casos, sugerencias):
+    """Precisión/exhaustividad por código y matriz de confusión esperado × sugerido"""
+    vp, fp, fn = Counter(), Counter(), Counter()
+    confusion = defaultdict(Counter)
+    for caso in casos:
+        esperados, sugeridos = set(caso.esperados), set(sugerencias[caso.clave])
+        for cod in esperados & sugeridos: vp[cod] += 1
+        for cod in sugeridos - esperados: fp[cod] += 1
+        for cod in esperados - sugeridos: fn[cod] += 1
+        for esperado in esperados:
+            for sugerido in sugeridos or (SIN_PSF,):
+                confusion[esperado][sugerido] += 1
+
+    por_codigo = {}
+    for cod in NOMBRES_PROCESOS:
+        if vp[cod] or fp[cod] or fn[cod]:
+            por_codigo[cod] = {
+                "vp": vp[cod], "fp": fp[cod], "fn": fn[cod],
+                "precision": vp[cod] / (vp[cod] + fp[cod]) if vp[cod] + fp[cod] else None,
+                "exhaustividad": vp[cod] / (vp[cod] + fn[cod]) if vp[cod] + fn[cod] else None,
+            }
+    total_vp, total_fp, total_fn = sum(vp.values()), sum(fp.values()), sum(fn.values())
+    global_ = {
+        "precision": total_vp / (total_vp + total_fp) if total_vp + total_fp else None,
+        "exhaustividad": total_vp / (total_vp + total_fn) if total_vp + total_fn else None,
+    }
+    return por_codigo, global_, confusion
+
+
+def escribir_matriz(ruta, confusion):
+    columnas = [cod for cod in NOMBRES_PROCESOS if any(cod in fila for fila in confusion.values())] + [SIN_PSF]
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["esperado"] + columnas)
+        for cod in NOMBRES_PROCESOS:
+            if cod in confusion:
+                escritor.writerow([cod] + [confusion[cod][col] for col in columnas])
+
+
+def _porcentaje(valor):
+    return "  —  " if valor is None else f"{valor:5.0%}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus_dorado")
+    parser.add_argument("--extra", action="append", default=[], help="JSONL con pares etiquetados (se puede repetir)")
+    parser.add_argument("--registro", default=REGISTRO, help="salidas registradas por caso")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--matriz", help="CSV donde escribir la matriz de confusión completa")
+    parser.add_argument("--aceptar", action="store_true", help="registrar las salidas aunque cambien sin versión nueva")
+    args = parser.parse_args(argv)
+
+    casos = casos_definiciones()
+    for ruta in [PARES_DORADOS] + args.extra:
+        casos.extend(casos_extra(ruta))
+    casos = unir_casos(casos)
+    omitidos = [c for c in casos if c.error]
+    casos = [c for c in casos if not c.error]
+
+    version = version_reglas()
+    registro = leer_registro(args.registro)
+    sugerencias, reevaluados = evaluar(casos, registro, version, args.procesos)
+
+    # Cambios de salida respecto de lo registrado
+    previos = registro.get("casos", {})
+    cambios = [c for c in casos if c.clave in previos and previos[c.clave]["sugeridos"] != sugerencias[c.clave]]
+    version_previa = str(registro.get("version") or "").split("-")[0]
+    sin_version = bool(cambios) and version_previa == str(VERSION_REGLAS)
+
+    por_codigo, global_, confusion = metricas(casos, sugerencias)
+    print(f"{len(casos)} casos ({len(reevaluados)} reevaluados, versión de reglas {version})")
+    for caso in omitidos:
+        print(f"  omitido {caso.clave} [{caso.origen}]: {caso.error}")
+    print(f"\n  {'código':<6} {'VP':>3} {'FP':>3} {'FN':>3} {'prec.':>6} {'exh.':>6}")
+    for cod, m in por_codigo.items():
+        print(f"  {cod:<6} {m['vp']:>3} {m['fp']:>3} {m['fn']:>3} {_porcentaje(m['precision']):>6} {_porcentaje(m['exhaustividad']):>6}")
+    print(f"  {'total':<6} {'':>11} {_porcentaje(global_['precision']):>6} {_porcentaje(global_['exhaustividad']):>6}")
+
+    print("\nConfusión (esperado → sugeridos):")
+    for cod in NOMBRES_PROCESOS:
+        if cod in confusion:
+            fila = confusion[cod]
+            celdas = " ".join(f"{s}×{n}" for s, n in sorted(fila.items(), key=lambda x: (x[0] != cod, -x[1], x[0])))
+            print(f"  {cod:<5} {celdas}")
+    if args.matriz:
+        escribir_matriz(args.matriz, confusion)
+
+    if cambios:
+        print(f"\n{len(cambios)} casos cambiaron de salida:")
+        for caso in cambios:
+            print(f"  {caso.clave}: {', '.join(previos[caso.clave]['sugeridos']) or SIN_PSF} → {', '.join(sugerencias[caso.clave]) or SIN_PSF}")
+    if sin_version and not args.aceptar:
+        print(f"ERROR: la salida clínica cambió sin subir VERSION_REGLAS ({VERSION_REGLAS}); "
+              "usar --aceptar si el cambio es intencional", file=sys.stderr)
+        return 1
+
+    if reevaluados or set(previos) != {c.clave for c in casos} or registro.get("version") != version:
+        nuevo = {"version": version, "casos": {
+            c.clave: {"entrada": huella_entrada(c), "version": version, "item": c.item,
+                      "esperados": list(c.esperados), "sugeridos": sugerencias[c.clave]}
+            for c in sorted(casos, key=lambda c: c.clave)
+        }}
+        with open(args.registro, "w", encoding="utf-8") as f:
+            json.dump(nuevo, f, indent=1, ensure_ascii=False)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Corpus sintético de producciones con PSF inyectados en las 37 palabras meta.
+
+Cada proceso se aplica sobre la transcripción fonémica de la meta usando el
+registro del ítem (grupos, diptongos, codas, límites silábicos), tal como los
+describe la guía: reducción de grupo, omisión de coda, liquidas sustituidas,
+asimilaciones, etc. Además de todas las variantes con un proceso, se agregan
+combinaciones aleatorias de dos procesos. Cada producción se devuelve también
+escrita en ortografía, que es lo que tipea el evaluador en la interfaz.
+
+    from benchmarks.corpus_errores import generar_corpus
+    for prod in generar_corpus(combinados=2000, semilla=0): ...
+"""
+
+import random
+from collections import namedtuple
+
+from teprosif import ITEMS_TEST, FONEMAS, texto_a_fonemas
+
+Produccion = namedtuple("Produccion", [
+    "item",      # ItemObjetivo de la palabra meta
+    "procesos",  # códigos de los procesos inyectados, en orden de aplicación
+    "prod_fon",  # producción transcrita (lo que recibe el analizador)
+    "texto",     # la misma producción en ortografía
+])
+
+# Sustituciones consonánticas documentadas: código → {fonema meta: fonema producido}
+SUSTITUCIONES = {
+    "S.1": {"s": "h", "f": "h"},                       # aspiración
+    "S.2": {"t": "k", "d": "g", "s": "x"},             # posteriorización
+    "S.3": {"k": "t", "g": "d", "x": "s"},             # frontalización
+    "S.4": {"t": "p", "d": "b", "s": "f"},             # labialización
+    "S.5": {"s": "t", "f": "p", "x": "k"},             # oclusivización
+    "S.6": {"p": "f", "k": "x", "t": "s"},             # fricativización
+    "S.8": {"p": "b", "t": "d", "k": "g"},             # sonorización
+    "S.9": {"b": "p", "d": "t", "g": "k"},             # afonización
+    "S.10": {"l": "y", "r": "y"},                      # semiconsonantización
+    "S.11": {"r": "l", "l": "r", "R": "l"},            # líquida por líquida
+    "S.12": {"r": "d", "R": "d", "l": "d"},            # líquida por no líquida
+    "S.14": {"b": "m", "d": "n"},                      # nasalización
+    "S.15": {"m": "b", "n": "d"},                      # oralización
+    "S.7": {"s": "ĉ"},                                 # africación
+    "S.17": {"ĉ": "s"},                                # desafricación
+    "S.16": {"e": "i", "o": "u"},                      # sustitución vocálica
+}
+
+# Fonema → grafía que texto_a_fonemas vuelve a transcribir igual
+_ORTOGRAFIA = {"ĉ": "ch", "R": "rr", "ɲ": "ñ", "x": "j", "k": "k"}
+
+
+def a_ortografia(fon):
+    """Escribe una transcripción en ortografía ('gi' → 'gui', 'ĉ' → 'ch', ...)"""
+    letras = []
+    for i, c in enumerate(fon):
+        siguiente = fon[i + 1] if i + 1 < len(fon) else ""
+        if c == "g" and siguiente in ("e", "i"):
+            letras.append("gu")
+        else:
+            letras.append(_ORTOGRAFIA.get(c, c))
+    return "".join(letras)
+
+
+def _es_consonante(c):
+    return c in FONEMAS and FONEMAS[c]["modo"] != "vocal"
+
+
+# --- Inyectores: cada uno devuelve todas las variantes posibles de un proceso ---
+
+def _reduccion_grupo(item, fon):
+    return [fon[:pos + 1] + fon[pos + 2:] for pos, _ in item.grupos]
+
+
+def _reduccion_diptongo(item, fon):
+    variantes = []
+    for pos, dip in item.diptongos:
+        debil = pos if dip[0] in "iu" else pos + 1
+        variantes.append(fon[:debil] + fon[debil + 1:])
+    return variantes
+
+
+def _omision_coda(item, fon):
+    return [fon[:pos] + fon[pos + 1:] for pos in item.codas]
+
+
+def _omision_atona(item, fon):
+    if len(item.limites) < 2:
+        return []
+    return [fon[:ini] + fon[fin:] for k, (ini, fin) in enumerate(item.limites) if k != item.tonica]
+
+
+def _adicion(item, fon):
+    # Epéntesis vocálica dentro del grupo: /tren/ → /teren/
+    return [fon[:pos + 1] + fon[pos + 2] + fon[pos + 1:] for pos, _ in item.grupos if pos + 2 < len(fon)]
+
+
+def _inversion(item, fon):
+    # Se intercambian los ataques de dos sílabas seguidas: /gitaRa/ → /tigaRa/
+    variantes = []
+    for (i1, _), (i2, _) in zip(item.limites, item.limites[1:]):
+        if i2 < len(fon) and _es_consonante(fon[i1]) and _es_consonante(fon[i2]) and fon[i1] != fon[i2]:
+            lista = list(fon)
+            lista[i1], lista[i2] = lista[i2], lista[i1]
+            variantes.append("".join(lista))
+    return variantes
+
+
+def _asimilacion(item, fon):
+    # Una consonante copia a otra de la palabra (regresiva y progresiva)
+    posiciones = [i for i, c in enumerate(fon) if _es_consonante(c)]
+    variantes = []
+    for i, j in zip(posiciones, posiciones[1:]):
+        if fon[i] != fon[j]:
+            variantes.append(fon[:i] + fon[j] + fon[i + 1:])
+            variantes.append(fon[:j] + fon[i] + fon[j + 1:])
+    return variantes
+
+
+def _sustitucion(codigo):
+    tabla = SUSTITUCIONES[codigo]
+    def inyectar(item, fon):
+        return [fon[:i] + tabla[c] + fon[i + 1:] for i, c in enumerate(fon) if c in tabla]
+    return inyectar
+
+
+INYECTORES = {
+    "E.1": _reduccion_grupo, "E.2": _reduccion_diptongo, "E.3": _omision_coda,
+    "E.5": _omision_atona, "E.7": _adicion, "E.8": _inversion, "A.1": _asimilacion,
+    **{codigo: _sustitucion(codigo) for codigo in SUSTITUCIONES},
+}
+
+
+def _produccion(item, procesos, fon):
+    texto = a_ortografia(fon)
+    # Lo que analiza la interfaz es la transcripción del texto tipeado
+    return Produccion(item, tuple(procesos), texto_a_fonemas(texto), texto)
+
+
+def generar_corpus(combinados=2000, semilla=0):
+    """Todas las variantes de un proceso por ítem + `combinados` producciones de dos procesos"""
+    rnd = random.Random(semilla)
+    corpus, vistos = [], set()
+
+    def agregar(prod):
+        clave = (prod.item.num, prod.prod_fon)
+        if prod.prod_fon and prod.prod_fon != prod.item.meta_fon and clave not in vistos:
+            vistos.add(clave)
+            corpus.append(prod)
+
+    simples = []
+    for item in ITEMS_TEST:
+        for codigo, inyectar in INYECTORES.items():
+            for fon in inyectar(item, item.meta_fon):
+                simples.append((item, codigo, fon))
+                agregar(_produccion(item, [codigo], fon))
+
+    intentos = 0
+    objetivo = len(corpus) + combinados
+    while len(corpus) < objetivo and intentos < combinados * 20:
+        intentos += 1
+        item, primero, fon = rnd.choice(simples)
+        segundo = rnd.choice(list(INYECTORES))
+        variantes = INYECTORES[segundo](item, fon)
+        if variantes:
+            agregar(_produccion(item, [primero, segundo], rnd.choice(variantes)))
+    return corpus
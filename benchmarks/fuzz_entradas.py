@@ -0,0 +1,117 @@
+"""Fuzz de entradas: ninguna transcripción puede colgar ni romper el análisis.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.fuzz_entradas [--casos 20000] [--semilla 0] [--tope 0.5]
+
+Genera transcripciones al azar con lo que puede llegar desde un formulario o un
+CSV: letras del test, marcas combinantes sueltas, espacios y separadores raros,
+dígitos, puntuación, emoji, texto de derecha a izquierda y caracteres de control.
+Cada una recorre el camino completo de un ítem —``texto_a_fonemas``, silabeo,
+``generar_diff_visual`` y ``analizar_item``— tanto saneada como en crudo (como
+la recibiría alguien que llama al núcleo directamente). Una entrada que al
+sanearla no deja fonemas ("123", "-", "??") no puede sugerir ningún PSF.
+
+Un perro guardián (faulthandler) vuelca la pila y corta el proceso si una sola
+entrada tarda más de ``--colgado`` segundos. Al final se informan el máximo y el
+p99 por entrada; el proceso termina con código 1 si alguna entrada lanzó una
+excepción o superó ``--tope``.
+"""
+
+import argparse
+import faulthandler
+import random
+import sys
+import time
+
+from teprosif import (
+    ITEMS_TEST, analizar_item, generar_diff_visual, limites_silabicos, silabear_texto_mejorado, texto_a_fonemas,
+)
+from teprosif.analisis import LARGO_MAXIMO
+
+from benchmarks.bench_analisis import limpiar_caches
+
+# Alfabetos de los que se sacan los caracteres, con su peso
+_LETRAS = "abcdefghijklmnopqrstuvwxyzáéíóúüñ"
+ALFABETOS = [
+    (_LETRAS, 12),
+    (_LETRAS.upper(), 2),
+    ("\u0301\u0303\u0308\u0300\u0327\u0332", 2),                    # marcas combinantes sueltas
+    (" \t\n\u00a0\u2009\u200b\u200d\u2028\u3000", 2),               # espacios y separadores
+    ("0123456789\u0663", 1),
+    (".,;:¡!¿?-_'\"/()[]*#%&@", 1),
+    ("\U0001f600\U0001f44d\U0001f3fd\U0001f1e6\U0001f1f7", 1),      # emoji y modificadores
+    ("\u05e9\u05dc\u05d5\u0645\u0631\u062d\u202e\u200f", 1),        # derecha a izquierda
+    ("ĉɲßøæœłʃθɾʎ", 1),
+    ("\x00\x07\x1b\x7f\ufeff\ufffd", 1),                            # control y especiales
+]
+
+
+def entrada_azar(rng):
+    largo = rng.choice((rng.randint(0, 12), rng.randint(0, 40), rng.randint(0, 3 * LARGO_MAXIMO)))
+    alfabetos = rng.choices([a for a, _ in ALFABETOS], weights=[p for _, p in ALFABETOS], k=largo)
+    return "".join(rng.choice(a) for a in alfabetos)
+
+
+def recorrer(item, texto):
+    """Camino de un ítem de la interfaz: saneado y en crudo"""
+    pf = texto_a_fonemas(texto)
+    silabear_texto_mejorado(pf)
+    generar_diff_visual(item.meta_fon, pf, item.tonica)
+    sugerencias = analizar_item(item.meta_fon, pf, item.num).sugerencias
+    if not pf and sugerencias:
+        raise AssertionError(f"sin fonemas y con sugerencias {sugerencias}")
+    crudo = texto[:LARGO_MAXIMO]
+    limites_silabicos(crudo)
+    silabear_texto_mejorado(crudo)
+    generar_diff_visual(item.meta_fon, crudo, item.tonica)
+    analizar_item(item.meta_fon, crudo, item.num)
+    analizar_item(crudo, item.meta_fon, "0")
+
+
+def fuzz(casos, semilla, colgado):
+    rng = random.Random(semilla)
+    tiempos, fallos = [], []
+    reloj = time.perf_counter
+    for k in range(casos):
+        item, texto = rng.choice(ITEMS_TEST), entrada_azar(rng)
+        # Las cachés grandes esconderían el costo en frío: se vacían cada tanto
+        if k % 1000 == 0: limpiar_caches()
+        faulthandler.dump_traceback_later(colgado, exit=True)
+        inicio = reloj()
+        try:
+            recorrer(item, texto)
+        except Exception as e:
+            fallos.append((item.num, texto, repr(e)))
+        tiempos.append((reloj() - inicio, texto))
+        faulthandler.cancel_dump_traceback_later()
+    return tiempos, fallos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--tope", type=float, default=0.5, help="segundos máximos por entrada (default 0,5)")
+    parser.add_argument("--colgado", type=float, default=10.0, help="segundos tras los que se aborta el proceso")
+    args = parser.parse_args(argv)
+
+    tiempos, fallos = fuzz(args.casos, args.semilla, args.colgado)
+    ordenados = sorted(tiempos)
+    maximo, peor = ordenados[-1]
+    p99 = ordenados[int(len(ordenados) * 0.99)][0]
+    print(f"{len(tiempos):,} entradas: p99 {p99 * 1000:.2f} ms, máximo {maximo * 1000:.2f} ms ({peor!r})")
+
+    lentas = [t for t in ordenados if t[0] > args.tope]
+    for num, texto, error in fallos[:5]:
+        print(f"EXCEPCIÓN ítem {num} {texto!r}: {error}", file=sys.stderr)
+    for segundos, texto in lentas[-5:]:
+        print(f"LENTA {segundos * 1000:.1f} ms: {texto!r}", file=sys.stderr)
+    if fallos or lentas:
+        print(f"{len(fallos)} excepciones, {len(lentas)} entradas sobre el tope de {args.tope} s", file=sys.stderr)
+        return 1
+    print("Ninguna entrada falló ni superó el tope")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Verifica que TABLA_RASGOS reproduce las reglas de comparar_rasgos en todos los casos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_tabla_rasgos
+
+``comparar_rasgos`` ya no evalúa las reglas en cada llamada: lee la tabla que
+``analisis`` arma al importarse. Este script recorre todas las combinaciones
+de fonema meta, fonema producido y vecinos (cualquier fonema del inventario,
+un carácter desconocido o ninguno, a cada lado) y compara la lectura de la
+tabla —por la API pública con texto y por el camino interno con códigos—
+contra ``comparar_rasgos_original``: copia textual de la función sobre texto y
+el diccionario ``FONEMAS`` que había antes del alfabeto en códigos. La prueba
+no pasa por ``_reglas_rasgos``, la reescritura de esas reglas sobre códigos
+con la que se arma la tabla. Termina con código 1 si encuentra alguna
+diferencia.
+"""
+
+import itertools
+import sys
+import time
+
+from teprosif import FONEMAS, comparar_rasgos
+from teprosif.alfabeto import SIMBOLOS, codificar_par
+from teprosif.analisis import TABLA_RASGOS, _sugerencias_rasgos
+
+DESCONOCIDO = "?"
+
+
+# --- Oráculo: comparar_rasgos tal como estaba antes de la tabla (no modificar) ---
+
+def comparar_rasgos_original(m, p, context_prod=None, idx=0):
+    """Compara rasgos fonológicos entre meta y producción"""
+    if p == "h": return ["S.1"]
+
+    if m not in FONEMAS or p not in FONEMAS: return []
+    fm, fp = FONEMAS[m], FONEMAS[p]
+    sugs = []
+
+    if fm['modo'] == 'vocal' and fp['modo'] == 'vocal':
+        if context_prod:
+            vecinos = []
+            if idx > 0: vecinos.append(context_prod[idx-1]) 
+            if idx < len(context_prod)-1: vecinos.append(context_prod[idx+1])
+            for v in vecinos:
+                if v in FONEMAS and FONEMAS[v]['modo'] == 'vocal':
+                    if fp['zona'] == FONEMAS[v]['zona'] and fp['zona'] != fm['zona']:
+                        sugs.append("A.8"); return sugs
+        sugs.append("S.16"); return sugs
+
+    if context_prod:
+        vecinos = []
+        if idx > 0: vecinos.append(context_prod[idx-1]) 
+        if idx < len(context_prod)-1: vecinos.append(context_prod[idx+1]) 
+        if fp['zona'] == 4: 
+            for v in vecinos:
+                if v in FONEMAS and FONEMAS[v]['zona'] == 4 and FONEMAS[v]['modo'] == 'vocal': 
+                    sugs.append("A.5"); return sugs 
+        if fp['zona'] == 3: 
+             for v in vecinos:
+                if v in FONEMAS and FONEMAS[v]['zona'] == 3 and FONEMAS[v]['modo'] == 'vocal': 
+                    sugs.append("A.4"); return sugs
+
+    if fm['modo'] != fp['modo']:
+        if fm['modo'] == 'fricativa' and fp['modo'] == 'africada': sugs.append("S.7"); return sugs
+        if fm['modo'] == 'africada' and fp['modo'] == 'fricativa': sugs.append("S.17"); return sugs
+        if fm['modo'] == 'fricativa' and fp['modo'] == 'oclusiva': sugs.append("S.5")
+        if fm['modo'] == 'oclusiva' and fp['modo'] == 'fricativa': sugs.append("S.6")
+        if fm['modo'] == 'nasal' and fp['modo'] != 'nasal': sugs.append("S.15")
+        if fm['modo'] != 'nasal' and fp['modo'] == 'nasal': sugs.append("S.14")
+
+    es_liq_m = fm['modo'] == 'liquida'
+    es_liq_p = fp['modo'] == 'liquida'
+    if es_liq_m and not es_liq_p:
+        if p in ["y", "w", "i", "u"]: sugs.append("S.10") 
+        else: sugs.append("S.12")
+        return sugs 
+    if not es_liq_m and es_liq_p: sugs.append("S.13"); return sugs
+    if es_liq_m and es_liq_p and m != p: sugs.append("S.11"); return sugs
+
+    if fm['voz'] != fp['voz']:
+        if fm['voz'] == 1 and fp['voz'] == 0: 
+            sugs.append("S.9")
+        if fm['voz'] == 0 and fp['voz'] == 1: 
+            sugs.append("S.8")
+
+    if fm['zona'] != fp['zona']:
+        if fp['zona'] > fm['zona']: sugs.append("S.2") 
+        if fp['zona'] < fm['zona']: sugs.append("S.3") 
+        if fp['zona'] == 1 and fm['zona'] > 1:
+            if "S.3" in sugs: sugs.remove("S.3")
+            sugs.append("S.4")
+            
+    return sugs
+
+
+def combinaciones():
+    """(meta, producido, vecino izquierdo, vecino derecho); "" = sin vecino"""
+    fonemas = SIMBOLOS + (DESCONOCIDO,)
+    lados = ("",) + fonemas
+    return itertools.product(fonemas, fonemas, lados, lados)
+
+
+def verificar(mostrar=5):
+    diferencias, total = [], 0
+    for m, p, izq, der in combinaciones():
+        total += 1
+        contexto, idx = izq + p + der, len(izq)
+        ref = comparar_rasgos_original(m, p, contexto, idx)
+        publica = comparar_rasgos(m, p, contexto, idx)
+        meta_c, prod_c = codificar_par(m, contexto)
+        interna = list(_sugerencias_rasgos(meta_c[0], prod_c[idx], prod_c, idx))
+        if publica != ref or interna != ref:
+            diferencias.append((m, p, contexto, idx, ref, publica, interna))
+    # Sin contexto las reglas no miran vecinos
+    for m, p in itertools.product(SIMBOLOS + (DESCONOCIDO,), repeat=2):
+        total += 1
+        ref = comparar_rasgos_original(m, p)
+        if comparar_rasgos(m, p) != ref:
+            diferencias.append((m, p, None, 0, ref, comparar_rasgos(m, p), None))
+    for d in diferencias[:mostrar]:
+        print("DIFERENCIA meta=%r prod=%r contexto=%r idx=%d: original %s, tabla %s, códigos %s" % d, file=sys.stderr)
+    return total, diferencias
+
+
+def main():
+    inicio = time.perf_counter()
+    total, diferencias = verificar()
+    distintas = len(set(TABLA_RASGOS))
+    print(f"Tabla: {len(TABLA_RASGOS):,} entradas ({distintas} resultados distintos)")
+    print(f"{total:,} combinaciones verificadas en {time.perf_counter() - inicio:.1f} s")
+    if diferencias:
+        print(f"{len(diferencias):,} combinaciones no coinciden con la función original", file=sys.stderr)
+        return 1
+    print("La tabla coincide con la función original en todas las combinaciones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
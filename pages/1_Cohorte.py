@@ -0,0 +1,87 @@
+import time
+
+import streamlit as st
+
+from teprosif import NOMBRES_PROCESOS, AlmacenSesiones
+from teprosif.cohorte import CacheCohorte, ORDEN_DIAGNOSTICOS
+
+st.set_page_config(page_title="TEPROSIF-R · Cohorte", layout="wide", page_icon="📊")
+
+# ==========================================
+# ANÁLISIS DE COHORTE (TODAS LAS EVALUACIONES GUARDADAS)
+# ==========================================
+
+@st.cache_resource
+def obtener_cohorte():
+    """Caché en columnas compartida por todas las sesiones; cada visita solo trae lo que cambió"""
+    return CacheCohorte(AlmacenSesiones())
+
+cohorte = obtener_cohorte()
+inicio = time.perf_counter()
+releidas = cohorte.actualizar()
+
+st.title("📊 Análisis de Cohorte")
+
+evaluaciones = cohorte.evaluaciones
+if evaluaciones is None or evaluaciones.empty:
+    st.info("Aún no hay evaluaciones guardadas.")
+    st.stop()
+
+c1, c2 = st.columns([1, 3])
+modo_sel = c1.selectbox("Modo", ["Todos", "Completo", "Barrido"])
+modo = None if modo_sel == "Todos" else modo_sel
+
+filtradas = evaluaciones if modo is None else evaluaciones[evaluaciones["modo"] == modo]
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Evaluaciones", f"{len(filtradas):,}")
+m2.metric("Pacientes", f"{filtradas['paciente'].nunique():,}")
+m3.metric("Total PSF promedio", f"{filtradas['total'].mean():.1f}" if len(filtradas) else "—")
+m4.metric("Con Déficit", f"{(filtradas['diagnostico'] == 'DÉFICIT').mean():.0%}" if len(filtradas) else "—")
+
+if filtradas.empty:
+    st.info("No hay evaluaciones en este modo.")
+    st.stop()
+
+# --- PREVALENCIA POR PROCESO ---
+st.header("Prevalencia de PSF por proceso")
+st.caption("Proporción de evaluaciones con al menos un PSF sugerido de cada tipo (análisis automático de las transcripciones).")
+prev = cohorte.prevalencia_procesos(modo=modo)["prevalencia"]
+prev = prev[prev > 0].sort_values(ascending=False)
+if prev.empty:
+    st.info("Ninguna transcripción guardada generó PSF sugeridos.")
+else:
+    prev.index = [f"{cod} {NOMBRES_PROCESOS[cod]}" for cod in prev.index]
+    st.bar_chart(prev, horizontal=True)
+
+st.subheader("Por edad")
+sin_edad = int(filtradas["banda"].isna().sum())
+if sin_edad:
+    st.caption(f"{sin_edad:,} evaluaciones sin fecha de nacimiento o de evaluación válida (p. ej. importadas de JSON) quedan fuera de los cuadros por edad.")
+por_banda = cohorte.prevalencia_procesos(por="banda", modo=modo)
+por_banda = por_banda.loc[:, (por_banda > 0).any()]
+por_banda.index = [f"{b} años" for b in por_banda.index]
+st.dataframe(por_banda.T.style.format("{:.0%}"), use_container_width=True)
+
+st.subheader("Por categoría (E / A / S)")
+st.caption("Proporción de evaluaciones con algún PSF de Estructura, Asimilación o Sustitución según los puntajes registrados.")
+categorias = cohorte.prevalencia_categorias(por="banda", modo=modo)
+categorias.index = [f"{b} años" for b in categorias.index]
+st.bar_chart(categorias, stack=False)
+
+# --- DIAGNÓSTICOS ---
+st.header("Distribución de diagnósticos")
+d1, d2 = st.columns(2)
+d1.bar_chart(cohorte.distribucion_diagnosticos(modo=modo))
+por_edad = cohorte.distribucion_diagnosticos(por="banda", modo=modo)
+por_edad.index = [f"{b} años" for b in por_edad.index]
+d2.bar_chart(por_edad[list(ORDEN_DIAGNOSTICOS)])
+
+# --- PUNTAJES Z ---
+st.header("Puntajes Z (modo Completo)")
+histograma = cohorte.histograma_z(modo=modo)
+if histograma.empty:
+    st.info("Sin puntajes Z: solo el modo Completo tiene normas con media y DE.")
+else:
+    st.bar_chart(histograma, x_label="Puntaje Z (inicio del intervalo de 0,5 DE)", y_label="Evaluaciones")
+
+st.caption(f"{releidas} evaluaciones actualizadas · cargado en {(time.perf_counter() - inicio) * 1000:.0f} ms")
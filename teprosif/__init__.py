@@ -0,0 +1,36 @@
+"""Núcleo de puntuación del TEPROSIF-R, independiente de la interfaz Streamlit.
+
+Este paquete no importa streamlit, pandas, altair ni fpdf: puede usarse desde
+procesos de lote, servicios o pruebas sin levantar la interfaz.
+"""
+
+from .datos import (
+    METADATA_PALABRAS, STATS_DETALLADO, NORMAS_RANGOS, PALABRAS_TEST, FONEMAS,
+    GRUPOS, NOMBRES_PROCESOS, TIPOS_RESPUESTA, PREFIJOS_ITEM, GUIA_PROCEDIMIENTOS,
+    DEFINICIONES,
+)
+from .fonologia import (
+    texto_a_fonemas, textos_a_fonemas, silabear_texto_mejorado, limites_silabicos, sanear_texto,
+)
+from .indice import ItemObjetivo, ITEMS_TEST, INDICE_ITEMS, obtener_item
+from .alineacion import Alineacion, alinear
+from .analisis import (
+    generar_diff_visual, comparar_rasgos, analizar_procesos, analizar_item, contar_por_categoria,
+    estadisticas_cache, Analisis,
+)
+from .diagnostico import calcular_edad_exacta, obtener_diagnostico, diagnosticar_lote
+from .puntaje import AgregadoPuntajes
+from .sesiones import AlmacenSesiones
+from .autoguardado import AutoGuardado
+
+__all__ = [
+    "METADATA_PALABRAS", "STATS_DETALLADO", "NORMAS_RANGOS", "PALABRAS_TEST",
+    "FONEMAS", "GRUPOS", "NOMBRES_PROCESOS", "TIPOS_RESPUESTA", "PREFIJOS_ITEM", "GUIA_PROCEDIMIENTOS", "DEFINICIONES",
+    "texto_a_fonemas", "textos_a_fonemas", "silabear_texto_mejorado", "limites_silabicos", "sanear_texto",
+    "ItemObjetivo", "ITEMS_TEST", "INDICE_ITEMS", "obtener_item",
+    "Alineacion", "alinear",
+    "generar_diff_visual", "comparar_rasgos", "analizar_procesos", "analizar_item", "contar_por_categoria",
+    "estadisticas_cache", "Analisis",
+    "calcular_edad_exacta", "obtener_diagnostico", "diagnosticar_lote", "AgregadoPuntajes",
+    "AlmacenSesiones", "AutoGuardado",
+]
@@ -0,0 +1,72 @@
+"""Fonemas como enteros pequeños y rasgos empaquetados en tablas de bytes.
+
+Cada fonema de FONEMAS recibe un código fijo (su posición en el inventario) y
+sus rasgos se empaquetan en un byte: ``voz | zona << 1 | modo << 4``. Las
+transcripciones se codifican a ``bytes``, de modo que comparar rasgos es leer
+``ZONA[c]``/``MODO[c]``/``VOZ[c]`` por índice y las operaciones sobre la
+secuencia (contar, buscar, traducir a máscaras) no pasan por Unicode (ĉ, ɲ).
+
+Los caracteres que no son fonemas del inventario reciben códigos propios de
+cada par meta/producción (desde 255 hacia abajo), así dos caracteres
+desconocidos distintos nunca se confunden; su modo es ``MODO_DESCONOCIDO``.
+"""
+
+from .datos import FONEMAS
+
+SIMBOLOS = tuple(FONEMAS)
+N_FONEMAS = len(SIMBOLOS)
+CODIGO = {c: k for k, c in enumerate(SIMBOLOS)}
+
+# Modo 0 = carácter fuera del inventario
+MODOS = ("desconocido",) + tuple(dict.fromkeys(f["modo"] for f in FONEMAS.values()))
+MODO_DESCONOCIDO = 0
+MODO_VOCAL = MODOS.index("vocal")
+MODO_LIQUIDA = MODOS.index("liquida")
+MODO_NASAL = MODOS.index("nasal")
+MODO_FRICATIVA = MODOS.index("fricativa")
+MODO_OCLUSIVA = MODOS.index("oclusiva")
+MODO_AFRICADA = MODOS.index("africada")
+
+
+def _empaquetar(rasgos):
+    return rasgos["voz"] | rasgos["zona"] << 1 | MODOS.index(rasgos["modo"]) << 4
+
+# Tabla empaquetada (un byte por código) y sus vistas ya desempaquetadas
+RASGOS = bytes(_empaquetar(FONEMAS[SIMBOLOS[k]]) if k < N_FONEMAS else 0 for k in range(256))
+VOZ = bytes(r & 1 for r in RASGOS)
+ZONA = bytes(r >> 1 & 7 for r in RASGOS)
+MODO = bytes(r >> 4 for r in RASGOS)
+
+# Máscaras para bytes.translate: 1 en los códigos del modo, 0 en el resto
+ES_LIQUIDA = bytes(int(m == MODO_LIQUIDA) for m in MODO)
+ES_NASAL = bytes(int(m == MODO_NASAL) for m in MODO)
+
+_A_CODIGO = str.maketrans({c: chr(k) for k, c in enumerate(SIMBOLOS)})
+_CONOCIDOS = frozenset(SIMBOLOS)
+
+
+def codificar(texto):
+    """Transcripción → bytes de códigos; los caracteres desconocidos se numeran desde 255"""
+    return codificar_par(texto, "")[0]
+
+
+def codificar_par(meta, prod):
+    """Codifica meta y producción con la misma numeración para sus caracteres desconocidos"""
+    if _CONOCIDOS.issuperset(meta) and _CONOCIDOS.issuperset(prod):
+        return meta.translate(_A_CODIGO).encode("latin-1"), prod.translate(_A_CODIGO).encode("latin-1")
+    locales = {}
+    def codigo(c):
+        k = CODIGO.get(c)
+        if k is None:
+            k = locales.get(c)
+            if k is None:
+                k = locales[c] = 255 - len(locales)
+                if k < N_FONEMAS:
+                    raise ValueError("Demasiados caracteres distintos fuera del inventario de fonemas")
+        return k
+    return bytes(codigo(c) for c in meta), bytes(codigo(c) for c in prod)
+
+
+def decodificar(codigos):
+    """Bytes de fonemas conocidos → texto (los códigos desconocidos no tienen símbolo)"""
+    return "".join(SIMBOLOS[k] if k < N_FONEMAS else "?" for k in codigos)
@@ -0,0 +1,183 @@
+"""Alineación fonológica meta ↔ producción, calculada una vez por par y reutilizada.
+
+Es una distancia de edición ponderada: sustituir dos fonemas cuesta menos
+cuanto más rasgos (zona, modo, voz de FONEMAS) comparten, de modo que los
+cambios se emparejan por parecido fonológico y no por posición. Además hay
+una operación de transposición: dos fonemas que cambian de lugar, con hasta
+SEPARACION_MAXIMA fonemas iguales entre ellos (/mariposa/ → /ramiposa/), cuestan
+menos que cualquier par de sustituciones, así que una metátesis no se lee como
+dos sustituciones o asimilaciones. El diff visual y los detectores de
+asimilación/sustitución leen la misma alineación.
+"""
+
+from collections import namedtuple
+
+from .datos import FONEMAS
+from .alfabeto import SIMBOLOS, N_FONEMAS, codificar_par
+from .cache import CacheLRU
+from .perfil import medir
+
+Alineacion = namedtuple("Alineacion", [
+    "meta",     # transcripción meta
+    "prod",     # transcripción producida
+    "pares",    # (i, j) por columna; None en i = inserción, None en j = omisión
+    "opcodes",  # bloques (tag, i1, i2, j1, j2) al estilo de difflib.SequenceMatcher
+    "costo",    # costo total de la alineación
+    "codigos",  # (meta, prod) como bytes del alfabeto, con la numeración del par
+    "transposiciones",  # tramos (i1, i2, j1, j2) cuyos extremos se intercambiaron (metátesis)
+])
+
+COSTO_INDEL = 1.0
+COSTO_DESCONOCIDO = 1.0
+# Por debajo de dos sustituciones cualesquiera (la más barata, entre líquidas, cuesta 0.4)
+COSTO_TRANSPOSICION = 0.5
+# Fonemas iguales que puede haber entre los dos que se intercambian (/telefono/ → /tenefolo/)
+SEPARACION_MAXIMA = 3
+
+
+def _costo_rasgos(a, b):
+    fa, fb = FONEMAS[a], FONEMAS[b]
+    vocal_a, vocal_b = fa['modo'] == 'vocal', fb['modo'] == 'vocal'
+    if vocal_a != vocal_b:
+        # Vocal por consonante: casi tan caro como omitir una e insertar otra
+        return 1.6
+    if vocal_a:
+        return 0.5 + (0.3 if fa['zona'] != fb['zona'] else 0.0)
+    costo = 0.4
+    if fa['zona'] != fb['zona']: costo += 0.3
+    if fa['modo'] != fb['modo']: costo += 0.4
+    if fa['voz'] != fb['voz']: costo += 0.2
+    return costo
+
+# Costos de sustitución entre todos los fonemas del inventario, calculados una vez
+COSTOS_SUSTITUCION = {(a, b): _costo_rasgos(a, b) for a in FONEMAS for b in FONEMAS if a != b}
+
+# Los mismos costos por código (alfabeto): una fila de 256 columnas por fonema conocido.
+# Contra un carácter desconocido cuesta COSTO_DESCONOCIDO; consigo mismo, 0.
+FILAS_COSTOS = tuple(
+    tuple(0.0 if a == b else COSTOS_SUSTITUCION.get((SIMBOLOS[a], SIMBOLOS[b]), COSTO_DESCONOCIDO)
+          if b < N_FONEMAS else COSTO_DESCONOCIDO for b in range(256))
+    for a in range(N_FONEMAS)
+)
+
+
+def _fila_costos(a):
+    if a < N_FONEMAS:
+        return FILAS_COSTOS[a]
+    fila = [COSTO_DESCONOCIDO] * 256
+    fila[a] = 0.0
+    return fila
+
+CACHE_ALINEACION = CacheLRU(maxsize=8192)
+
+
+def costo_sustitucion(a, b):
+    if a == b:
+        return 0.0
+    return COSTOS_SUSTITUCION.get((a, b), COSTO_DESCONOCIDO)
+
+
+def _agrupar(pares):
+    """Convierte las columnas alineadas en bloques equal/replace/delete/insert"""
+    opcodes = []
+    i = j = 0
+    for pi, pj in pares:
+        if pi is None:
+            tag = 'insert'
+        elif pj is None:
+            tag = 'delete'
+        else:
+            tag = 'equal' if pi == pj else 'replace'
+        i2 = i + (pi is not None)
+        j2 = j + (pj is not None)
+        if opcodes and opcodes[-1][0] == tag:
+            opcodes[-1][2] = i2
+            opcodes[-1][4] = j2
+        else:
+            opcodes.append([tag, i, i2, j, j2])
+        i, j = i2, j2
+    return tuple(tuple(op) for op in opcodes)
+
+
+def _transposiciones(meta, prod):
+    """{i: {j: largo}} de los tramos meta[i-largo:i] ↔ prod[j-largo:j] con los extremos intercambiados"""
+    # Se buscan antes de llenar la matriz: la mayoría de las filas no tiene ninguno
+    posiciones = {}
+    for j, c in enumerate(prod, 1):
+        if c in posiciones: posiciones[c].append(j)
+        else: posiciones[c] = [j]
+    tramos = {}
+    for i in range(2, len(meta) + 1):
+        a = meta[i - 1]
+        if a not in posiciones:
+            continue
+        for largo in range(2, min(i, SEPARACION_MAXIMA + 2) + 1):
+            b = meta[i - largo]
+            if b == a or b not in posiciones:
+                continue
+            for j in posiciones[b]:
+                if j >= largo and prod[j - largo] == a and meta[i - largo + 1:i - 1] == prod[j - largo + 1:j - 1]:
+                    tramos.setdefault(i, {}).setdefault(j, largo)
+    return tramos
+
+
+def _alinear(meta_txt, prod_txt):
+    # Se alinean los códigos enteros: los costos se leen por índice, sin pares de texto
+    meta, prod = codificar_par(meta_txt, prod_txt)
+    n, m = len(meta), len(prod)
+    # Matriz de costos acumulados (programación dinámica clásica de Needleman-Wunsch)
+    d = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        d[i][0] = i * COSTO_INDEL
+    for j in range(1, m + 1):
+        d[0][j] = j * COSTO_INDEL
+    filas_costos = [_fila_costos(a) for a in meta]
+    tramos = _transposiciones(meta, prod)
+    for i in range(1, n + 1):
+        costos = filas_costos[i - 1]
+        fila, previa = d[i], d[i - 1]
+        for j in range(1, m + 1):
+            fila[j] = min(
+                previa[j - 1] + costos[prod[j - 1]],
+                previa[j] + COSTO_INDEL,
+                fila[j - 1] + COSTO_INDEL,
+            )
+        # Un tramo transpuesto que abarata su celda abarata también, por inserción,
+        # las siguientes de la fila mientras el costo siga bajando
+        if i not in tramos:
+            continue
+        for j, largo in sorted(tramos[i].items()):
+            costo = d[i - largo][j - largo] + COSTO_TRANSPOSICION
+            while j <= m and costo < fila[j]:
+                fila[j] = costo
+                j += 1; costo += COSTO_INDEL
+
+    # Recorrido inverso; en empate se prefiere transponer, emparejar, luego omitir, luego insertar
+    pares, transposiciones = [], []
+    i, j = n, m
+    while i > 0 or j > 0:
+        largo = tramos[i].get(j) if i in tramos else None
+        if largo and d[i][j] == d[i - largo][j - largo] + COSTO_TRANSPOSICION:
+            transposiciones.append((i - largo, i, j - largo, j))
+            for _ in range(largo):
+                i -= 1; j -= 1
+                pares.append((i, j))
+        elif i > 0 and j > 0 and d[i][j] == d[i - 1][j - 1] + filas_costos[i - 1][prod[j - 1]]:
+            i -= 1; j -= 1
+            pares.append((i, j))
+        elif i > 0 and d[i][j] == d[i - 1][j] + COSTO_INDEL:
+            i -= 1
+            pares.append((i, None))
+        else:
+            j -= 1
+            pares.append((None, j))
+    pares.reverse()
+    columnas = tuple((meta[i] if i is not None else None, prod[j] if j is not None else None) for i, j in pares)
+    return Alineacion(meta_txt, prod_txt, tuple(pares), _agrupar(columnas), d[n][m], (meta, prod),
+                      tuple(reversed(transposiciones)))
+
+
+@medir("alineacion")
+def alinear(meta, prod):
+    """Alineación (memoizada) entre la transcripción meta y la producida"""
+    return CACHE_ALINEACION.obtener((meta, prod), lambda: _alinear(meta, prod))
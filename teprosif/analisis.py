@@ -0,0 +1,389 @@
+"""Detección de procesos de simplificación fonológica (PSF)."""
+
+import time
+from collections import namedtuple
+
+from .datos import GRUPOS
+from .alfabeto import (
+    CODIGO, N_FONEMAS, ZONA, MODO, VOZ, ES_LIQUIDA, ES_NASAL,
+    MODO_VOCAL, MODO_LIQUIDA, MODO_NASAL, MODO_FRICATIVA, MODO_OCLUSIVA, MODO_AFRICADA,
+)
+from .fonologia import _transcribir
+from .indice import DIFONOS
+from .cache import CacheLRU
+from .alineacion import CACHE_ALINEACION, alinear
+from .perfil import medir
+from .detectores import PresupuestoAgotado, detector, ejecutar, seleccionar
+
+# Cachés compartidas por todas las sesiones del proceso: las producciones infantiles
+# se repiten mucho entre pacientes (p. ej. "ten" por "tren")
+CACHE_DIFF = CacheLRU(maxsize=8192)
+CACHE_ANALISIS = CacheLRU(maxsize=8192)
+
+# Versión de las reglas de detección: subirla solo cuando se cambia a propósito
+# qué PSF se sugieren. El corpus de referencia (benchmarks/corpus_dorado.py)
+# rechaza cambios de salida que no vengan acompañados de una versión nueva.
+VERSION_REGLAS = 2
+
+# Topes de analizar_item: ningún ítem puede dejar colgada una sesión o un proceso de lote.
+# Una producción infantil real ronda los 4-14 fonemas; la más larga del test tiene 12.
+PRESUPUESTO_ITEM = 0.25  # segundos
+LARGO_MAXIMO = 64        # fonemas de meta o producción
+AVISO_SIN_FONEMAS = "La transcripción no contiene fonemas transcribibles (solo dígitos, signos o símbolos): no se analiza."
+
+Analisis = namedtuple("Analisis", [
+    "sugerencias",  # códigos de PSF sugeridos (parciales si completo es False)
+    "completo",     # False si se cortó por tiempo o por largo
+    "aviso",        # texto para el evaluador cuando no está completo, o None
+])
+
+
+@medir("diff")
+def generar_diff_visual(meta_fon, prod_fon, idx_tonic):
+    """
+    Genera HTML con diff visual carácter por carácter
+    Rojo = omitido, Verde = agregado, Amarillo = cambiado
+    """
+    # El HTML no depende de la sílaba tónica: la clave es solo el par de transcripciones
+    return CACHE_DIFF.obtener((meta_fon, prod_fon), lambda: _generar_diff_visual(meta_fon, prod_fon))
+
+def _generar_diff_visual(meta_fon, prod_fon):
+    # Diff a nivel de fonemas sobre la alineación compartida con el analizador
+    opcodes = alinear(meta_fon, prod_fon).opcodes
+    
+    # META con resaltado
+    meta_html = ""
+    for tag, i1, i2, j1, j2 in opcodes:
+        segmento = meta_fon[i1:i2]
+        if tag == 'equal':
+            meta_html += f'<span class="diff-equal">{segmento}</span>'
+        elif tag == 'delete':
+            meta_html += f'<span class="diff-deleted">{segmento}</span>'
+        elif tag == 'replace':
+            meta_html += f'<span class="diff-changed">{segmento}</span>'
+    
+    # PRODUCCIÓN con resaltado
+    prod_html = ""
+    for tag, i1, i2, j1, j2 in opcodes:
+        segmento_prod = prod_fon[j1:j2]
+        if tag == 'equal':
+            prod_html += f'<span class="diff-equal">{segmento_prod}</span>'
+        elif tag == 'insert':
+            prod_html += f'<span class="diff-added">{segmento_prod}</span>'
+        elif tag == 'replace':
+            prod_html += f'<span class="diff-changed">{segmento_prod}</span>'
+    
+    return meta_html, prod_html
+
+def comparar_rasgos(m, p, context_prod=None, idx=0):
+    """Compara rasgos fonológicos entre meta y producción"""
+    if p == "h": return ["S.1"]
+    cm, cp = CODIGO.get(m), CODIGO.get(p)
+    if cm is None or cp is None: return []
+    vocales = 0
+    if context_prod:
+        if idx > 0: vocales = _ZONA_VOCAL[CODIGO.get(context_prod[idx-1], _FUERA)]
+        if idx < len(context_prod)-1: vocales |= _ZONA_VOCAL[CODIGO.get(context_prod[idx+1], _FUERA)]
+    return list(TABLA_RASGOS[(cm * N_FONEMAS + cp) << 1 | (vocales >> ZONA[cp] & 1)])
+
+def _sugerencias_rasgos(m, p, prod, idx):
+    """comparar_rasgos sobre códigos: `prod` son los bytes de la producción"""
+    if p >= N_FONEMAS: return ()
+    if m >= N_FONEMAS: return _SOLO_H if p == _H else ()
+    vocales = 0
+    if idx > 0: vocales = _ZONA_VOCAL[prod[idx-1]]
+    if idx < len(prod)-1: vocales |= _ZONA_VOCAL[prod[idx+1]]
+    return TABLA_RASGOS[(m * N_FONEMAS + p) << 1 | (vocales >> ZONA[p] & 1)]
+
+_H = CODIGO["h"]
+_SOLO_H = ("S.1",)
+_FUERA = 255  # código de cualquier carácter fuera del inventario (modo y zona 0)
+_SEMICONSONANTES = frozenset(CODIGO[c] for c in ("y", "w", "i", "u"))
+# Bit de la zona de cada vocal (0 para consonantes y desconocidos)
+_ZONA_VOCAL = bytes(1 << ZONA[c] if MODO[c] == MODO_VOCAL else 0 for c in range(256))
+
+def _reglas_rasgos(m, p, vecinos):
+    """Reglas de comparar_rasgos sobre códigos; `vecinos`: códigos a ambos lados de p.
+
+    Es la referencia de TABLA_RASGOS: cualquier cambio de criterio se hace aquí
+    y la tabla se regenera sola al importar el módulo.
+    """
+    if p == _H: return ["S.1"]
+    if m >= N_FONEMAS or p >= N_FONEMAS: return []
+    zm, zp, mm, mp = ZONA[m], ZONA[p], MODO[m], MODO[p]
+    sugs = []
+
+    if mm == MODO_VOCAL and mp == MODO_VOCAL:
+        for v in vecinos:
+            if MODO[v] == MODO_VOCAL:
+                if zp == ZONA[v] and zp != zm:
+                    sugs.append("A.8"); return sugs
+        sugs.append("S.16"); return sugs
+
+    if zp == 4: 
+        for v in vecinos:
+            if ZONA[v] == 4 and MODO[v] == MODO_VOCAL: 
+                sugs.append("A.5"); return sugs 
+    if zp == 3: 
+        for v in vecinos:
+            if ZONA[v] == 3 and MODO[v] == MODO_VOCAL: 
+                sugs.append("A.4"); return sugs
+
+    if mm != mp:
+        if mm == MODO_FRICATIVA and mp == MODO_AFRICADA: sugs.append("S.7"); return sugs
+        if mm == MODO_AFRICADA and mp == MODO_FRICATIVA: sugs.append("S.17"); return sugs
+        if mm == MODO_FRICATIVA and mp == MODO_OCLUSIVA: sugs.append("S.5")
+        if mm == MODO_OCLUSIVA and mp == MODO_FRICATIVA: sugs.append("S.6")
+        if mm == MODO_NASAL and mp != MODO_NASAL: sugs.append("S.15")
+        if mm != MODO_NASAL and mp == MODO_NASAL: sugs.append("S.14")
+
+    es_liq_m = mm == MODO_LIQUIDA
+    es_liq_p = mp == MODO_LIQUIDA
+    if es_liq_m and not es_liq_p:
+        if p in _SEMICONSONANTES: sugs.append("S.10") 
+        else: sugs.append("S.12")
+        return sugs 
+    if not es_liq_m and es_liq_p: sugs.append("S.13"); return sugs
+    if es_liq_m and es_liq_p and m != p: sugs.append("S.11"); return sugs
+
+    vm, vp = VOZ[m], VOZ[p]
+    if vm != vp:
+        if vm == 1 and vp == 0: 
+            sugs.append("S.9")
+        if vm == 0 and vp == 1: 
+            sugs.append("S.8")
+
+    if zm != zp:
+        if zp > zm: sugs.append("S.2") 
+        if zp < zm: sugs.append("S.3") 
+        if zp == 1 and zm > 1:
+            if "S.3" in sugs: sugs.remove("S.3")
+            sugs.append("S.4")
+            
+    return sugs
+
+def _tabla_rasgos():
+    """Sugerencias de _reglas_rasgos para cada (meta, producción, ¿vocal vecina en la zona de p?)
+
+    De los vecinos, las reglas solo miran si alguno es una vocal de la misma
+    zona que p, así que basta una vocal representativa por zona. La tabla se
+    verifica contra las reglas con todos los vecinos posibles en
+    benchmarks/verificar_tabla_rasgos.py.
+    """
+    vocal_de_zona = {}
+    for c in range(N_FONEMAS):
+        if MODO[c] == MODO_VOCAL: vocal_de_zona.setdefault(ZONA[c], c)
+    tabla = []
+    for m in range(N_FONEMAS):
+        for p in range(N_FONEMAS):
+            v = vocal_de_zona.get(ZONA[p])
+            tabla.append(tuple(_reglas_rasgos(m, p, ())))
+            tabla.append(tuple(_reglas_rasgos(m, p, (v,) if v is not None else ())))
+    return tuple(tabla)
+
+# Índice: (meta * N_FONEMAS + producción) * 2 + (1 si una vocal vecina comparte la zona de p)
+TABLA_RASGOS = _tabla_rasgos()
+
+@medir("procesos")
+def analizar_procesos(meta, prod, num_item, detectores=None, limite=None):
+    """Análisis MEJORADO de PSF (memoizado por ítem, meta, producción y detectores activos)
+
+    `detectores`: nombres de los detectores a correr (ver ``detectores.DETECTORES``);
+    None corre todos. `limite`: instante (time.perf_counter) tras el cual se corta
+    con PresupuestoAgotado; un análisis cortado no queda en la caché.
+    """
+    if detectores is None:
+        clave = (str(num_item), meta, prod)
+    else:
+        detectores = seleccionar(detectores)
+        clave = (str(num_item), meta, prod, detectores.nombres)
+    return list(CACHE_ANALISIS.obtener(clave, lambda: tuple(ejecutar(meta, prod, num_item, detectores, limite=limite))))
+
+def analizar_item(meta, prod, num_item, presupuesto=PRESUPUESTO_ITEM, detectores=None):
+    """analizar_procesos con tope de largo y de tiempo (`presupuesto` en segundos, None = sin tope).
+
+    Nunca bloquea al llamador: si la producción es demasiado larga o se acaba el
+    tiempo, devuelve lo sugerido hasta ese momento con completo=False y un aviso.
+    Una producción vacía viene de una transcripción sin fonemas ("123", "-", "??"):
+    no es una omisión del niño, así que no se analiza ni suma puntos.
+    """
+    if not prod:
+        return Analisis([], False, AVISO_SIN_FONEMAS)
+    if len(meta) > LARGO_MAXIMO or len(prod) > LARGO_MAXIMO:
+        return Analisis([], False, f"La transcripción es demasiado larga para analizarla ({len(prod)} fonemas; máximo {LARGO_MAXIMO}).")
+    limite = time.perf_counter() + presupuesto if presupuesto is not None else None
+    try:
+        return Analisis(analizar_procesos(meta, prod, num_item, detectores, limite), True, None)
+    except PresupuestoAgotado as e:
+        return Analisis(e.parciales, False, f"Análisis incompleto: se agotó el tiempo ({presupuesto * 1000:.0f} ms) "
+                                            f"antes de «{e.etapa}»; pueden faltar sugerencias.")
+
+# ==========================================
+# DETECTORES (el orden de registro es el orden de la salida)
+# ==========================================
+
+# E.1 - REDUCCIÓN GRUPO CONSONÁNTICO
+@detector("grupos", produce=("E.1",), necesita=("meta", "prod", "item", "meta_indexada"))
+def _reduccion_grupo(meta, prod, item, meta_indexada):
+    if meta_indexada:
+        for _, d in item.grupos:
+            if d not in prod: return _E1
+        return ()
+    for d in DIFONOS:
+        if d in meta and d not in prod: return _E1
+    return ()
+
+# E.3 - OMISIÓN CODA
+@detector("codas", produce=("E.3",), necesita=("n_codas_meta", "n_codas_prod"))
+def _omision_coda(n_codas_meta, n_codas_prod):
+    return _E3 if n_codas_meta > n_codas_prod else ()
+
+# E.5 - OMISIÓN ELEMENTOS ÁTONOS (E.6 si se omite la sílaba tónica)
+@detector("atonos", produce=("E.6", "E.5"), necesita=("prod", "item", "silabas_meta", "silabas_prod", "nucleos_meta"))
+def _omision_atonos(prod, item, silabas_meta, silabas_prod, nucleos_meta):
+    num_omisiones = len(silabas_meta) - len(silabas_prod)
+    if num_omisiones <= 0:
+        return ()
+    sugs = []
+    if item:
+        nucleo_tonico = nucleos_meta[item.tonica]
+        if nucleo_tonico not in prod:
+            sugs.append("E.6")
+            num_omisiones -= 1
+    if num_omisiones > 0:
+        sugs.append("E.5")
+    return sugs
+
+# E.4 - COALESCENCIA
+@detector("coalescencia", produce=("E.4",), necesita=("meta", "prod"))
+def _coalescencia(meta, prod):
+    i_meta = 0
+    i_prod = 0
+    while i_meta < len(meta) and i_prod < len(prod):
+        if meta[i_meta] != prod[i_prod] and i_meta + 1 < len(meta):
+            if meta[i_meta:i_meta+2] not in prod:
+                return _E4
+        i_meta += 1
+        i_prod += 1
+    return ()
+
+# E.8 - INVERSIÓN/METÁTESIS
+@detector("metatesis", produce=("E.8",), necesita=("meta", "prod", "silabas_meta", "silabas_prod", "nucleos_meta", "nucleos_prod", "alineacion"))
+def _metatesis(meta, prod, silabas_meta, silabas_prod, nucleos_meta, nucleos_prod, alineacion):
+    # La alineación encontró dos fonemas intercambiados, aunque haya otros procesos en el par
+    if alineacion.transposiciones:
+        return _E8
+    if len(silabas_meta) >= 2 and len(silabas_prod) >= 2:
+        for i in range(min(len(silabas_meta), len(silabas_prod)) - 1):
+            if nucleos_meta[i] == nucleos_prod[i+1] and nucleos_meta[i+1] == nucleos_prod[i]:
+                return _E8
+    if len(meta) == len(prod) and meta != prod and sorted(meta) == sorted(prod):
+        return _E8
+    return ()
+
+# E.2 - REDUCCIÓN DIPTONGO
+@detector("diptongos", produce=("E.2",), necesita=("meta", "prod", "item", "meta_indexada"))
+def _reduccion_diptongo(meta, prod, item, meta_indexada):
+    diptongos_meta = [d for _, d in item.diptongos] if meta_indexada else GRUPOS["diptongos"]
+    for dip in diptongos_meta:
+        if dip in meta and dip not in prod:
+            v1, v2 = dip[0], dip[1]
+            if (v1 in prod and v2 not in prod) or (v2 in prod and v1 not in prod):
+                return _E2
+    return ()
+
+# E.7 - ADICIÓN
+@detector("adicion", produce=("E.7",), necesita=("meta", "prod"))
+def _adicion(meta, prod):
+    return _E7 if len(prod) > len(meta) else ()
+
+# A.9 - ASIMILACIÓN SILÁBICA (solo con la meta de un ítem del test)
+@detector("asimilacion_silabica", produce=("A.9",), necesita=("item", "silabas_prod"))
+def _asimilacion_silabica(item, silabas_prod):
+    if len(silabas_prod) >= 2 and silabas_prod[0] == silabas_prod[1]:
+        if item and len(item.silabas) >= 2 and item.silabas[0] != item.silabas[1]:
+            return _A9
+    return ()
+
+# ASIMILACIÓN Y SUSTITUCIÓN
+@detector("sustituciones", produce=("A.1", "A.2", "A.3", "A.4", "A.5", "A.6", "A.7", "A.8") + tuple(f"S.{k}" for k in range(1, 18)),
+          necesita=("alineacion",))
+def _sustituciones(alineacion):
+    # Los bloques 'replace' de la alineación tienen igual largo en meta y producción:
+    # cada posición empareja fonemas alineados por parecido de rasgos.
+    # Se trabaja sobre los códigos del alfabeto: rasgos por índice, conteos sobre bytes
+    meta_c, prod_c = alineacion.codigos
+    # Los fonemas intercambiados de una metátesis ya los cubre E.8: no son sustituciones
+    transpuestos = {i for t1, t2, _, _ in alineacion.transposiciones for i in (t1, t2 - 1)}
+    procesos_detectados = []
+    for tag, i1, i2, j1, j2 in alineacion.opcodes:
+        if tag != 'replace':
+            continue
+        segmento_meta = meta_c[i1:i2]
+        segmento_prod = prod_c[j1:j2]
+
+        max_len = max(len(segmento_meta), len(segmento_prod))
+        for idx_seg in range(max_len):
+            m = segmento_meta[idx_seg] if idx_seg < len(segmento_meta) else None
+            p = segmento_prod[idx_seg] if idx_seg < len(segmento_prod) else None
+
+            if m is None or p is None or m == p or i1 + idx_seg in transpuestos:
+                continue
+
+            es_asimilacion = False
+            if p in meta_c:
+                es_asimilacion = True
+            if prod_c.count(p) > 1 and meta_c.count(p) < prod_c.count(p):
+                es_asimilacion = True
+
+            if es_asimilacion:
+                # Los desconocidos tienen modo 0 y zona 0: no son vocales ni suman A.2-A.5
+                if MODO[p] != MODO_VOCAL:
+                    procesos_detectados.append("A.1")
+
+                zp = ZONA[p]
+                if zp == 1: procesos_detectados.append("A.2")
+                if zp == 2: procesos_detectados.append("A.3")
+                if zp == 3: procesos_detectados.append("A.4")
+                if zp == 4: procesos_detectados.append("A.5")
+
+                if MODO[p] == MODO_LIQUIDA and MODO[m] != MODO_LIQUIDA:
+                    # ¿Hay en la producción otra líquida distinta de p?
+                    hay_otra_liq = prod_c.translate(ES_LIQUIDA).count(1) > prod_c.count(p)
+                    if hay_otra_liq:
+                        procesos_detectados.append("A.6")
+                    else:
+                        procesos_detectados.append("S.13")
+
+                if MODO[p] == MODO_NASAL and MODO[m] != MODO_NASAL:
+                    hay_otra_nas = prod_c.translate(ES_NASAL).count(1) > prod_c.count(p)
+                    if hay_otra_nas:
+                        procesos_detectados.append("A.7")
+                    else:
+                        procesos_detectados.append("S.14")
+            else:
+                current_idx = j1 + idx_seg if idx_seg < len(segmento_prod) else j1
+                procesos_detectados.extend(_sugerencias_rasgos(m, p, prod_c, current_idx))
+    return procesos_detectados
+
+_E1, _E2, _E3, _E4, _E7, _E8, _A9 = ("E.1",), ("E.2",), ("E.3",), ("E.4",), ("E.7",), ("E.8",), ("A.9",)
+
+def estadisticas_cache():
+    """Aciertos, fallos y desalojos de las cachés de análisis del proceso"""
+    info = _transcribir.cache_info()
+    consultas = info.hits + info.misses
+    return {
+        "fonemas": {"entradas": info.currsize, "maximo": info.maxsize, "aciertos": info.hits, "fallos": info.misses,
+                    "desalojos": None, "tasa_aciertos": info.hits / consultas if consultas else 0.0},
+        "alineacion": CACHE_ALINEACION.estadisticas(),
+        "diff": CACHE_DIFF.estadisticas(), "analisis": CACHE_ANALISIS.estadisticas(),
+    }
+
+def contar_por_categoria(codigos):
+    """Cuenta los códigos de PSF de Estructura, Asimilación y Sustitución"""
+    e = a = s = 0
+    for cod in codigos:
+        if cod.startswith("E."): e += 1
+        elif cod.startswith("A."): a += 1
+        elif cod.startswith("S."): s += 1
+    return e, a, s
@@ -0,0 +1,147 @@
+"""Autoguardado en segundo plano: diario de cambios + compactación periódica.
+
+La interfaz solo encola las claves de sesión que cambiaron desde el último
+envío (``registrar`` no toca el disco). Un hilo escritor junta los cambios de
+una ventana de ``espera`` segundos —si una clave cambia varias veces queda su
+último valor—, los agrega al diario del almacén en una transacción y, cada
+``compactar_cada`` entradas o ``intervalo_compactacion`` segundos, los
+incorpora a las tablas de evaluaciones e ítems.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+_VACIAR = object()
+_OLVIDAR = object()
+_DETENER = object()
+
+
+class AutoGuardado:
+    """Hilo escritor compartido por todas las sesiones de la aplicación"""
+
+    def __init__(self, almacen, espera=1.0, compactar_cada=500, intervalo_compactacion=60.0):
+        self.almacen = almacen
+        self.espera = espera
+        self.compactar_cada = compactar_cada
+        self.intervalo_compactacion = intervalo_compactacion
+        self._cola = queue.Queue()
+        self._ids = {}        # token de sesión → id de la evaluación creada por el hilo
+        self._momentos = {}   # token de sesión → hora del último guardado
+        self._errores = {}    # token de sesión → error de su última escritura (si falló)
+        self._error_compactacion = None
+        self._sin_compactar = 0
+        self._ultima_compactacion = time.monotonic()
+        self._hilo = threading.Thread(target=self._escritor, name="teprosif-autoguardado", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    # --- API usada desde la interfaz (no bloquea) ---
+
+    def registrar(self, token, cambios, evaluacion_id=None):
+        """Encola los cambios de una sesión; si aún no tiene evaluación, el hilo la crea"""
+        if cambios:
+            self._cola.put((token, evaluacion_id, dict(cambios)))
+
+    def evaluacion(self, token):
+        """Id de la evaluación creada para `token`, o None si aún no se escribió"""
+        return self._ids.get(token)
+
+    def ultimo_guardado(self, token):
+        return self._momentos.get(token)
+
+    def error(self, token):
+        """Error vigente para `token`: su última escritura o la última compactación falló.
+
+        Se borra con la siguiente escritura (o compactación) que salga bien: un
+        bloqueo pasajero de SQLite no queda anunciado para siempre.
+        """
+        return self._errores.get(token) or self._error_compactacion
+
+    def olvidar(self, token):
+        """La sesión pasó a otra evaluación: lo pendiente de `token` se escribe y el token se descarta"""
+        self._cola.put((_OLVIDAR, token, None))
+
+    # --- Sincronización explícita ---
+
+    def vaciar(self, timeout=10.0):
+        """Escribe ya lo pendiente y espera a que termine (guardado manual, cierre)"""
+        if not self._hilo.is_alive():
+            return False
+        listo = threading.Event()
+        self._cola.put((_VACIAR, listo, None))
+        return listo.wait(timeout)
+
+    def cerrar(self):
+        if self._hilo.is_alive():
+            self._cola.put((_DETENER, None, None))
+            self._hilo.join(timeout=10.0)
+
+    # --- Hilo escritor ---
+
+    def _escritor(self):
+        pendientes = {}   # token → [evaluacion_id, {clave: valor}]
+        # Mensajes de la cola: (token, evaluacion_id, cambios), (_VACIAR, evento, None)
+        # u (_OLVIDAR, token, None)
+        plazo = None
+        while True:
+            if plazo is not None:
+                espera = max(0.0, plazo - time.monotonic())
+            elif self._sin_compactar:
+                # Sin cambios nuevos: despertar igual para compactar a tiempo
+                espera = max(0.0, self._ultima_compactacion + self.intervalo_compactacion - time.monotonic())
+            else:
+                espera = None
+            try:
+                token, dato, cambios = self._cola.get(timeout=espera)
+            except queue.Empty:
+                token = None
+
+            if token is not None and token not in (_VACIAR, _OLVIDAR, _DETENER):
+                pendiente = pendientes.setdefault(token, [None, {}])
+                if dato is not None: pendiente[0] = dato
+                pendiente[1].update(cambios)
+                if plazo is None: plazo = time.monotonic() + self.espera
+                continue
+
+            # Venció la ventana (o se pidió vaciar/detener): escribir lo acumulado
+            self._escribir(pendientes)
+            pendientes, plazo = {}, None
+            self._compactar(forzar=token is not None)
+            if token is _DETENER:
+                return
+            if token is _VACIAR:
+                dato.set()
+            if token is _OLVIDAR:
+                self._ids.pop(dato, None)
+                self._momentos.pop(dato, None)
+                self._errores.pop(dato, None)
+
+    def _escribir(self, pendientes):
+        for token, (evaluacion_id, cambios) in pendientes.items():
+            evaluacion_id = evaluacion_id or self._ids.get(token)
+            try:
+                if evaluacion_id is None:
+                    # Primer envío de la sesión: trae la foto completa, se guarda como evaluación nueva
+                    self._ids[token] = self.almacen.guardar(cambios)
+                else:
+                    self._sin_compactar += self.almacen.anotar(evaluacion_id, cambios)
+                self._momentos[token] = datetime.now()
+                self._errores.pop(token, None)
+            except Exception as exc:  # el hilo no debe morir: se informa en la interfaz
+                self._errores[token] = exc
+
+    def _compactar(self, forzar=False):
+        if not self._sin_compactar:
+            return
+        vencido = time.monotonic() - self._ultima_compactacion >= self.intervalo_compactacion
+        if forzar or vencido or self._sin_compactar >= self.compactar_cada:
+            try:
+                self.almacen.compactar()
+                self._sin_compactar = 0
+                self._error_compactacion = None
+            except Exception as exc:
+                self._error_compactacion = exc
+            self._ultima_compactacion = time.monotonic()
@@ -0,0 +1,55 @@
+"""Caché LRU acotada y segura entre hilos para resultados del análisis.
+
+Vive a nivel de módulo, por lo que se comparte entre todas las sesiones de
+Streamlit (y todas las llamadas de un lote) dentro del mismo proceso.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Diccionario de tamaño máximo con desalojo del menos usado y contadores"""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor de `clave`, calculándolo con `calcular()` si falta"""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        # El cálculo se hace fuera del lock: dos hilos pueden repetirlo, pero nunca se bloquean
+        valor = calcular()
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos), "maximo": self.maxsize,
+                "aciertos": self.aciertos, "fallos": self.fallos, "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._datos)
@@ -0,0 +1,221 @@
+"""Análisis de cohorte sobre todas las evaluaciones guardadas.
+
+Cada evaluación se resume al escribirla (``AlmacenSesiones`` llama a
+``resumir_evaluacion`` al guardar, autoguardar y compactar): edad, E/A/S,
+diagnóstico, puntaje Z y PSF sugeridos por código, en la tabla ``resumenes``;
+los conteos por código se guardan como un byte por código, en el orden de
+``CODIGOS_PROCESOS``, para leerlos de a miles sin decodificar nada.
+``CacheCohorte`` mantiene esos resúmenes en memoria como columnas de pandas
+—una tabla por evaluación y una matriz evaluación × código de PSF— y en cada
+``actualizar`` solo lee las evaluaciones cuya revisión cambió desde la última
+vez. El diagnóstico y los puntajes Z (total y E/A/S) se recalculan en bloque
+con ``diagnosticar_lote`` al cargar. Las agregaciones son group-bys
+vectorizados y se memorizan hasta el siguiente cambio. pandas se importa recién al cargar la primera vez.
+"""
+
+import threading
+from datetime import datetime
+
+from .datos import NOMBRES_PROCESOS, NORMAS_RANGOS, TIPOS_RESPUESTA
+from .indice import ITEMS_TEST
+from .fonologia import texto_a_fonemas
+from .analisis import analizar_item
+from .diagnostico import DIAGNOSTICOS, calcular_edad_exacta, diagnosticar_lote, obtener_diagnostico
+
+# Ítems que cuenta el modo Barrido (los primeros 15, como en la interfaz)
+ITEMS_BARRIDO = 15
+CODIGOS_PROCESOS = tuple(NOMBRES_PROCESOS)
+POSICION_PROCESO = {cod: k for k, cod in enumerate(CODIGOS_PROCESOS)}
+ORDEN_DIAGNOSTICOS = tuple(d[0] for d in DIAGNOSTICOS)
+MODOS = tuple(NORMAS_RANGOS)
+# anos/meses de un resumen sin fecha de nacimiento o de evaluación válida (la columna
+# no admite NULL); en CacheCohorte la edad queda NaN y la banda vacía
+EDAD_DESCONOCIDA = -1
+
+
+def _fecha(valor):
+    if not isinstance(valor, str):
+        return valor
+    try:
+        # Las sesiones importadas traen un timestamp como fecha de evaluación
+        return datetime.fromisoformat(valor).date()
+    except ValueError:  # fechas mal escritas: edad desconocida
+        return None
+
+
+def resumir_evaluacion(evaluacion, items):
+    """Resumen de una evaluación (fila de `evaluaciones` + sus filas de `items`)"""
+    modo = evaluacion["modo"] or "Completo"
+    limite = ITEMS_BARRIDO if modo == "Barrido" else len(ITEMS_TEST)
+    nacimiento, fecha_eval = _fecha(evaluacion["fecha_nac"]), _fecha(evaluacion["fecha_eval"])
+    # Sin alguna de las fechas la edad es desconocida, no 0: no se compara con las normas de 3 años
+    anos, meses = calcular_edad_exacta(nacimiento, fecha_eval) if nacimiento and fecha_eval else (None, None)
+
+    e = a = s = 0
+    procesos = bytearray(len(CODIGOS_PROCESOS))
+    for fila in items:
+        i = fila["item"]
+        # Igual que el agregado de la interfaz: solo respuestas válidas no marcadas como correctas
+        if i >= limite or fila["tipo"] != TIPOS_RESPUESTA[0] or fila["ok"]:
+            continue
+        e += fila["e"]; a += fila["a"]; s += fila["s"]
+        if fila["transcripcion"]:
+            item = ITEMS_TEST[i]
+            pf = texto_a_fonemas(fila["transcripcion"])
+            if pf != item.meta_fon:
+                # Sin tope de tiempo: el resumen se memoriza y debe salir igual en cada cálculo
+                for cod in analizar_item(item.meta_fon, pf, item.num, presupuesto=None).sugerencias:
+                    k = POSICION_PROCESO[cod]
+                    procesos[k] = min(procesos[k] + 1, 255)
+
+    total = e + a + s
+    diag, _, _, z_score, _ = obtener_diagnostico(total, anos, modo)
+    return {
+        "evaluacion_id": evaluacion["id"], "revision": evaluacion["revision"],
+        "anos": EDAD_DESCONOCIDA if anos is None else anos,
+        "meses": EDAD_DESCONOCIDA if meses is None else meses, "e": e, "a": a, "s": s, "total": total,
+        "z": z_score, "diagnostico": diag, "procesos": bytes(procesos),
+    }
+
+
+class CacheCohorte:
+    """Resúmenes de todas las evaluaciones en columnas, con agregaciones memorizadas"""
+
+    def __init__(self, almacen, lote=1000):
+        self.almacen = almacen
+        self.lote = lote
+        self.revision = -1  # las bases migradas tienen evaluaciones con revisión 0
+        self._evaluaciones = None  # DataFrame indexado por evaluacion_id
+        self._procesos = None      # DataFrame evaluacion_id × código de PSF (conteos)
+        self._memo = {}
+        self._cerrojo = threading.RLock()
+
+    # --- Actualización incremental ---
+
+    def actualizar(self):
+        """Resume lo pendiente y trae solo lo que cambió; devuelve las evaluaciones releídas"""
+        with self._cerrojo:
+            self._resumir_pendientes()
+            completo = self._evaluaciones is None
+            columnas, filas = self.almacen.leer_resumenes(-1 if completo else self.revision)
+            if filas or completo:
+                self._aplicar(columnas, filas, completo)
+            if len(self._evaluaciones) != self.almacen.contar_resumenes():
+                # Hubo evaluaciones borradas: se recarga todo
+                columnas, filas = self.almacen.leer_resumenes(-1)
+                self._aplicar(columnas, filas, True)
+            return len(filas)
+
+    def _resumir_pendientes(self):
+        # Solo bases escritas sin resúmenes (anteriores a ellos o cargadas por fuera del almacén)
+        while True:
+            pendientes = self.almacen.sin_resumen(self.lote)
+            if not pendientes:
+                return
+            self.almacen.guardar_resumenes([resumir_evaluacion(ev, items) for ev, items in pendientes])
+
+    def _marcos(self, columnas, filas):
+        import numpy as np
+        import pandas as pd
+        valores = dict(zip(columnas, zip(*filas))) if filas else {c: () for c in columnas}
+        indice = pd.Index(np.array(valores["evaluacion_id"], dtype=np.int64), name="evaluacion_id")
+        evaluaciones = pd.DataFrame({
+            "revision": np.array(valores["revision"], dtype=np.int64),
+            "paciente": np.array(valores["paciente"], dtype=object),
+            "modo": pd.Categorical(valores["modo"], categories=MODOS),
+            "anos": np.array(valores["anos"], dtype=np.float32),
+            "e": np.array(valores["e"], dtype=np.int16),
+            "a": np.array(valores["a"], dtype=np.int16),
+            "s": np.array(valores["s"], dtype=np.int16),
+        }, index=indice)
+        evaluaciones.loc[evaluaciones["anos"] == EDAD_DESCONOCIDA, "anos"] = np.nan
+        evaluaciones["total"] = evaluaciones["e"] + evaluaciones["a"] + evaluaciones["s"]
+        diagnosticos = diagnosticar_lote(
+            evaluaciones["total"], evaluaciones["anos"], evaluaciones["modo"],
+            evaluaciones["e"], evaluaciones["a"], evaluaciones["s"],
+        )
+        evaluaciones = evaluaciones.join(diagnosticos.drop(columns="color"))
+        # Banda de edad normativa: la misma que usa obtener_diagnostico (3 a 6 años).
+        # Vacía si la edad es desconocida: esas evaluaciones quedan fuera de los group-bys por banda
+        evaluaciones["banda"] = evaluaciones["anos"].clip(3, 6).astype("Int8")
+        conteos = np.frombuffer(b"".join(valores["procesos"]), dtype=np.uint8).reshape(len(indice), len(CODIGOS_PROCESOS))
+        return evaluaciones, pd.DataFrame(conteos, index=indice, columns=list(CODIGOS_PROCESOS))
+
+    def _aplicar(self, columnas, filas, completo):
+        import pandas as pd
+        evaluaciones, procesos = self._marcos(columnas, filas)
+        if completo:
+            self._evaluaciones, self._procesos = evaluaciones, procesos
+            self.revision = -1
+        else:
+            # Las filas releídas reemplazan a sus versiones anteriores
+            conservar = ~self._evaluaciones.index.isin(evaluaciones.index)
+            self._evaluaciones = pd.concat([self._evaluaciones[conservar], evaluaciones])
+            self._procesos = pd.concat([self._procesos[conservar], procesos])
+        if len(evaluaciones):
+            self.revision = max(self.revision, int(evaluaciones["revision"].max()))
+        self._memo.clear()
+
+    # --- Agregaciones (memorizadas hasta el próximo cambio) ---
+
+    def _memorizar(self, clave, calcular):
+        with self._cerrojo:
+            if clave not in self._memo:
+                self._memo[clave] = calcular()
+            return self._memo[clave]
+
+    def _filtrar(self, modo):
+        if modo is None:
+            return self._evaluaciones, self._procesos
+        def calcular():
+            seleccion = (self._evaluaciones["modo"] == modo).to_numpy()
+            return self._evaluaciones[seleccion], self._procesos[seleccion]
+        return self._memorizar(("filtro", modo), calcular)
+
+    @property
+    def evaluaciones(self):
+        return self._evaluaciones
+
+    def prevalencia_procesos(self, por=None, modo=None):
+        """Proporción de evaluaciones con al menos un PSF sugerido de cada código.
+
+        Sin `por` devuelve una columna ``prevalencia`` por código; con `por`
+        (p. ej. ``"banda"``) una fila por grupo y una columna por código.
+        """
+        def calcular():
+            evaluaciones, procesos = self._filtrar(modo)
+            presencia = procesos > 0
+            if por is None:
+                return presencia.mean().rename("prevalencia").to_frame()
+            return presencia.groupby(evaluaciones[por]).mean()
+        return self._memorizar(("procesos", por, modo), calcular)
+
+    def prevalencia_categorias(self, por="banda", modo=None):
+        """Proporción de evaluaciones con algún PSF de Estructura, Asimilación o Sustitución"""
+        def calcular():
+            evaluaciones, _ = self._filtrar(modo)
+            presencia = evaluaciones[["e", "a", "s"]] > 0
+            presencia.columns = ["E", "A", "S"]
+            if por is None:
+                return presencia.mean().rename("prevalencia").to_frame()
+            return presencia.groupby(evaluaciones[por]).mean()
+        return self._memorizar(("categorias", por, modo), calcular)
+
+    def distribucion_diagnosticos(self, por=None, modo=None):
+        """Cantidad de evaluaciones por diagnóstico (y por grupo si se indica `por`)"""
+        def calcular():
+            evaluaciones, _ = self._filtrar(modo)
+            if por is None:
+                return evaluaciones["diagnostico"].value_counts(sort=False).rename("evaluaciones")
+            return evaluaciones.groupby([por, "diagnostico"], observed=False).size().unstack("diagnostico")
+        return self._memorizar(("diagnosticos", por, modo), calcular)
+
+    def histograma_z(self, ancho=0.5, modo=None):
+        """Conteo de puntajes Z (solo modo Completo tiene Z) en intervalos de `ancho` DE"""
+        def calcular():
+            import numpy as np
+            evaluaciones, _ = self._filtrar(modo)
+            z = evaluaciones["z"].dropna()
+            inicio = np.floor(z / ancho) * ancho
+            return inicio.value_counts().sort_index().rename_axis("z").rename("evaluaciones")
+        return self._memorizar(("z", ancho, modo), calcular)
@@ -0,0 +1,230 @@
+"""Tablas clínicas del TEPROSIF-R: ítems, normas, fonemas y definiciones de PSF."""
+
+METADATA_PALABRAS = {
+    "1": {"word": "plancha", "syl": ["plan", "cha"], "tonic": 0},
+    "2": {"word": "rueda", "syl": ["rue", "da"], "tonic": 0},
+    "3": {"word": "mariposa", "syl": ["ma", "ri", "po", "sa"], "tonic": 2},
+    "4": {"word": "bicicleta", "syl": ["bi", "ci", "cle", "ta"], "tonic": 2},
+    "5": {"word": "helicóptero", "syl": ["he", "li", "cop", "te", "ro"], "tonic": 2},
+    "6": {"word": "bufanda", "syl": ["bu", "fan", "da"], "tonic": 1},
+    "7": {"word": "caperucita", "syl": ["ca", "pe", "ru", "ci", "ta"], "tonic": 3},
+    "8": {"word": "alfombra", "syl": ["al", "fom", "bra"], "tonic": 1},
+    "9": {"word": "refrigerador", "syl": ["re", "fri", "ge", "ra", "dor"], "tonic": 4},
+    "10": {"word": "edificio", "syl": ["e", "di", "fi", "cio"], "tonic": 2},
+    "11": {"word": "calcetín", "syl": ["cal", "ce", "tin"], "tonic": 2},
+    "12": {"word": "dinosaurio", "syl": ["di", "no", "sau", "rio"], "tonic": 2},
+    "13": {"word": "teléfono", "syl": ["te", "le", "fo", "no"], "tonic": 1},
+    "14": {"word": "remedio", "syl": ["re", "me", "dio"], "tonic": 1},
+    "15": {"word": "peineta", "syl": ["pei", "ne", "ta"], "tonic": 1},
+    "16": {"word": "auto", "syl": ["au", "to"], "tonic": 0},
+    "17": {"word": "indio", "syl": ["in", "dio"], "tonic": 0},
+    "18": {"word": "pantalón", "syl": ["pan", "ta", "lon"], "tonic": 2},
+    "19": {"word": "camión", "syl": ["ca", "mion"], "tonic": 1},
+    "20": {"word": "cuaderno", "syl": ["cua", "der", "no"], "tonic": 1},
+    "21": {"word": "micro", "syl": ["mi", "cro"], "tonic": 0},
+    "22": {"word": "tren", "syl": ["tren"], "tonic": 0},
+    "23": {"word": "plátano", "syl": ["pla", "ta", "no"], "tonic": 0},
+    "24": {"word": "jugo", "syl": ["ju", "go"], "tonic": 0},
+    "25": {"word": "enchufe", "syl": ["en", "chu", "fe"], "tonic": 1},
+    "26": {"word": "jabón", "syl": ["ja", "bon"], "tonic": 1},
+    "27": {"word": "tambor", "syl": ["tam", "bor"], "tonic": 1},
+    "28": {"word": "volantín", "syl": ["vo", "lan", "tin"], "tonic": 2},
+    "29": {"word": "jirafa", "syl": ["ji", "ra", "fa"], "tonic": 1},
+    "30": {"word": "gorro", "syl": ["go", "rro"], "tonic": 0},
+    "31": {"word": "árbol", "syl": ["ar", "bol"], "tonic": 0},
+    "32": {"word": "dulce", "syl": ["dul", "ce"], "tonic": 0},
+    "33": {"word": "guitarra", "syl": ["gui", "ta", "rra"], "tonic": 1},
+    "34": {"word": "guante", "syl": ["guan", "te"], "tonic": 0},
+    "35": {"word": "reloj", "syl": ["re", "loj"], "tonic": 1},
+    "36": {"word": "jaula", "syl": ["jau", "la"], "tonic": 0},
+    "37": {"word": "puente", "syl": ["puen", "te"], "tonic": 0},
+}
+
+# --- NORMAS DETALLADAS (Promedio y DE por categoría) ---
+STATS_DETALLADO = {
+    3: {"Total": (27.0, 15.1), "E": (14.7, 8.6), "A": (6.3, 4.8), "S": (5.9, 4.2)},
+    4: {"Total": (13.4, 10.0), "E": (7.2, 6.4),  "A": (2.9, 2.7), "S": (3.3, 2.9)},
+    5: {"Total": (7.9, 6.4),   "E": (4.1, 3.7),  "A": (1.9, 2.0), "S": (1.7, 1.9)},
+    6: {"Total": (4.9, 5.1),   "E": (2.6, 3.3),  "A": (1.0, 1.2), "S": (1.2, 1.8)}
+}
+
+NORMAS_RANGOS = {
+    "Completo": {3:{"N":(0,42),"R":(43,57)},4:{"N":(0,23),"R":(24,33)},5:{"N":(0,14),"R":(15,21)},6:{"N":(0,10),"R":(11,15)}},
+    "Barrido": {3:{"N":(0,28),"R":(29,38)},4:{"N":(0,15),"R":(16,21)},5:{"N":(0,10),"R":(11,14)},6:{"N":(0,7),"R":(8,11)}}
+}
+
+PALABRAS_TEST = [
+    "1. Plancha", "2. Rueda", "3. Mariposa", "4. Bicicleta", "5. Helicóptero",
+    "6. Bufanda", "7. Caperucita", "8. Alfombra", "9. Refrigerador", "10. Edificio",
+    "11. Calcetín", "12. Dinosaurio", "13. Teléfono", "14. Remedio", "15. Peineta",
+    "16. Auto", "17. Indio", "18. Pantalón", "19. Camión", "20. Cuaderno",
+    "21. Micro", "22. Tren", "23. Plátano", "24. Jugo", "25. Enchufe",
+    "26. Jabón", "27. Tambor", "28. Volantín", "29. Jirafa", "30. Gorro",
+    "31. Árbol", "32. Dulce", "33. Guitarra", "34. Guante", "35. Reloj",
+    "36. Jaula", "37. Puente"
+]
+
+# Tipos de respuesta de la hoja de registro (el primero es la respuesta puntuable)
+TIPOS_RESPUESTA = ["Respuesta Válida", "NR", "NT", "OP"]
+
+# Prefijos de las claves de sesión de cada ítem (type_0, ok_0, in_0, e_0, a_0, s_0, ...)
+PREFIJOS_ITEM = ("type_", "ok_", "in_", "e_", "a_", "s_")
+
+FONEMAS = {
+    "p": {"zona": 1, "modo": "oclusiva", "voz": 0}, "b": {"zona": 1, "modo": "oclusiva", "voz": 1},
+    "t": {"zona": 2, "modo": "oclusiva", "voz": 0}, "d": {"zona": 2, "modo": "oclusiva", "voz": 1},
+    "k": {"zona": 4, "modo": "oclusiva", "voz": 0}, "g": {"zona": 4, "modo": "oclusiva", "voz": 1},
+    "m": {"zona": 1, "modo": "nasal", "voz": 1}, "n": {"zona": 2, "modo": "nasal", "voz": 1},
+    "ɲ": {"zona": 3, "modo": "nasal", "voz": 1}, "f": {"zona": 1, "modo": "fricativa", "voz": 0},
+    "s": {"zona": 2, "modo": "fricativa", "voz": 0}, "x": {"zona": 4, "modo": "fricativa", "voz": 0},
+    "h": {"zona": 5, "modo": "aspirada", "voz": 0}, "ĉ": {"zona": 3, "modo": "africada", "voz": 0},
+    "l": {"zona": 2, "modo": "liquida", "voz": 1}, "r": {"zona": 2, "modo": "liquida", "voz": 1},
+    "R": {"zona": 2, "modo": "liquida", "voz": 1}, "y": {"zona": 3, "modo": "fricativa", "voz": 1},
+    "w": {"zona": 4, "modo": "semiconsonante", "voz": 1}, "a": {"zona": 0, "modo": "vocal", "voz": 1},
+    "e": {"zona": 3, "modo": "vocal", "voz": 1}, "i": {"zona": 3, "modo": "vocal", "voz": 1},
+    "o": {"zona": 4, "modo": "vocal", "voz": 1}, "u": {"zona": 4, "modo": "vocal", "voz": 1},
+}
+
+GRUPOS = {
+    "vocales": ["a", "e", "i", "o", "u"],
+    "trabantes": ["n", "l", "s", "r", "d", "z", "x", "j", "m"],
+    "diptongos": ["ai", "au", "ei", "eu", "oi", "ou", "ia", "ie", "io", "iu", "ua", "ue", "ui", "uo"]
+}
+
+NOMBRES_PROCESOS = {
+    "E.1": "Reducción Grupo Consonántico", "E.2": "Reducción Diptongo", "E.3": "Omisión Coda",
+    "E.4": "Coalescencia", "E.5": "Omisión Elem. Átonos", "E.6": "Omisión Sílaba Tónica",
+    "E.7": "Adición", "E.8": "Inversión", "A.1": "Asim. Idéntica", "A.2": "Asim. Labial",
+    "A.3": "Asim. Dental", "A.4": "Asim. Palatal", "A.5": "Asim. Velar", "A.6": "Asim. a Líquidos",
+    "A.7": "Asim. Nasal", "A.8": "Asim. Vocálica", "A.9": "Asim. Silábica", "S.1": "Aspiración",
+    "S.2": "Posteriorización", "S.3": "Frontalización", "S.4": "Labialización", "S.5": "Oclusivización",
+    "S.6": "Fricativización", "S.7": "Africación", "S.8": "Sonorización", "S.9": "Afonización",
+    "S.10": "Semiconsonantización", "S.11": "Sust. Líq. por Líq.", "S.12": "Sust. Líq. por No Líq.",
+    "S.13": "Sust. No Líq. por Líq.", "S.14": "Nasalización", "S.15": "Oralización", 
+    "S.16": "Sust. Vocálica", "S.17": "Desafricación"
+}
+
+# === TEXTO ADICIONAL DE PROCEDIMIENTOS GENERALES PARA EL SIDEBAR ===
+GUIA_PROCEDIMIENTOS = """
+**1. Descartar problemas articulatorios:**
+* Antes de identificar un PSF, determine si el niño tiene problemas para articular algún fonema.
+* **Regla:** Si el error es siempre el mismo (ej. siempre sustituye /r/ por /d/ en todas las palabras), se considera dificultad articulatoria y **NO se contabiliza como PSF**.
+* Solo es PSF si el error varía según la palabra (ej. a veces lo omite, a veces lo sustituye).
+* **Excepción seseo:** La sustitución de /s/ por [θ] (z) nunca se considera PSF.
+
+**2. Secuencia de Análisis sugerida:**
+1. **Estructura (E):** Identifique primero métrica, adiciones y omisiones.
+2. **Asimilación (A):** Priorice siempre la asimilación sobre la sustitución. Si un cambio hace que el fonema se parezca a otro presente, es Asimilación.
+3. **Sustitución (S):** Solo cuando el cambio no se explica por asimilación.
+"""
+
+# === DEFINICIONES ACTUALIZADAS Y EXTENDIDAS (FUENTE: PDF USUARIO) ===
+DEFINICIONES = {
+    # --- ESTRUCTURA ---
+    "E.1": """<b>Reducción de grupo consonántico:</b> Se omite uno de los fonemas del grupo (dífono consonántico).<br>
+    <i>Ejemplos:</i> /tren/ → /ten/, /plátano/ → /pátano/.<br>
+    <span class='rule-highlight'>Regla:</span> Si el niño nunca produce el líquido correctamente (error constante), es articulatorio y no PSF. Si varía, es PSF.""",
+    
+    "E.2": """<b>Reducción del diptongo:</b> Se omite uno de los fonemas del dífono vocálico (generalmente la débil).<br>
+    <i>Ejemplos:</i> /auto/ → /ato/, /puente/ → /pénte/.""",
+    
+    "E.3": """<b>Omisión de consonante trabante (coda):</b> Se omite el fonema consonántico al final de la sílaba.<br>
+    <i>Ejemplos:</i> /pantalón/ → /pa_talón/, /helicóptero/ → /elikó_tero/.<br>
+    <span class='rule-highlight'>Prioridad:</span> En casos mixtos (ej: /indio/ → /i_nio/), se prioriza la Omisión de Trabante sobre la asimilación.""",
+    
+    "E.4": """<b>Coalescencia:</b> Se fusionan dos fonemas contiguos originando un tercer fonema diferente.<br>
+    <i>Ejemplos:</i> /tren/ → /ken/ (/tr/=/k/), /remedio/ → /reméĵo/ (/di/=/y/).<br>
+    <span class='rule-highlight'>Nota:</span> Se cuenta como 1 solo proceso en vez de dos (reducción + asimilación).""",
+    
+    "E.5": """<b>Omisión de elementos átonos:</b> Se omiten sílabas átonas o fonemas de ellas.<br>
+    <i>Ejemplos:</i> /alfombra/ → /_fombra/, /mariposa/ → /ma_pósa/.<br>
+    <span class='rule-highlight'>Contabilización:</span> Se cuenta 1 proceso por elementos contiguos omitidos.""",
+    
+    "E.6": """<b>Omisión de sílaba tónica:</b> Se elimina la sílaba acentuada o parte de sus constituyentes.<br>
+    <i>Ejemplos:</i> /mariposa/ → /mari_sa/, /helicóptero/ → /eli_óptero/.""",
+    
+    "E.7": """<b>Adición de fonemas o sílabas:</b> Prótesis (inicio), Epéntesis (medio) o Paragoge (final).<br>
+    <i>Ejemplos:</i> /indio/ → /níndio/, /auto/ → /dáuto/, /jaula/ → /xuáula/.""",
+    
+    "E.8": """<b>Inversión (Metátesis):</b> Se cambia de posición un fonema o sílaba conservando los originales.<br>
+    <i>Ejemplos:</i> /auto/ → /uáto/, /teléfono/ → /tenéfolo/, /dulce/ → /dúsel/.""",
+    
+    # --- ASIMILACIÓN ---
+    "A.1": """<b>Asimilación idéntica:</b> Un fonema se cambia para hacerse idéntico a otro presente.<br>
+    <i>Ejemplos:</i> /bufanda/ → /bubánda/, /reloj/ → /lelóx/.""",
+    
+    "A.2": """<b>Asimilación labial:</b> Un fonema se hace similar a un labial (/p/, /b/, /m/, /f/) presente.<br>
+    <i>Ejemplos:</i> /plátano/ → /plátamo/.""",
+    
+    "A.3": """<b>Asimilación dental:</b> Un fonema se hace similar a un dental (/t/, /d/, /s/) presente.<br>
+    <i>Ejemplos:</i> /mariposa/ → /madipósa/.""",
+    
+    "A.4": """<b>Asimilación palatal:</b> Se hace similar a un palatal (/y/, /ch/, /ñ/) o vocales /e/, /i/.<br>
+    <i>Ejemplo:</i> /cuaderno/ → /cuaĵérno/.""",
+    
+    "A.5": """<b>Asimilación velar:</b> Se hace similar a un velar (/k/, /g/, /x/) o vocales /o/, /u/.<br>
+    <i>Ejemplos:</i> /bufanda/ → /gufánda/, /puente/ → /kuénte/.""",
+    
+    "A.6": """<b>Asimilación a líquidos:</b> Un no líquido se asemeja a un líquido (/l/, /r/, /rr/) presente.<br>
+    <i>Ejemplos:</i> /guitarra/ → /litára/.""",
+    
+    "A.7": """<b>Asimilación nasal:</b> Un fonema oral se hace similar a un nasal (/m/, /n/, /ñ/) presente.<br>
+    <i>Ejemplos:</i> /alfombra/ → /anfómbra/.""",
+    
+    "A.8": """<b>Asimilación vocálica:</b> Una vocal se asemeja a otra en zona o grado de abertura.<br>
+    <i>Ejemplos:</i> /enchufe/ → /enchúfo/ (e se parece a u).""",
+    
+    "A.9": """<b>Asimilación silábica:</b> Una sílaba completa se hace idéntica a otra de la palabra.<br>
+    <i>Ejemplos:</i> /helicóptero/ → /lilikóptero/, /dinosaurio/ → /didisáurio/.""",
+    
+    # --- SUSTITUCIÓN ---
+    "S.1": """<b>Aspiración de trabante:</b> El fonema final de sílaba se aspira (/h/).<br>
+    <i>Ejemplo:</i> /dulce/ → /dúhse/.<br>
+    <span class='rule-highlight'>Norma:</span> La aspiración de /s/ final NO se cuenta si es norma dialectal (español de Chile).""",
+    
+    "S.2": """<b>Posteriorización:</b> Sustitución de fonemas anteriores (labial/dental) por posteriores (palatal/velar).<br>
+    <i>Ejemplos:</i> /bufanda/ → /jufánda/, /tren/ → /kren/.""",
+    
+    "S.3": """<b>Frontalización:</b> Sustitución de posteriores por anteriores.<br>
+    <i>Ejemplos:</i> /guante/ → /buánte/, /jugo/ → /púgo/.""",
+    
+    "S.4": """<b>Labialización:</b> Sustitución de consonante (no velar/líquida) por labial.<br>
+    <i>Ejemplos:</i> /dinosaurio/ → /binosáurio/.""",
+    
+    "S.5": """<b>Oclusivización de fricativos:</b> Fricativo pasa a oclusivo/africado.<br>
+    <i>Ejemplos:</i> /jirafa/ → /kiráfa/, /dulce/ → /dúlĉe/.""",
+    
+    "S.6": """<b>Fricativización de oclusivos:</b> Oclusivo/africado pasa a fricativo.<br>
+    <i>Ejemplos:</i> /plancha/ → /plánsa/, /puente/ → /fuénte/.""",
+    
+    "S.7": """<b>Sustitución de fricativos entre sí:</b> Reemplazo entre fricativos de zona similar.<br>
+    <i>Ejemplo:</i> /alfombra/ → /alsómbra/.""",
+    
+    "S.8": """<b>Sonorización:</b> Fonema áfono pasa a sonoro.<br>
+    <i>Ejemplo:</i> /caperucita/ → /kaberusíta/.""",
+    
+    "S.9": """<b>Afonización (Pérdida de sonoridad):</b> Fonema sonoro pasa a áfono.<br>
+    <i>Ejemplo:</i> /guitarra/ → /kitára/.""",
+    
+    "S.10": """<b>Semiconsonantización:</b> Líquido sustituido por semiconsonante (yod /j/ o wau /w/).<br>
+    <i>Ejemplos:</i> /tren/ → /tjen/, /plátano/ → /pjátano/.<br>
+    <span class='rule-highlight'>Regla:</span> Siempre es sustitución, NO asimilación.""",
+    
+    "S.11": """<b>Sustitución de líquidos entre sí:</b> Cambio entre /l/, /r/, /rr/.<br>
+    <i>Ejemplos:</i> /gorro/ → /góro/, /micro/ → /míklo/.""",
+    
+    "S.12": """<b>Sustitución de líquido por no líquido:</b> Líquido pasa a ser otra consonante oral.<br>
+    <i>Ejemplos:</i> /reloj/ → /delóx/, /gorro/ → /gódo/.""",
+    
+    "S.13": """<b>Sustitución de no líquido por líquido:</b><br>
+    <i>Ejemplos:</i> /edificio/ → /elifísio/, /auto/ → /álto/.""",
+    
+    "S.14": """<b>Nasalización:</b> Fonema oral pasa a nasal (sin asimilación).<br>
+    <i>Ejemplos:</i> /rueda/ → /muéda/, /auto/ → /ánto/.""",
+    
+    "S.15": """<b>Oralización:</b> Fonema nasal pasa a oral.<br>
+    <i>Ejemplo:</i> /bufanda/ → /bufálda/.""",
+    
+    "S.16": """<b>Sustitución Vocálica (Disimilación):</b> Cambio de vocal para diferenciarse de otras.<br>
+    <i>Ejemplo:</i> /puente/ → /puénta/."""
+}
@@ -0,0 +1,227 @@
+"""Registro de detectores de PSF y rasgos derivados compartidos por par meta/producción.
+
+Cada detector declara qué rasgos derivados del par necesita (sílabas, núcleos,
+codas, alineación, ...) y los recibe como argumentos, en ese orden:
+
+    @detector("codas", produce=("E.3",), necesita=("n_codas_meta", "n_codas_prod"))
+    def _omision_coda(n_codas_meta, n_codas_prod):
+        return ("E.3",) if n_codas_meta > n_codas_prod else ()
+
+Cada rasgo se calcula una sola vez por par, justo antes del primer detector
+activo que lo pide (directamente o a través de otro rasgo); los que ningún
+detector activo pide no se calculan. El orden de registro fija el orden de la
+salida: los códigos se devuelven sin repetir, en el orden en que los sugiere el
+primer detector que los encuentra. Las reglas en sí se registran en ``analisis``.
+
+Con un `limite` de tiempo, antes de cada rasgo y de cada detector se mira el
+reloj; si ya pasó, se corta con PresupuestoAgotado, que lleva lo sugerido hasta
+ese momento.
+"""
+
+import time
+from collections import namedtuple
+from operator import itemgetter
+
+from . import perfil
+from .datos import GRUPOS
+from .fonologia import silabear_texto_mejorado
+from .indice import obtener_item
+from .alineacion import alinear
+
+Detector = namedtuple("Detector", [
+    "nombre",    # identificador para activarlo o desactivarlo ("codas", "alineacion", ...)
+    "produce",   # códigos que puede sugerir
+    "necesita",  # rasgos derivados que recibe como argumentos, en orden
+    "funcion",   # función(*rasgos) -> iterable de códigos
+])
+
+# Detectores en orden de ejecución, y rasgos derivados por nombre: (función, rasgos que usa)
+DETECTORES = []
+DERIVADOS = {}
+# Datos del par que no se derivan: están desde el inicio
+BASICOS = ("meta", "prod", "num_item")
+
+Plan = namedtuple("Plan", [
+    "nombres",   # detectores activos, en orden de registro
+    "pasos",     # por detector: (detector, argumentos, rasgos nuevos a calcular antes)
+])                # con cada rasgo nuevo como (nombre, función, argumentos)
+
+# Planes ya armados por selección (None = todos los detectores)
+_PLANES = {}
+
+
+class PresupuestoAgotado(Exception):
+    """Se acabó el tiempo del análisis de un par antes de correr todos los detectores"""
+
+    def __init__(self, etapa, parciales):
+        super().__init__(f"Presupuesto de tiempo agotado en {etapa!r}")
+        self.etapa = etapa          # rasgo o detector que ya no se alcanzó a correr
+        self.parciales = parciales  # códigos sugeridos hasta ese momento
+
+
+def derivado(nombre, necesita):
+    """Decorador: registra un rasgo derivado; la función recibe los rasgos de `necesita`"""
+    def registrar(funcion):
+        _validar(nombre, necesita)
+        DERIVADOS[nombre] = (funcion, tuple(necesita))
+        _PLANES.clear()
+        return funcion
+    return registrar
+
+
+def detector(nombre, produce, necesita):
+    """Decorador: agrega la función al final del registro de detectores"""
+    def registrar(funcion):
+        if any(d.nombre == nombre for d in DETECTORES):
+            raise ValueError(f"Detector repetido: {nombre!r}")
+        _validar(nombre, necesita)
+        DETECTORES.append(Detector(nombre, tuple(produce), tuple(necesita), funcion))
+        _PLANES.clear()
+        return funcion
+    return registrar
+
+
+def _validar(nombre, necesita):
+    faltan = [r for r in necesita if r not in DERIVADOS and r not in BASICOS]
+    if faltan:
+        raise ValueError(f"{nombre!r} pide rasgos desconocidos: {', '.join(faltan)}")
+
+
+def seleccionar(nombres=None):
+    """Plan de ejecución de los detectores `nombres` (todos si es None), memoizado"""
+    clave = None if nombres is None else frozenset(nombres)
+    plan = _PLANES.get(clave)
+    if plan is None:
+        if clave is None:
+            activos = tuple(DETECTORES)
+        else:
+            desconocidos = clave.difference(d.nombre for d in DETECTORES)
+            if desconocidos:
+                raise ValueError(f"Detectores desconocidos: {', '.join(sorted(desconocidos))}")
+            activos = tuple(d for d in DETECTORES if d.nombre in clave)
+        plan = _PLANES[clave] = _plan(activos)
+    return plan
+
+
+def detectores_para(codigos):
+    """Nombres de los detectores que pueden sugerir alguno de `codigos`"""
+    codigos = set(codigos)
+    return [d.nombre for d in DETECTORES if codigos.intersection(d.produce)]
+
+
+def _argumentos(necesita):
+    """Función que toma los rasgos `necesita` del dict del par, como tupla"""
+    if len(necesita) == 1:
+        unico = necesita[0]
+        return lambda valores: (valores[unico],)
+    return itemgetter(*necesita)
+
+
+def _plan(activos):
+    """Pasos de los detectores activos: cada uno con los rasgos que calcula primero"""
+    calculados = set(BASICOS)
+
+    def agregar(rasgo, nuevos):
+        # Dependencias antes que el rasgo (recorrido en profundidad)
+        if rasgo in calculados: return
+        funcion, necesita = DERIVADOS[rasgo]
+        for r in necesita:
+            agregar(r, nuevos)
+        calculados.add(rasgo)
+        nuevos.append((rasgo, funcion, _argumentos(necesita)))
+
+    pasos = []
+    for d in activos:
+        nuevos = []
+        for r in d.necesita:
+            agregar(r, nuevos)
+        pasos.append((d, _argumentos(d.necesita), tuple(nuevos)))
+    return Plan(tuple(d.nombre for d in activos), tuple(pasos))
+
+
+def ejecutar(meta, prod, num_item, detectores=None, tiempos=None, limite=None):
+    """Corre los detectores sobre el par y devuelve los códigos sugeridos sin repetir.
+
+    `detectores`: nombres a correr o Plan ya armado por seleccionar() (None = todos).
+    `tiempos`: dict opcional que acumula por detector [llamadas, segundos]; el
+    costo de un rasgo derivado se carga al primer detector que lo pide.
+    `limite`: instante (time.perf_counter) a partir del cual se corta con PresupuestoAgotado.
+    Con el perfilado activo, cada detector es además un tramo ``detector:<nombre>``.
+    """
+    plan = detectores if isinstance(detectores, Plan) else seleccionar(detectores)
+    valores = {"meta": meta, "prod": prod, "num_item": num_item}
+    sugeridos = []
+    if tiempos is None and limite is None and not perfil.ACTIVO:
+        for det, argumentos, rasgos in plan.pasos:
+            for nombre, funcion, argumentos_rasgo in rasgos:
+                valores[nombre] = funcion(*argumentos_rasgo(valores))
+            sugeridos.extend(det.funcion(*argumentos(valores)))
+        return list(dict.fromkeys(sugeridos))
+
+    reloj = time.perf_counter
+    for det, argumentos, rasgos in plan.pasos:
+        with perfil.tramo(f"detector:{det.nombre}"):
+            inicio = reloj()
+            for nombre, funcion, argumentos_rasgo in rasgos:
+                if limite is not None and reloj() > limite:
+                    raise PresupuestoAgotado(nombre, list(dict.fromkeys(sugeridos)))
+                valores[nombre] = funcion(*argumentos_rasgo(valores))
+            if limite is not None and reloj() > limite:
+                raise PresupuestoAgotado(det.nombre, list(dict.fromkeys(sugeridos)))
+            sugeridos.extend(det.funcion(*argumentos(valores)))
+        if tiempos is not None:
+            acumulado = tiempos.setdefault(det.nombre, [0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += reloj() - inicio
+    return list(dict.fromkeys(sugeridos))
+
+
+# --- Rasgos derivados (en orden de dependencia) ---
+
+_VOCALES = frozenset(GRUPOS["vocales"])
+_TRABANTES = frozenset(GRUPOS["trabantes"])
+
+def _nucleos(silabas):
+    return [''.join([c for c in sil if c in _VOCALES]) for sil in silabas]
+
+def _n_codas(silabas):
+    return sum(1 for sil in silabas if len(sil) > 1 and sil[-1] in _TRABANTES)
+
+# Registro precompilado del ítem: sílabas, núcleos, codas, grupos y diptongos de la meta
+@derivado("item", necesita=("num_item",))
+def _item(num_item):
+    return obtener_item(num_item)
+
+# Los datos derivados del texto de la meta solo valen si es la transcripción del ítem
+@derivado("meta_indexada", necesita=("item", "meta"))
+def _meta_indexada(item, meta):
+    return item is not None and meta == item.meta_fon
+
+@derivado("silabas_meta", necesita=("item", "meta"))
+def _silabas_meta(item, meta):
+    return item.silabas if item else silabear_texto_mejorado(meta)
+
+@derivado("silabas_prod", necesita=("prod",))
+def _silabas_prod(prod):
+    return silabear_texto_mejorado(prod)
+
+@derivado("nucleos_meta", necesita=("item", "silabas_meta"))
+def _nucleos_meta(item, silabas_meta):
+    return item.nucleos if item else _nucleos(silabas_meta)
+
+@derivado("nucleos_prod", necesita=("silabas_prod",))
+def _nucleos_prod(silabas_prod):
+    return _nucleos(silabas_prod)
+
+@derivado("n_codas_meta", necesita=("item", "silabas_meta"))
+def _n_codas_meta(item, silabas_meta):
+    return len(item.codas) if item else _n_codas(silabas_meta)
+
+@derivado("n_codas_prod", necesita=("silabas_prod",))
+def _n_codas_prod(silabas_prod):
+    return _n_codas(silabas_prod)
+
+# Bloques de la alineación y el par codificado con el alfabeto (memoizados en alinear)
+@derivado("alineacion", necesita=("meta", "prod"))
+def _alineacion(meta, prod):
+    return alinear(meta, prod)
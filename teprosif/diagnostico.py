@@ -0,0 +1,147 @@
+"""Edad cronológica y diagnóstico según normas TEPROSIF-R.
+
+``obtener_diagnostico`` atiende un total por llamada; ``diagnosticar_lote``
+da el mismo resultado para arreglos completos, con las normas compiladas una
+vez en tablas de numpy (que se importa solo al usarlas).
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from .datos import NORMAS_RANGOS, STATS_DETALLADO
+
+
+def calcular_edad_exacta(nacimiento, evaluacion):
+    if not nacimiento or not evaluacion: return 0, 0
+    years = evaluacion.year - nacimiento.year
+    months = evaluacion.month - nacimiento.month
+    if months < 0:
+        years -= 1; months += 12
+    elif months == 0 and evaluacion.day < nacimiento.day:
+        years -= 1; months = 11
+    return max(0, years), max(0, months)
+
+def obtener_diagnostico(total, edad_anos, modo):
+    # Sin edad (evaluación sin fecha de nacimiento) no hay norma contra la cual comparar
+    if edad_anos is None: return "Sin Datos", "gray", "", None, {}
+    edad_uso = max(3, min(edad_anos, 6))
+    norma = NORMAS_RANGOS.get(modo, {}).get(edad_uso)
+    if not norma: return "Sin Datos", "gray", "", None, {}
+    min_n, max_n = norma["N"]
+    min_r, max_r = norma["R"]
+    
+    if total <= max_n: diag, color = "NORMAL", "d-normal"
+    elif total <= max_r: diag, color = "RIESGO", "d-riesgo"
+    else: diag, color = "DÉFICIT", "d-deficit"
+    
+    txt_de = ""
+    z_score = None
+    stats_norma = {}
+    
+    if modo == "Completo" and edad_uso in STATS_DETALLADO:
+        stats_norma = STATS_DETALLADO[edad_uso]
+        prom, de_val = stats_norma["Total"]
+        z_score = (total - prom) / de_val
+        signo = "+" if z_score > 0 else ""
+        txt_de = f"({signo}{z_score:.2f} DE)"
+        
+    return diag, color, txt_de, z_score, stats_norma
+
+
+# ==========================================
+# DIAGNÓSTICO POR LOTES (NORMAS COMPILADAS EN ARREGLOS)
+# ==========================================
+
+EDADES_NORMA = (3, 4, 5, 6)
+MODOS_NORMA = tuple(NORMAS_RANGOS)
+CATEGORIAS_Z = ("Total", "E", "A", "S")
+# Código de diagnóstico → (texto, clase CSS), en el mismo orden que el if-chain escalar
+DIAGNOSTICOS = (("NORMAL", "d-normal"), ("RIESGO", "d-riesgo"), ("DÉFICIT", "d-deficit"), ("Sin Datos", "gray"))
+SIN_DATOS = 3
+
+NormasCompiladas = namedtuple("NormasCompiladas", [
+    "max_n",     # [modo, edad - 3] tope de la banda Normal (-1 si no hay norma)
+    "max_r",     # [modo, edad - 3] tope de la banda Riesgo
+    "con_norma", # [modo, edad - 3] hay norma para ese modo y edad
+    "prom",      # [categoría, edad - 3] media de STATS_DETALLADO (NaN si falta)
+    "de",        # [categoría, edad - 3] desviación estándar
+])
+
+
+@lru_cache(maxsize=1)
+def normas_compiladas():
+    """NORMAS_RANGOS y STATS_DETALLADO como arreglos indexados por (modo, edad normativa)"""
+    import numpy as np
+    forma = (len(MODOS_NORMA), len(EDADES_NORMA))
+    max_n, max_r = np.full(forma, -1, dtype=np.int64), np.full(forma, -1, dtype=np.int64)
+    con_norma = np.zeros(forma, dtype=bool)
+    for m, modo in enumerate(MODOS_NORMA):
+        for k, edad in enumerate(EDADES_NORMA):
+            norma = NORMAS_RANGOS[modo].get(edad)
+            if norma:
+                max_n[m, k], max_r[m, k], con_norma[m, k] = norma["N"][1], norma["R"][1], True
+    prom = np.full((len(CATEGORIAS_Z), len(EDADES_NORMA)), np.nan)
+    de = np.full_like(prom, np.nan)
+    for k, edad in enumerate(EDADES_NORMA):
+        for c, categoria in enumerate(CATEGORIAS_Z):
+            if edad in STATS_DETALLADO:
+                prom[c, k], de[c, k] = STATS_DETALLADO[edad][categoria]
+    return NormasCompiladas(max_n, max_r, con_norma, prom, de)
+
+
+def diagnosticar_lote(totales, edades, modos, e=None, a=None, s=None):
+    """Versión vectorizada de obtener_diagnostico para muchas evaluaciones a la vez.
+
+    `totales` y `edades` son arreglos o Series de números (edad NaN = desconocida,
+    como None en el escalar: "Sin Datos"); `modos` un arreglo de
+    textos o un único modo para todas. Devuelve un DataFrame con ``diagnostico``
+    y ``color`` (categóricos), ``z`` (NaN donde el escalar da None) y, si se pasan `e`, `a` y
+    `s`, ``z_e``, ``z_a`` y ``z_s``. Si alguna entrada es una Series, el
+    resultado conserva su índice.
+    """
+    import numpy as np
+    import pandas as pd
+    normas = normas_compiladas()
+    indice = next((x.index for x in (totales, edades, modos, e, a, s) if isinstance(x, pd.Series)), None)
+
+    totales = np.asarray(totales, dtype=np.int64)
+    n = len(totales)
+    edades = np.asarray(edades, dtype=np.float64)
+    edad_conocida = ~np.isnan(edades)
+    edad = np.clip(np.where(edad_conocida, edades, EDADES_NORMA[0]), EDADES_NORMA[0], EDADES_NORMA[-1]).astype(np.int64) - EDADES_NORMA[0]
+    if modos is None or isinstance(modos, str):
+        modo = np.full(n, MODOS_NORMA.index(modos) if modos in MODOS_NORMA else -1, dtype=np.int64)
+    elif isinstance(getattr(modos, "dtype", None), pd.CategoricalDtype):
+        # Columna categórica (p. ej. la de CacheCohorte): se recodifican las categorías, no las filas
+        por_categoria = np.array([MODOS_NORMA.index(c) if c in MODOS_NORMA else -1 for c in modos.dtype.categories] + [-1],
+                                 dtype=np.int64)
+        codigos = modos.cat.codes if isinstance(modos, pd.Series) else modos.codes
+        # El código -1 (valor nulo) lee el último elemento: modo desconocido
+        modo = por_categoria[np.asarray(codigos)]
+    else:
+        modos = np.asarray(modos, dtype=object)
+        modo = np.full(n, -1, dtype=np.int64)
+        for m, nombre in enumerate(MODOS_NORMA):
+            modo[modos == nombre] = m
+
+    conocido = modo >= 0
+    m = np.where(conocido, modo, 0)
+    con_norma = conocido & edad_conocida & normas.con_norma[m, edad]
+    codigo = np.select(
+        [~con_norma, totales <= normas.max_n[m, edad], totales <= normas.max_r[m, edad]],
+        [SIN_DATOS, 0, 1], default=2,
+    )
+
+    # Los puntajes Z solo existen en modo Completo (como en el escalar)
+    completo = con_norma & (modo == MODOS_NORMA.index("Completo"))
+    columnas = {
+        "diagnostico": pd.Categorical.from_codes(codigo, categories=[d[0] for d in DIAGNOSTICOS]),
+        "color": pd.Categorical.from_codes(codigo, categories=[d[1] for d in DIAGNOSTICOS]),
+    }
+    for c, (nombre, valores) in enumerate((("z", totales), ("z_e", e), ("z_a", a), ("z_s", s))):
+        if valores is None:
+            continue
+        valores = np.asarray(valores, dtype=np.float64)
+        z = (valores - normas.prom[c, edad]) / normas.de[c, edad]
+        columnas[nombre] = np.where(completo, z, np.nan)
+    return pd.DataFrame(columnas, index=indice)
@@ -0,0 +1,179 @@
+"""Transcripción fonémica y silabeo de palabras del test."""
+
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
+
+from .perfil import medir
+
+# --- TABLA GRAFEMA → FONEMA ---
+# Se aplica en una sola pasada de izquierda a derecha, probando siempre la regla más
+# larga primero (p. ej. "ch" antes que "c"). Las tildes se resuelven en la misma pasada,
+# por eso "cé"/"gí" tienen su propia entrada.
+REGLAS_FONEMICAS = {
+    "ch": "ĉ", "ll": "y", "rr": "R", "qu": "k", "qú": "k",
+    "ce": "se", "cé": "se", "ci": "si", "cí": "si",
+    "ge": "xe", "gé": "xe", "gi": "xi", "gí": "xi",
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u",
+    "c": "k", "j": "x", "v": "b", "z": "s", "ñ": "ɲ",
+}
+_PATRON_FONEMICO = re.compile("|".join(sorted(REGLAS_FONEMICAS, key=len, reverse=True)))
+_regla = REGLAS_FONEMICAS.__getitem__
+
+# --- SANEAMIENTO DE ENTRADA ---
+# Letras que entiende la transcripción (ortografía española y símbolos fonémicos), en minúscula
+LETRAS_TRANSCRIBIBLES = frozenset("abcdefghijklmnopqrstuvwxyzáéíóúñĉɲ")
+
+@lru_cache(maxsize=1024)
+def _letra_base(c):
+    # Letra con otro diacrítico (ü, à, ç, ...) → su letra base; espacios, dígitos y símbolos → nada
+    base = unicodedata.normalize("NFD", c)[:1]
+    return base if base in LETRAS_TRANSCRIBIBLES else ""
+
+def sanear_texto(texto):
+    """Minúsculas y solo letras transcribibles (sin espacios, dígitos, guiones ni símbolos)"""
+    t = unicodedata.normalize("NFC", texto.lower())
+    if LETRAS_TRANSCRIBIBLES.issuperset(t):
+        return t
+    return "".join([c if c in LETRAS_TRANSCRIBIBLES else _letra_base(c) for c in t])
+
+@lru_cache(maxsize=16384)
+def _transcribir(texto):
+    t = _PATRON_FONEMICO.sub(lambda m: _regla(m[0]), sanear_texto(texto))
+    if t.startswith("h") and len(t) > 1: t = t[1:]
+    return t
+
+def texto_a_fonemas(texto):
+    if not texto: return ""
+    return _transcribir(texto)
+
+def _transcribir_valor(t):
+    return _transcribir(t) if t and isinstance(t, str) else ""
+
+def textos_a_fonemas(textos):
+    """Transcribe de una vez una lista o una Series de pandas (valores no texto → "")"""
+    if hasattr(textos, "map") and hasattr(textos, "index"):
+        # pandas.Series: se devuelve otra Series con el mismo índice
+        return textos.map(_transcribir_valor)
+    return [_transcribir_valor(t) for t in textos]
+
+# --- SILABEO ---
+# Alfabeto que se considera ya transcrito (si el texto trae otras letras, se transcribe)
+_ALFABETO_FONEMICO = frozenset("aeioupcdfghjklmnñbtvwxyzĉɲRyw")
+
+# Clases de carácter del autómata silábico
+CONSONANTE, VOCAL_FUERTE, VOCAL_DEBIL = 1, 2, 3
+_CLASES = {c: CONSONANTE for c in "bcdfghjklmnpqrstvwxyzĉɲRyw"}
+_CLASES.update({c: VOCAL_FUERTE for c in "aeo"})
+_CLASES.update({c: VOCAL_DEBIL for c in "iu"})
+_CLASES = MappingProxyType(_CLASES)
+
+# Dos vocales seguidas: True = diptongo, False = hiato, None = "ia"/"io", que son hiato
+# solo cuando la sílaba tiene exactamente una consonante de ataque (p. ej. "dio")
+_DIPTONGOS = {}
+for _v1 in "aeoiu":
+    for _v2 in "aeoiu":
+        _DIPTONGOS[_v1 + _v2] = not (_CLASES[_v1] == VOCAL_FUERTE and _CLASES[_v2] == VOCAL_FUERTE)
+_DIPTONGOS["io"] = _DIPTONGOS["ia"] = None
+_DIPTONGOS = MappingProxyType(_DIPTONGOS)
+
+# Grupos consonánticos que pueden iniciar sílaba (no se separan)
+_GRUPOS_INICIALES = frozenset(["pl", "bl", "pr", "br", "tr", "dr", "kr", "gr", "fl", "kl", "gl", "fr"])
+
+# Silabeo fijo de las palabras del test, guardado como posiciones de corte
+_EXCEPCIONES = {
+    "indio": ["in", "dio"],
+    "remedio": ["re", "me", "dio"],
+    "edifisio": ["e", "di", "fi", "sio"],
+    "dinosaurio": ["di", "no", "sau", "rio"],
+    "auto": ["au", "to"],
+    "xaula": ["xau", "la"],
+    "rueda": ["rue", "da"],
+    "peineta": ["pei", "ne", "ta"],
+    "kuaderno": ["kua", "der", "no"],
+    "puente": ["puen", "te"],
+    "guante": ["guan", "te"],
+    "planĉa": ["plan", "ĉa"],
+    "mariposa": ["ma", "ri", "po", "sa"],
+    "bisicleta": ["bi", "si", "cle", "ta"],
+    "helikoptero": ["he", "li", "kop", "te", "ro"],
+    "bufanda": ["bu", "fan", "da"],
+    "kaperusita": ["ka", "pe", "ru", "si", "ta"],
+    "alfombra": ["al", "fom", "bra"],
+    "refrixerador": ["re", "fri", "xe", "ra", "dor"],
+    "kalsetin": ["kal", "se", "tin"],
+    "telefono": ["te", "le", "fo", "no"],
+    "mikro": ["mi", "kro"],
+    "tren": ["tren"],
+    "platano": ["pla", "ta", "no"],
+    "xugo": ["xu", "go"],
+    "enĉufe": ["en", "ĉu", "fe"],
+    "xabon": ["xa", "bon"],
+    "tambor": ["tam", "bor"],
+    "bolantin": ["bo", "lan", "tin"],
+    "xirafa": ["xi", "ra", "fa"],
+    "goRo": ["go", "Ro"],
+    "arbol": ["ar", "bol"],
+    "dulse": ["dul", "se"],
+    "gitaRa": ["gi", "ta", "Ra"],
+    "relox": ["re", "lox"],
+    "pantalon": ["pan", "ta", "lon"],
+    "kamion": ["ka", "mion"],
+}
+EXCEPCIONES_SILABICAS = MappingProxyType({
+    palabra: tuple(accumulate(len(sil) for sil in silabas))
+    for palabra, silabas in _EXCEPCIONES.items()
+})
+del _EXCEPCIONES, _v1, _v2
+
+def limites_silabicos(t):
+    """Posiciones de fin de cada sílaba de `t` (texto ya transcrito), sin crear subcadenas"""
+    cortes = EXCEPCIONES_SILABICAS.get(t)
+    if cortes is not None:
+        return cortes
+
+    # Un carácter fuera de las clases (espacio, dígito, letra sin transcribir) cuenta como
+    # consonante: así cada vuelta consume al menos un carácter y el recorrido es lineal
+    clase = _CLASES.get
+    n = len(t)
+    cortes = []
+    i = 0
+    while i < n:
+        inicio = i
+        # Ataque: todas las consonantes seguidas
+        while i < n and clase(t[i], CONSONANTE) == CONSONANTE:
+            i += 1
+        # Núcleo: una vocal, o dos si forman diptongo
+        if i < n and clase(t[i], 0) > CONSONANTE:
+            i += 1
+            if i < n and clase(t[i], 0) > CONSONANTE:
+                es_diptongo = _DIPTONGOS[t[i - 1:i + 1]]
+                if es_diptongo is None:
+                    es_diptongo = i - inicio != 2
+                if es_diptongo:
+                    i += 1
+        # Coda: una consonante, salvo que inicie un grupo con la siguiente
+        if i < n and clase(t[i], CONSONANTE) == CONSONANTE:
+            if i + 1 < n:
+                if clase(t[i + 1], CONSONANTE) == CONSONANTE and t[i:i + 2] not in _GRUPOS_INICIALES:
+                    i += 1
+            else:
+                i += 1
+        if i > inicio:
+            cortes.append(i)
+    return tuple(cortes)
+
+@medir("silabeo")
+def silabear_texto_mejorado(texto):
+    """Silabeo mejorado en ALFABETO FONÉTICO"""
+    t = texto if _ALFABETO_FONEMICO.issuperset(texto.lower()) else texto_a_fonemas(texto)
+    if not t:
+        return []
+    inicio = 0
+    silabas = []
+    for fin in limites_silabicos(t):
+        silabas.append(t[inicio:fin])
+        inicio = fin
+    return silabas
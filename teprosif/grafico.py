@@ -0,0 +1,73 @@
+"""Curva normal de interpretación como especificación Vega-Lite.
+
+La curva N(0, 1), sus regiones y la configuración visual se calculan y se
+serializan una sola vez por proceso; en cada rerun solo se agregan las capas
+del paciente (regla y etiqueta) y, si se pide, la distribución de una cohorte.
+Altair se importa únicamente la primera vez que se construye la base.
+"""
+
+import math
+from functools import lru_cache
+
+
+def _region(z):
+    if z < 1: return "Normal"
+    if z < 2: return "Riesgo"
+    return "Déficit"
+
+# 80 puntos de la densidad normal estándar entre -3.5 y 4.4 DE
+PUNTOS_CURVA = tuple(
+    {"z": z, "y": (1/(math.sqrt(2*math.pi)))*math.exp(-0.5*z**2), "r": _region(z)}
+    for z in (x/10.0 for x in range(-35, 45))
+)
+EXTENSION_Z = (PUNTOS_CURVA[0]["z"], PUNTOS_CURVA[-1]["z"])
+
+
+@lru_cache(maxsize=1)
+def especificacion_base():
+    """Capas fijas (área por región + línea) ya serializadas a dict de Vega-Lite"""
+    import altair as alt
+    base = alt.Chart(alt.Data(values=[dict(p) for p in PUNTOS_CURVA])).encode(
+        x=alt.X('z:Q', title='Puntaje Z'), y=alt.Y('y:Q', axis=None)
+    )
+    area = base.mark_area(opacity=0.5).encode(color=alt.Color('r:N', scale=alt.Scale(domain=['Normal','Riesgo','Déficit'], range=['#c8e6c9','#ffe0b2','#ffcdd2']), legend=alt.Legend(title="Estado", orient="bottom")))
+    line = base.mark_line(color='black', strokeWidth=1)
+    grafico = (area + line).properties(height=350).configure(background='white').configure_axis(labelColor='black', titleColor='black').configure_legend(labelColor='black', titleColor='black').configure_view(strokeWidth=0)
+    return grafico.to_dict()
+
+
+def _capas_paciente(z_paciente):
+    datos = {"values": [{"z": z_paciente, "t": "PACIENTE"}]}
+    regla = {
+        "data": datos, "mark": {"type": "rule", "color": "black", "size": 2, "strokeDash": [5, 5]},
+        "encoding": {"x": {"field": "z", "type": "quantitative"}},
+    }
+    texto = {
+        "data": datos,
+        "mark": {"type": "text", "align": "left", "dx": 5, "dy": -100, "color": "black", "fontWeight": "bold"},
+        "encoding": {"x": {"field": "z", "type": "quantitative"}, "text": {"field": "t", "type": "nominal"}},
+    }
+    return [regla, texto]
+
+
+def _capa_cohorte(z_cohorte):
+    # Densidad estimada (KDE) de los puntajes Z: integra 1, igual que la curva normal
+    return {
+        "data": {"values": [{"z": z} for z in z_cohorte]},
+        "transform": [{"density": "z", "extent": list(EXTENSION_Z), "as": ["z", "y"]}],
+        "mark": {"type": "line", "color": "#1976d2", "strokeWidth": 2, "strokeDash": [2, 2]},
+        "encoding": {"x": {"field": "z", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}},
+    }
+
+
+def especificacion_curva(z_paciente=None, z_cohorte=None):
+    """Especificación completa: base cacheada + paciente (+ cohorte) sin recalcular la base"""
+    base = especificacion_base()
+    capas = list(base["layer"])
+    if z_cohorte:
+        capas.append(_capa_cohorte(z_cohorte))
+    if z_paciente is not None:
+        capas.extend(_capas_paciente(z_paciente))
+    especificacion = dict(base)
+    especificacion["layer"] = capas
+    return especificacion
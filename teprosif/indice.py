@@ -0,0 +1,86 @@
+"""Índice precompilado de los ítems del test, construido una sola vez al importar.
+
+Cada ítem de PALABRAS_TEST / METADATA_PALABRAS se transcribe y se descompone
+(sílabas, núcleos, codas, grupos consonánticos, diptongos y rasgos por fonema)
+al cargar el módulo. La interfaz, el analizador y el informe leen de aquí en
+vez de recalcular lo mismo en cada rerun.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from .datos import METADATA_PALABRAS, PALABRAS_TEST, FONEMAS, GRUPOS
+from .fonologia import texto_a_fonemas
+
+# Dífonos consonánticos (grupos) que puede reducir el niño (E.1)
+DIFONOS = ("pl", "bl", "fl", "kl", "gl", "pr", "br", "fr", "kr", "gr", "tr", "dr")
+
+ItemObjetivo = namedtuple("ItemObjetivo", [
+    "indice",     # posición en la hoja (0..36), usada en las claves de sesión
+    "num",        # número del ítem como texto ("1".."37")
+    "nombre",     # palabra tal como aparece en la hoja ("Plátano")
+    "palabra",    # palabra de METADATA_PALABRAS ("plátano")
+    "meta_fon",   # transcripción fonémica de la palabra meta
+    "silabas",    # sílabas ortográficas de METADATA_PALABRAS
+    "limites",    # (inicio, fin) de cada sílaba dentro de meta_fon
+    "tonica",     # índice de la sílaba tónica
+    "nucleos",    # vocales de cada sílaba (núcleo + diptongo)
+    "codas",      # posiciones en meta_fon de las consonantes trabantes
+    "grupos",     # (posición, dífono) de cada grupo consonántico
+    "diptongos",  # (posición, diptongo) de cada dífono vocálico
+    "rasgos",     # (zona, modo, voz) de cada fonema de meta_fon, o None
+])
+
+
+def _posiciones(texto, patrones):
+    """(posición, patrón) de cada aparición de los patrones, en orden de posición"""
+    encontrados = []
+    for patron in patrones:
+        pos = texto.find(patron)
+        while pos != -1:
+            encontrados.append((pos, patron))
+            pos = texto.find(patron, pos + len(patron))
+    return tuple(sorted(encontrados))
+
+
+def _construir_item(indice, etiqueta):
+    num, nombre = etiqueta.split(". ")
+    info = METADATA_PALABRAS[num]
+    meta_fon = texto_a_fonemas(info["word"])
+
+    # Las sílabas de METADATA son ortográficas: se transcriben una a una para ubicarlas
+    limites = []
+    ini = 0
+    for sil in info["syl"]:
+        fin = ini + len(texto_a_fonemas(sil))
+        limites.append((ini, fin))
+        ini = fin
+    if ini != len(meta_fon):
+        raise ValueError(f"Las sílabas del ítem {num} no reconstruyen /{meta_fon}/")
+
+    nucleos = tuple("".join(c for c in sil if c in GRUPOS["vocales"]) for sil in info["syl"])
+    # Misma regla que el analizador: sílaba de más de un fonema terminada en trabante
+    codas = tuple(
+        fin - 1 for sil, (_, fin) in zip(info["syl"], limites)
+        if len(sil) > 1 and sil[-1] in GRUPOS["trabantes"]
+    )
+    rasgos = tuple(
+        (FONEMAS[c]["zona"], FONEMAS[c]["modo"], FONEMAS[c]["voz"]) if c in FONEMAS else None
+        for c in meta_fon
+    )
+    return ItemObjetivo(
+        indice=indice, num=num, nombre=nombre, palabra=info["word"], meta_fon=meta_fon,
+        silabas=tuple(info["syl"]), limites=tuple(limites), tonica=info.get("tonic", 0),
+        nucleos=nucleos, codas=codas, grupos=_posiciones(meta_fon, DIFONOS),
+        diptongos=_posiciones(meta_fon, GRUPOS["diptongos"]), rasgos=rasgos,
+    )
+
+
+# Ítems en el orden de la hoja de respuestas y acceso por número de ítem
+ITEMS_TEST = tuple(_construir_item(i, etiqueta) for i, etiqueta in enumerate(PALABRAS_TEST))
+INDICE_ITEMS = MappingProxyType({item.num: item for item in ITEMS_TEST})
+
+
+def obtener_item(num_item):
+    """Registro precompilado del ítem `num_item` (número o texto), o None"""
+    return INDICE_ITEMS.get(str(num_item))
@@ -0,0 +1,493 @@
+"""Informe clínico en PDF (requiere fpdf) y su generación en segundo plano."""
+
+import hashlib
+import importlib.util
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from .datos import PREFIJOS_ITEM, TIPOS_RESPUESTA
+from .indice import ITEMS_TEST
+from .diagnostico import calcular_edad_exacta, obtener_diagnostico
+from .perfil import medir, propagar
+
+# --- FPDF ---
+# Se importa recién al generar el primer informe: abrir la app o puntuar
+# evaluaciones no paga su carga (ni la necesita instalada).
+fpdf_available = importlib.util.find_spec("fpdf") is not None
+# Las plantillas copian operaciones y estado internos de pyfpdf: solo se usan con
+# la versión probada (requirements.txt la fija); con otra se dibuja todo cada vez.
+FPDF_PROBADA = "1.7.2"
+
+# --- GENERADOR PDF CORREGIDO ---
+# Lo fijo de cada página (títulos, rótulos, bordes, grilla de ítems, leyenda, firma)
+# se dibuja una sola vez por proceso y diseño: se guardan las operaciones PDF que
+# produjo y la posición de cada dato variable. Cada informe copia esas operaciones
+# y solo escribe los datos del paciente, los puntajes y las filas de ítems.
+# Si fpdf no es la versión probada, cada informe dibuja la página entera.
+_CLASE_PDF = None
+_lock_clase = threading.Lock()   # GeneradorInformes la pide desde varios hilos
+
+def _clase_pdf():
+    """Clase del documento (subclase de FPDF); importa fpdf la primera vez"""
+    global _CLASE_PDF
+    if _CLASE_PDF is not None:
+        return _CLASE_PDF
+    with _lock_clase:
+        if _CLASE_PDF is not None:
+            return _CLASE_PDF
+        from fpdf import FPDF
+
+        class PDF(FPDF):
+            def __init__(self):
+                super().__init__()
+                # Fuentes registradas siempre en el mismo orden: las plantillas las nombran por número (/F1, /F2, ...)
+                for estilo in ("B", "", "I"):
+                    self.set_font('Arial', estilo, 10)
+                self.font_family = ""
+
+            def header(self):
+                # Solo muestra cabecera de informe clínico en página 1
+                if self.page_no() == 1:
+                    self.set_font('Arial', 'B', 14)
+                    self.cell(0, 10, 'INFORME DE EVALUACIÓN FONOLÓGICA (TEPROSIF-R)', 0, 1, 'C')
+                    self.set_draw_color(50, 50, 50)
+                    self.line(10, 20, 200, 20)
+                    self.ln(5)
+
+            def footer(self):
+                # Pie de página simple
+                self.set_y(-15)
+                self.set_font('Arial', 'I', 8)
+                self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
+
+        PDF.con_plantillas = _fpdf_compatible(PDF)
+        _CLASE_PDF = PDF
+    return _CLASE_PDF
+
+def _fpdf_compatible(clase):
+    """¿Tiene fpdf lo que usan _Grabador y _estampar? (versión e internos de una página de prueba)"""
+    import fpdf
+    if getattr(fpdf, "__version__", None) != FPDF_PROBADA:
+        return False
+    try:
+        pdf = clase()
+        pdf.add_page()
+        return (isinstance(pdf.pages, dict) and isinstance(pdf.pages[pdf.page], str)
+                and pdf.font_family + pdf.font_style in pdf.fonts
+                and all(hasattr(pdf, a) for a in _ESTADO + ("current_font",)))
+    except Exception:
+        return False
+
+Plantilla = namedtuple("Plantilla", [
+    "operaciones",  # operaciones PDF de la parte fija de la página
+    "estado",       # estado de FPDF al terminarla (valores de _ESTADO)
+    "campos",       # (clave, x, y, w, h, align, estilo, tamaño) de cada dato variable
+])
+_ESTADO = ("font_family", "font_style", "font_size_pt", "font_size", "underline", "line_width",
+           "draw_color", "fill_color", "text_color", "color_flag", "x", "y", "lasth")
+
+# (números de ítem, con análisis estadístico) → (página de resultados, hoja de respuestas)
+_PLANTILLAS = {}
+
+def _latin1(texto):
+    return texto.encode('latin-1', 'replace').decode('latin-1')
+
+class _Grabador:
+    """Anota lo que se dibuja en la página actual y dónde van los datos variables"""
+
+    def __init__(self, pdf):
+        self.pdf, self.campos = pdf, []
+        self.pagina, self.inicio = pdf.page, len(pdf.pages[pdf.page])
+        self._estado_inicial()
+
+    def _estado_inicial(self):
+        # La parte fija fija su propio estado: no depende de lo que haya antes en la página
+        pdf = self.pdf
+        pdf.font_family = ""
+        pdf.set_font('Arial', '', 10)
+        pdf.set_draw_color(50, 50, 50)
+        pdf.set_fill_color(255)
+        pdf.set_line_width(pdf.line_width)
+
+    def campo(self, clave, w, h, border=0, ln=0, align='', fill=0):
+        """Celda con su borde y fondo, vacía: el texto lo escribe cada informe"""
+        pdf = self.pdf
+        self.campos.append((clave, pdf.x, pdf.y, w, h, align, pdf.font_style, pdf.font_size_pt))
+        pdf.cell(w, h, '', border, ln, align, fill)
+
+    def plantilla(self):
+        pdf = self.pdf
+        if pdf.page != self.pagina:
+            raise RuntimeError("La parte fija del informe no entra en una página")
+        return Plantilla(pdf.pages[pdf.page][self.inicio:], tuple(getattr(pdf, a) for a in _ESTADO), tuple(self.campos))
+
+class _Directo(_Grabador):
+    """Como _Grabador, pero sin tocar las operaciones de la página: la parte fija se dibuja entera"""
+
+    def __init__(self, pdf):
+        self.pdf, self.campos = pdf, []
+        self._estado_inicial()
+
+    def escribir(self, valores):
+        """Escribe los datos en los campos, como _estampar sobre una plantilla"""
+        pdf = self.pdf
+        x, y, lasth = pdf.x, pdf.y, pdf.lasth
+        _escribir_campos(pdf, self.campos, valores)
+        pdf.x, pdf.y, pdf.lasth = x, y, lasth
+
+def _escribir_campos(pdf, campos, valores):
+    for clave, x, y, w, h, align, estilo, tamano in campos:
+        txt = valores.get(clave)
+        if txt:
+            pdf.set_font('Arial', estilo, tamano)
+            pdf.set_xy(x, y)
+            pdf.cell(w, h, txt, 0, 0, align)
+
+def _estampar(pdf, plantilla, valores):
+    """Copia la parte fija en la página actual y escribe los `valores` no vacíos en sus campos"""
+    pdf.pages[pdf.page] += plantilla.operaciones
+    for atributo, valor in zip(_ESTADO, plantilla.estado):
+        setattr(pdf, atributo, valor)
+    pdf.current_font = pdf.fonts[pdf.font_family + pdf.font_style]
+    _escribir_campos(pdf, plantilla.campos, valores)
+    pdf.x, pdf.y, pdf.lasth = plantilla.estado[-3:]
+
+def _parte_fija(pdf, plantilla, dibujar, valores, *args):
+    """Parte fija de la página con sus `valores`: copiada de la plantilla o, si no hay, dibujada.
+
+    Ambos caminos dan el mismo PDF byte a byte (benchmarks/bench_informe.py lo verifica).
+    """
+    if plantilla is not None:
+        _estampar(pdf, plantilla, valores)
+    else:
+        directo = _Directo(pdf)
+        dibujar(pdf, directo, *args)
+        directo.escribir(valores)
+
+def _plantillas(lista_items, con_stats):
+    """Partes fijas de ambas páginas para estos ítems (se arman una vez por proceso)"""
+    clave = (tuple(item.num for item in lista_items), con_stats)
+    plantillas = _PLANTILLAS.get(clave)
+    if plantillas is None:
+        pdf = _clase_pdf()()
+        pdf.set_margins(10, 10, 10)
+        pdf.add_page()
+        pdf.set_margins(15, 15, 15)
+        grabador = _Grabador(pdf)
+        _fijo_resultados(pdf, grabador, con_stats)
+        resultados = grabador.plantilla()
+        pdf.add_page()
+        pdf.set_margins(10, 10, 10)
+        grabador = _Grabador(pdf)
+        _fijo_respuestas(pdf, grabador, lista_items)
+        # Dos hilos pueden armar la misma a la vez: quedan iguales, gana cualquiera
+        plantillas = _PLANTILLAS[clave] = (resultados, grabador.plantilla())
+    return plantillas
+
+# =======================================================
+# PÁGINA 1: INFORME ESCRITO
+# =======================================================
+def _fijo_resultados(pdf, g, con_stats):
+    # 1. ANTECEDENTES
+    pdf.set_fill_color(240); pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 8, " 1. ANTECEDENTES DEL PACIENTE", 0, 1, 'L', fill=True)
+    pdf.ln(3)
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(30, 7, "Nombre:", 1); g.campo("nombre", 60, 7, 1)
+    pdf.cell(30, 7, "Fecha Eval:", 1); g.campo("fecha_eval", 60, 7, 1, 1)
+    pdf.cell(30, 7, "F. Nac:", 1); g.campo("fecha_nac", 60, 7, 1)
+    pdf.cell(30, 7, "Edad:", 1); g.campo("edad", 60, 7, 1, 1)
+    pdf.cell(30, 7, "Evaluación:", 1); g.campo("modo", 60, 7, 1, 1)
+    pdf.ln(6)
+
+    # 2. RESULTADOS
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 8, " 2. RESULTADOS CUANTITATIVOS", 0, 1, 'L', fill=True)
+    pdf.ln(3)
+    pdf.set_font('Arial', 'B', 9)
+    pdf.set_fill_color(230)
+    headers = ["TOTAL PSF", "ESTRUCTURA", "ASIMILACIÓN", "SUSTITUCIÓN"]
+    w = [45, 45, 45, 45]
+    for i, h in enumerate(headers): pdf.cell(w[i], 7, h, 1, 0, 'C', fill=True)
+    pdf.ln()
+    pdf.set_font('Arial', '', 11)
+    g.campo("total", 45, 10, 1, 0, 'C')
+    g.campo("e", 45, 10, 1, 0, 'C')
+    g.campo("a", 45, 10, 1, 0, 'C')
+    g.campo("s", 45, 10, 1, 1, 'C')
+    pdf.ln(8)
+
+    # 3. ANÁLISIS ESTADÍSTICO
+    if con_stats:
+        pdf.set_font('Arial', 'B', 11); pdf.set_fill_color(240)
+        pdf.cell(0, 8, " 3. ANÁLISIS ESTADÍSTICO", 0, 1, 'L', fill=True)
+        pdf.ln(3)
+        pdf.set_font('Arial', 'B', 9); pdf.set_fill_color(220, 230, 240)
+        hd = ["ÍNDICE", "PROMEDIO", "D.E.", "PTJE. NIÑO", "INTERPRETACIÓN"]
+        wc = [35, 30, 30, 30, 55]
+        for i, h in enumerate(hd): pdf.cell(wc[i], 7, h, 1, 0, 'C', fill=True)
+        pdf.ln()
+        pdf.set_font('Arial', '', 9)
+        for k, lbl in enumerate(_FILAS_STATS):
+            pdf.cell(wc[0], 7, lbl, 1, 0, 'L')
+            g.campo(f"prom_{k}", wc[1], 7, 1, 0, 'C')
+            g.campo(f"desv_{k}", wc[2], 7, 1, 0, 'C')
+            g.campo(f"val_{k}", wc[3], 7, 1, 0, 'C')
+            g.campo(f"estado_{k}", wc[4], 7, 1, 1, 'C')
+        pdf.ln(5)
+
+    # 4. OBSERVACIONES GENERALES (el texto, de alto variable, lo escribe cada informe)
+    pdf.set_font('Arial', 'B', 11); pdf.set_fill_color(240)
+    pdf.cell(0, 8, " 4. OBSERVACIONES GENERALES", 0, 1, 'L', fill=True)
+    pdf.ln(3)
+
+_FILAS_STATS = ("Total PSF", "Estructura", "Asimilación", "Sustitución")
+
+# =======================================================
+# PÁGINA 2: HOJA DE RESPUESTAS REPLICA (EN UNA SOLA PÁGINA)
+# =======================================================
+# Anchos de la tabla de registro comprimida
+W_PAL = 35; W_REG = 50; W_E = 18; W_A = 18; W_S = 18; W_TOT = 15; W_OBS = 35
+
+def _fijo_respuestas(pdf, g, lista_items):
+    # --- ENCABEZADO REORGANIZADO (TÍTULO PRIMERO) ---
+
+    # TÍTULO CENTRAL
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 6, "HOJA DE RESPUESTAS TEPROSIF-R", 0, 1, 'C')
+    pdf.set_font('Arial', '', 8)
+    pdf.cell(0, 4, "(Ma. M. Pavez - M. Maggiolo - C. J. Coloma)", 0, 1, 'C')
+    pdf.ln(4)
+
+    # Fila 1: Nombre y F.N.
+    pdf.set_font('Arial', '', 9)
+    pdf.cell(15, 6, "Nombre:", 0, 0, 'L')
+    g.campo("nombre", 110, 6, "B", 0, 'L')
+    pdf.cell(10, 6, "F.N:", 0, 0, 'L')
+    g.campo("fecha_nac", 55, 6, "B", 1, 'L')
+
+    pdf.ln(2)
+
+    # Fila 2: Edad, Examinador, Fecha
+    pdf.cell(12, 6, "Edad:", 0, 0)
+    g.campo("edad", 40, 6, "B", 0)
+    pdf.cell(22, 6, "Examinador:", 0, 0)
+    pdf.cell(65, 6, "", "B", 0)
+    pdf.cell(12, 6, "Fecha:", 0, 0)
+    g.campo("fecha_eval", 39, 6, "B", 1)
+    pdf.ln(4) # Menos espacio para ahorrar hoja
+
+    # --- TABLA DE REGISTRO COMPRIMIDA ---
+    # Encabezados
+    pdf.set_font('Arial', 'B', 8)
+    pdf.set_fill_color(255)
+
+    # Altura reducida de cabecera (6mm)
+    pdf.cell(W_PAL, 6, "ITEM", 1, 0, 'C')
+    pdf.cell(W_REG, 6, "REGISTRO", 1, 0, 'C')
+    pdf.cell(W_E, 6, "E. SILAB.", 1, 0, 'C')
+    pdf.cell(W_A, 6, "ASIMIL.", 1, 0, 'C')
+    pdf.cell(W_S, 6, "SUSTIT.", 1, 0, 'C')
+    pdf.cell(W_TOT, 6, "TOTAL", 1, 0, 'C')
+    pdf.cell(W_OBS, 6, "O.RESP (*)", 1, 1, 'C')
+
+    pdf.set_font('Arial', '', 8) # Letra más pequeña para que entre
+
+    for i, item in enumerate(lista_items):
+        # Altura reducida de fila (5mm)
+        h_row = 5
+        pdf.cell(W_PAL, h_row, f"{item.num}. {_latin1(item.nombre.upper())}", 1, 0, 'L')
+        g.campo(f"reg_{i}", W_REG, h_row, 1, 0, 'C')
+        g.campo(f"e_{i}", W_E, h_row, 1, 0, 'C')
+        g.campo(f"a_{i}", W_A, h_row, 1, 0, 'C')
+        g.campo(f"s_{i}", W_S, h_row, 1, 0, 'C')
+        pdf.set_fill_color(240)
+        g.campo(f"tot_{i}", W_TOT, h_row, 1, 0, 'C', True)
+        pdf.set_fill_color(255)
+        g.campo(f"obs_{i}", W_OBS, h_row, 1, 1, 'C')
+
+        # Corte visual si es barrido (Compacto)
+        if i == 14:
+            pdf.set_font('Arial', 'B', 7)
+            pdf.cell(W_PAL + W_REG, 5, "TOTAL BARRIDO", 1, 0, 'R')
+            pdf.set_fill_color(200)
+            pdf.cell(W_E+W_A+W_S+W_TOT+W_OBS, 5, "", 1, 1, 'C', fill=True)
+            pdf.set_fill_color(255)
+            pdf.set_font('Arial', '', 8)
+
+    pdf.ln(2)
+    pdf.set_font('Arial', 'B', 9)
+    pdf.cell(W_PAL + W_REG + W_E + W_A + W_S, 6, "TOTAL TEPROSIF COMPLETO:", 1, 0, 'R')
+    g.campo("total", W_TOT, 6, 1, 1, 'C')
+    pdf.ln(3)
+
+    pdf.set_font('Arial', '', 6) # Letra pequeña para leyenda
+    pdf.multi_cell(0, 3, "(*) OTRAS RESPUESTAS: (NR) No responde, (NT) No transcribible, (OP) Otra palabra.", 0, 'L')
+
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 8)
+    pdf.cell(0, 5, "__________________________", 0, 1, 'R')
+    pdf.cell(0, 5, "FIRMA Y TIMBRE              ", 0, 1, 'R')
+
+def _valores_respuestas(lista_items, estados_sesion):
+    """Textos de cada fila de la hoja de respuestas"""
+    valores = {}
+    for i, item in enumerate(lista_items):
+        # Obtener datos usando la clave correcta
+        tipo_resp = estados_sesion.get(f"type_{i}", "Respuesta Válida")
+        es_correcto = estados_sesion.get(f"ok_{i}", False)
+        raw_input = estados_sesion.get(f"in_{i}", "")
+
+        if tipo_resp != "Respuesta Válida":
+            valores[f"obs_{i}"] = tipo_resp
+            valores[f"reg_{i}"] = "-"
+        elif es_correcto:
+            # Si es correcto, escribimos la palabra original en minúscula
+            valores[f"reg_{i}"] = _latin1(item.nombre.lower())
+            for c in ("e", "a", "s", "tot"): valores[f"{c}_{i}"] = "0"
+        else:
+            # --- CORRECCIÓN: USAR ALFABETO NORMAL Y MINÚSCULA ---
+            valores[f"reg_{i}"] = _latin1(raw_input.lower().strip()) if raw_input else ""
+            val_e = estados_sesion.get(f"e_{i}", 0)
+            val_a = estados_sesion.get(f"a_{i}", 0)
+            val_s = estados_sesion.get(f"s_{i}", 0)
+            suma = val_e + val_a + val_s
+            valores[f"e_{i}"] = str(val_e) if val_e > 0 else ""
+            valores[f"a_{i}"] = str(val_a) if val_a > 0 else ""
+            valores[f"s_{i}"] = str(val_s) if val_s > 0 else ""
+            valores[f"tot_{i}"] = str(suma) if suma > 0 else ""
+    return valores
+
+# FUNCIÓN DE PDF ROBUSTA CON MANEJO DE FECHAS
+@medir("pdf")
+def crear_pdf_avanzado(nombre, fecha_nac, edad_txt, fecha_eval, total, e, a, s, diag, z_score, modo, stats, lista_items, estados_sesion, observaciones=""):
+    con_stats = bool(modo == "Completo" and stats)
+    clase = _clase_pdf()
+    resultados, respuestas = _plantillas(lista_items, con_stats) if clase.con_plantillas else (None, None)
+    pdf = clase()
+    pdf.set_margins(10, 10, 10)
+
+    # PÁGINA 1: datos del paciente, puntajes y análisis sobre la plantilla
+    pdf.add_page()
+    pdf.set_margins(15, 15, 15)
+    valores = {
+        "nombre": _latin1(nombre), "fecha_eval": str(fecha_eval), "fecha_nac": str(fecha_nac),
+        "edad": _latin1(edad_txt), "modo": modo,
+        "total": str(total), "e": str(e), "a": str(a), "s": str(s),
+    }
+    if con_stats:
+        data_rows = [(stats["Total"], total), (stats["E"], e), (stats["A"], a), (stats["S"], s)]
+        for k, ((prom, desv), val) in enumerate(data_rows):
+            z = (val - prom) / desv
+            estado = "Normal"
+            if z > 1: estado = "Riesgo (> +1 DE)"
+            if z > 2: estado = "Déficit (> +2 DE)"
+            valores.update({f"prom_{k}": str(prom), f"desv_{k}": str(desv), f"val_{k}": str(val), f"estado_{k}": estado})
+    _parte_fija(pdf, resultados, _fijo_resultados, valores, con_stats)
+
+    # 4. OBSERVACIONES GENERALES
+    pdf.set_font('Arial', '', 10)
+    obs_text = observaciones if observaciones else "Sin observaciones."
+    pdf.multi_cell(0, 5, _latin1(obs_text))
+    pdf.ln(6)
+
+    # 5. CONCLUSIÓN
+    pdf.set_font('Arial', 'B', 11); pdf.set_fill_color(240)
+    pdf.cell(0, 8, " 5. CONCLUSIÓN DIAGNÓSTICA", 0, 1, 'L', fill=True)
+    pdf.ln(3)
+    pdf.set_font('Arial', '', 10)
+    texto = f"El desempeño fonológico corresponde a un rango de {diag}."
+    if z_score is not None: 
+        texto += f" Puntaje Z global: {z_score:+.2f} DE."
+        
+        # --- LÓGICA INTELIGENTE AÑADIDA PARA ESTRUCTURA ---
+        # Si el puntaje Z de Estructura es mayor a 2 (Déficit), se añade el párrafo automático.
+        z_e_val = (e - stats["E"][0]) / stats["E"][1]
+        if z_e_val > 2:
+            texto += "\n\nSe observa un predominio de procesos de simplificación de la estructura silábica, lo que sugiere dificultades en la metría de la palabra y grupos consonánticos."
+        
+    pdf.multi_cell(0, 5, _latin1(texto))
+
+    # PÁGINA 2: hoja de respuestas sobre la plantilla
+    pdf.add_page()
+    pdf.set_margins(10, 10, 10)
+    valores = _valores_respuestas(lista_items, estados_sesion)
+    valores.update(nombre=_latin1(nombre), fecha_nac=str(fecha_nac), edad=_latin1(edad_txt),
+                   fecha_eval=str(fecha_eval), total=str(total))
+    _parte_fija(pdf, respuestas, _fijo_respuestas, valores, lista_items)
+
+    return pdf.output(dest="S").encode("latin-1")
+
+
+# --- GENERACIÓN BAJO DEMANDA ---
+
+def datos_informe(estados):
+    """Argumentos de crear_pdf_avanzado para una evaluación guardada (claves de sesión).
+
+    Devuelve (datos, lista_items, estados de ítems), con los mismos valores que
+    arma la interfaz: totales E/A/S de las respuestas válidas no marcadas como
+    correctas, dentro de los ítems del modo.
+    """
+    nombre = estados.get("nombre_paciente_temp") or ""
+    fecha_nac = estados.get("fecha_nac") or date(2020, 1, 1)
+    fecha_eval = estados.get("fecha_eval") or date.today()
+    modo = estados.get("modo") or "Completo"
+    lista = ITEMS_TEST[:15] if modo == "Barrido" else ITEMS_TEST
+    e = a = s = 0
+    for i in range(len(lista)):
+        if estados.get(f"type_{i}", TIPOS_RESPUESTA[0]) == TIPOS_RESPUESTA[0] and not estados.get(f"ok_{i}", False):
+            e += estados.get(f"e_{i}", 0); a += estados.get(f"a_{i}", 0); s += estados.get(f"s_{i}", 0)
+    anos, meses = calcular_edad_exacta(fecha_nac, fecha_eval)
+    diag, _, _, z_score, stats = obtener_diagnostico(e + a + s, anos, modo)
+    datos = dict(
+        nombre=nombre, fecha_nac=fecha_nac, edad_txt=f"{anos} años, {meses} meses", fecha_eval=fecha_eval,
+        total=e + a + s, e=e, a=a, s=s, diag=diag, z_score=z_score, modo=modo, stats=stats,
+        observaciones=estados.get("observaciones") or "",
+    )
+    return datos, lista, {k: v for k, v in estados.items() if k.startswith(PREFIJOS_ITEM)}
+
+def huella_informe(datos, estados_sesion):
+    """Huella de todo lo que cambia el informe: datos del paciente, puntajes y claves de ítems"""
+    contenido = json.dumps([datos, estados_sesion], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+class GeneradorInformes:
+    """Genera PDFs en hilos aparte y guarda los últimos por huella de sus datos"""
+
+    def __init__(self, max_informes=32, hilos=2):
+        self.max_informes = max_informes
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="informe-pdf")
+        self._futuros = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, huella):
+        """Futuro del informe con esa huella, o None si nunca se pidió"""
+        with self._lock:
+            futuro = self._futuros.get(huella)
+            if futuro is not None:
+                self._futuros.move_to_end(huella)
+            return futuro
+
+    def solicitar(self, huella, lista_items, estados_sesion, destino_perfil=None, archivo_perfil=None, **datos):
+        """Encola la generación (si no estaba ya) y devuelve su futuro.
+
+        Si la sesión está perfilando, el PDF se mide como una corrida aparte que
+        se agrega a `destino_perfil` (y a `archivo_perfil`) al terminar.
+        """
+        with self._lock:
+            futuro = self._futuros.get(huella)
+            if futuro is None:
+                generar = propagar(crear_pdf_avanzado, "informe pdf", destino_perfil, archivo_perfil)
+                futuro = self._executor.submit(
+                    generar, lista_items=lista_items, estados_sesion=estados_sesion, **datos
+                )
+                self._futuros[huella] = futuro
+                while len(self._futuros) > self.max_informes:
+                    self._futuros.popitem(last=False)
+            return futuro
+
+# Compartido por todas las sesiones del proceso
+INFORMES = GeneradorInformes()
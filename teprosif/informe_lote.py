@@ -0,0 +1,186 @@
+"""Informes PDF de todas las evaluaciones guardadas, en un único ZIP.
+
+Uso:
+    python -m teprosif.informe_lote informes.zip [--db sesiones_teprosif.db] [--procesos 4]
+    python -m teprosif.informe_lote informes.zip --modo Completo --ultima
+
+Las evaluaciones se leen del almacén (``AlmacenSesiones``), los PDF se generan
+con ``crear_pdf_avanzado`` en un pool de procesos y cada uno se escribe en el ZIP
+apenas llega: en memoria solo están los informes en curso, nunca el lote entero.
+
+El ZIP es su propio punto de control. Cada entrada se llama
+``<id de evaluación>_Informe_<paciente>_<fecha>.pdf`` y se vuelca al disco al
+escribirla; al volver a correr sobre el mismo archivo se omiten las
+evaluaciones que ya tienen informe. Si el proceso se cortó sin cerrar el ZIP
+(sin directorio central), primero se recuperan las entradas completas que
+alcanzó a escribir.
+"""
+
+import argparse
+import itertools
+import os
+import re
+import signal
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from datetime import datetime
+from multiprocessing import Pool
+
+from . import informe
+from .sesiones import AlmacenSesiones, RUTA_POR_DEFECTO
+
+# Informes por proceso que se encolan antes de esperar resultados (acota la memoria)
+INFORMES_POR_PROCESO = 4
+
+# Cabecera local de una entrada ZIP (APPNOTE 4.3.7)
+_CABECERA_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_FIRMA_LOCAL = b"PK\x03\x04"
+
+
+def nombre_entrada(evaluacion):
+    """Nombre del PDF dentro del ZIP: id de la evaluación + paciente + fecha"""
+    paciente = re.sub(r"[^\w-]+", "_", evaluacion["paciente"]).strip("_") or "paciente"
+    return f"{evaluacion['id']}_Informe_{paciente}_{evaluacion['fecha_eval']}.pdf"
+
+
+def _id_entrada(nombre):
+    prefijo = nombre.split("_", 1)[0]
+    return int(prefijo) if prefijo.isdigit() else None
+
+
+def recuperar_zip(ruta):
+    """Reescribe un ZIP sin directorio central con sus entradas completas; devuelve cuántas"""
+    temporal = ruta + ".recuperando"
+    recuperadas = 0
+    with open(ruta, "rb") as origen, zipfile.ZipFile(temporal, "w") as destino:
+        while True:
+            cabecera = origen.read(_CABECERA_LOCAL.size)
+            if len(cabecera) < _CABECERA_LOCAL.size:
+                break
+            (firma, _, _, banderas, metodo, hora, fecha, crc,
+             comprimido, tamano, largo_nombre, largo_extra) = _CABECERA_LOCAL.unpack(cabecera)
+            # Entradas con descriptor de datos o métodos ajenos no las escribe este módulo
+            if firma != _FIRMA_LOCAL or banderas & 0x08 or metodo not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                break
+            nombre = origen.read(largo_nombre).decode("utf-8" if banderas & 0x800 else "cp437")
+            origen.seek(largo_extra, os.SEEK_CUR)
+            datos = origen.read(comprimido)
+            if len(datos) < comprimido:
+                break
+            try:
+                if metodo == zipfile.ZIP_DEFLATED:
+                    datos = zlib.decompress(datos, -15)
+            except zlib.error:
+                break
+            if len(datos) != tamano or zlib.crc32(datos) != crc:
+                break
+            info = zipfile.ZipInfo(nombre, ((fecha >> 9) + 1980, fecha >> 5 & 15, fecha & 31,
+                                            hora >> 11, hora >> 5 & 63, (hora & 31) * 2))
+            destino.writestr(info, datos, compress_type=metodo)
+            recuperadas += 1
+    os.replace(temporal, ruta)
+    return recuperadas
+
+
+def abrir_zip(ruta):
+    """ZIP listo para agregar informes e ids de las evaluaciones que ya tienen el suyo"""
+    if os.path.exists(ruta) and os.path.getsize(ruta) and not zipfile.is_zipfile(ruta):
+        n = recuperar_zip(ruta)
+        print(f"{ruta}: el ZIP no se cerró; se recuperaron {n} informes", file=sys.stderr)
+    zf = zipfile.ZipFile(ruta, "a", compression=zipfile.ZIP_DEFLATED)
+    return zf, {i for i in map(_id_entrada, zf.namelist()) if i is not None}
+
+
+def _iniciar_proceso():
+    # Ctrl+C lo atiende el proceso principal, que cierra el ZIP y termina el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _renderizar(tarea):
+    """En un proceso del pool: (id, nombre, estados) → (id, nombre, pdf, error)"""
+    evaluacion_id, nombre, estados = tarea
+    try:
+        datos, lista, estados_items = informe.datos_informe(estados)
+        pdf = informe.crear_pdf_avanzado(lista_items=lista, estados_sesion=estados_items, **datos)
+        return evaluacion_id, nombre, pdf, None
+    except Exception as e:
+        return evaluacion_id, nombre, None, f"{type(e).__name__}: {e}"
+
+
+def _tareas(almacen, evaluaciones):
+    for ev in evaluaciones:
+        yield ev["id"], nombre_entrada(ev), almacen.cargar(ev["id"])
+
+
+def generar_informes(salida, ruta_db=RUTA_POR_DEFECTO, procesos=None, paciente=None, fecha_eval=None,
+                     modo=None, ultima=False):
+    """Agrega al ZIP `salida` los informes que faltan; devuelve (generados, omitidos, errores, segundos)"""
+    if not informe.fpdf_available:
+        raise RuntimeError("Falta FPDF. Instala con: pip install fpdf")
+    procesos = procesos or os.cpu_count() or 1
+    almacen = AlmacenSesiones(ruta_db)
+    evaluaciones = almacen.listar(paciente=paciente, fecha_eval=fecha_eval, modo=modo, limite=None)
+    if ultima:
+        # listar devuelve primero las más recientes
+        vistos = set()
+        evaluaciones = [ev for ev in evaluaciones if not (ev["paciente"] in vistos or vistos.add(ev["paciente"]))]
+
+    inicio = time.perf_counter()
+    zf, hechos = abrir_zip(salida)
+    pendientes = [ev for ev in evaluaciones if ev["id"] not in hechos]
+    generados, errores = 0, []
+    tareas = _tareas(almacen, pendientes)
+    tam_bloque = procesos * INFORMES_POR_PROCESO
+    pool = Pool(procesos, _iniciar_proceso) if procesos > 1 else None
+    try:
+        while True:
+            bloque = list(itertools.islice(tareas, tam_bloque))
+            if not bloque:
+                break
+            resultados = pool.imap_unordered(_renderizar, bloque) if pool else map(_renderizar, bloque)
+            for evaluacion_id, nombre, pdf, error in resultados:
+                if error:
+                    errores.append((evaluacion_id, error))
+                    continue
+                zf.writestr(zipfile.ZipInfo(nombre, datetime.now().timetuple()[:6]), pdf, zipfile.ZIP_DEFLATED)
+                # Cada informe queda completo en disco: un corte solo pierde los que estaban en curso
+                zf.fp.flush()
+                generados += 1
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+        zf.close()
+    return generados, len(evaluaciones) - len(pendientes), errores, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m teprosif.informe_lote", description="Informes PDF TEPROSIF-R por lotes.")
+    parser.add_argument("salida", help="archivo ZIP de destino (si existe, se completan los informes que faltan)")
+    parser.add_argument("--db", default=RUTA_POR_DEFECTO, help=f"almacén de sesiones (por defecto {RUTA_POR_DEFECTO})")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de trabajo (por defecto, uno por CPU)")
+    parser.add_argument("--paciente", help="solo las evaluaciones de este paciente")
+    parser.add_argument("--fecha", help="solo las evaluaciones de esta fecha (AAAA-MM-DD)")
+    parser.add_argument("--modo", choices=("Completo", "Barrido"), help="solo las evaluaciones de este modo")
+    parser.add_argument("--ultima", action="store_true", help="solo la evaluación más reciente de cada paciente")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"No existe el almacén {args.db}")
+
+    try:
+        generados, omitidos, errores, segundos = generar_informes(
+            args.salida, args.db, args.procesos, args.paciente, args.fecha, args.modo, args.ultima)
+    except KeyboardInterrupt:
+        print(f"Interrumpido: {args.salida} quedó cerrado; al volver a correr se completa", file=sys.stderr)
+        return 130
+    for evaluacion_id, error in errores:
+        print(f"Evaluación {evaluacion_id}: {error}", file=sys.stderr)
+    print(f"{generados} informes en {segundos:.2f} s ({omitidos} ya estaban, {len(errores)} con error)", file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
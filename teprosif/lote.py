@@ -0,0 +1,224 @@
+"""Puntuación por lotes de transcripciones TEPROSIF-R desde la línea de comandos.
+
+Uso:
+    python -m teprosif.lote entrada.csv salida.csv [--procesos 4] [--chunk 256]
+    python -m teprosif.lote entrada.csv salida.csv --detectores grupos,codas,atonos
+
+La entrada (CSV con encabezado o JSONL) trae una fila por ítem evaluado con las
+columnas ``paciente``, ``edad``, ``modo``, ``item``, ``transcripcion`` y
+``tipo`` (opcional, por defecto "Respuesta Válida"). La salida recibe una fila
+por ítem con los PSF sugeridos y sus conteos E/A/S; el diagnóstico de cada
+evaluación (paciente + modo) se escribe al final en un archivo aparte. Una fila
+sin ``edad`` o con una que no es un número de años se puntúa igual, con el
+problema en la columna ``error``; si ninguna fila de la evaluación trae una
+edad válida, su diagnóstico es "Sin Datos".
+
+Las filas se leen y escriben en bloques, de modo que la memoria no crece con el
+tamaño de la entrada (solo con el número de evaluaciones distintas).
+
+``--detectores`` corre solo esos detectores de PSF (ver ``teprosif.detectores``);
+los procesos que no detectan no se cuentan, y tampoco se calculan los rasgos
+que solo ellos usan (p. ej. la alineación si no se pide "sustituciones").
+"""
+
+import argparse
+import csv
+import functools
+import itertools
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from .datos import METADATA_PALABRAS, TIPOS_RESPUESTA
+from .fonologia import texto_a_fonemas
+from .analisis import analizar_item, contar_por_categoria
+from .detectores import DETECTORES, seleccionar
+from .diagnostico import obtener_diagnostico
+
+CAMPOS_ITEM = ["paciente", "edad", "modo", "item", "palabra", "transcripcion", "tipo",
+               "procesos", "e", "a", "s", "total", "error"]
+CAMPOS_DIAGNOSTICO = ["paciente", "edad", "modo", "items", "total", "e", "a", "s",
+                      "diagnostico", "z"]
+
+# Bloques por proceso que se leen antes de repartir trabajo (acota la memoria)
+BLOQUES_POR_PROCESO = 8
+EDAD_MAXIMA = 120           # años
+
+
+def leer_edad(valor):
+    """Años de `valor` (número o texto numérico entre 0 y EDAD_MAXIMA); None si no es una edad"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+        return None
+    try:
+        edad = float(valor)
+    except ValueError:
+        return None
+    return int(edad) if 0 <= edad <= EDAD_MAXIMA else None
+
+
+def puntuar_fila(fila, detectores=None, con_edad=True):
+    """Analiza una fila de entrada y devuelve la fila de salida del ítem.
+
+    `con_edad`: la fila entra a un diagnóstico, así que una edad faltante se
+    anota en ``error`` (una presente pero inválida se anota siempre).
+    """
+    item = str(fila.get("item", "")).split(".")[0].strip()
+    # Las filas JSONL pueden traer números u otros tipos: todo se trata como texto
+    tipo = str(fila.get("tipo") or TIPOS_RESPUESTA[0]).strip()
+    transcripcion = str(fila.get("transcripcion") or "").strip()
+    salida = {
+        "paciente": fila.get("paciente", ""), "edad": fila.get("edad", ""),
+        "modo": fila.get("modo") or "Completo", "item": item, "palabra": "",
+        "transcripcion": transcripcion, "tipo": tipo,
+        "procesos": "", "e": 0, "a": 0, "s": 0, "total": 0, "error": "",
+    }
+    edad = salida["edad"]
+    if edad in (None, ""):
+        if con_edad: salida["error"] = "Falta la edad"
+    elif leer_edad(edad) is None:
+        salida["error"] = f"Edad inválida: {edad!r} (se esperan años entre 0 y {EDAD_MAXIMA})"
+    meta_info = METADATA_PALABRAS.get(item)
+    if not meta_info:
+        salida["error"] = f"Ítem desconocido: {fila.get('item')!r}"
+        return salida
+    salida["palabra"] = meta_info["word"]
+    if tipo != TIPOS_RESPUESTA[0] or not transcripcion:
+        return salida
+
+    mf = texto_a_fonemas(meta_info["word"])
+    pf = texto_a_fonemas(transcripcion)
+    if mf != pf:
+        sugs, completo, aviso = analizar_item(mf, pf, item, detectores=detectores)
+        e, a, s = contar_por_categoria(sugs)
+        salida.update(procesos=", ".join(sugs), e=e, a=a, s=s, total=e + a + s)
+        if not completo: salida["error"] = "; ".join(filter(None, (salida["error"], aviso)))
+    return salida
+
+
+def _leer_filas(ruta):
+    """Itera las filas de un CSV (con encabezado) o de un JSONL sin cargarlo entero"""
+    with open(ruta, encoding="utf-8", newline="") as f:
+        if ruta.endswith((".jsonl", ".ndjson")):
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+        else:
+            yield from csv.DictReader(f)
+
+
+class _Escritor:
+    """Escribe filas en CSV o JSONL según la extensión del archivo"""
+
+    def __init__(self, ruta, campos):
+        self._f = open(ruta, "w", encoding="utf-8", newline="")
+        self._jsonl = ruta.endswith((".jsonl", ".ndjson"))
+        if not self._jsonl:
+            self._csv = csv.DictWriter(self._f, fieldnames=campos)
+            self._csv.writeheader()
+
+    def escribir(self, fila):
+        if self._jsonl:
+            self._f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        else:
+            self._csv.writerow(fila)
+
+    def vaciar(self):
+        self._f.flush()
+
+    def cerrar(self):
+        self._f.close()
+
+
+def acumular(evaluaciones, res):
+    """Suma la fila de salida `res` a los totales de su evaluación (paciente, modo)"""
+    clave = (res["paciente"], res["modo"])
+    ev = evaluaciones.setdefault(clave, {"edad": None, "items": 0, "e": 0, "a": 0, "s": 0})
+    # La primera edad válida de la evaluación; sin ninguna, el diagnóstico es "Sin Datos"
+    if ev["edad"] is None: ev["edad"] = leer_edad(res["edad"])
+    ev["items"] += 1
+    ev["e"] += res["e"]; ev["a"] += res["a"]; ev["s"] += res["s"]
+
+
+def diagnosticos(evaluaciones):
+    """Filas de diagnóstico (CAMPOS_DIAGNOSTICO) de los totales armados con acumular()"""
+    for (paciente, modo), ev in evaluaciones.items():
+        total = ev["e"] + ev["a"] + ev["s"]
+        diag, _, _, z_score, _ = obtener_diagnostico(total, ev["edad"], modo)
+        yield {
+            "paciente": paciente, "edad": "" if ev["edad"] is None else ev["edad"], "modo": modo, "items": ev["items"],
+            "total": total, "e": ev["e"], "a": ev["a"], "s": ev["s"], "diagnostico": diag,
+            "z": "" if z_score is None else round(z_score, 2),
+        }
+
+
+def puntuar_archivo(entrada, salida, ruta_diagnosticos=None, procesos=None, chunk=256, detectores=None):
+    """Puntúa `entrada` y escribe ítems y diagnósticos; devuelve (n_items, segundos)"""
+    procesos = procesos or os.cpu_count() or 1
+    puntuar = functools.partial(puntuar_fila, detectores=detectores) if detectores is not None else puntuar_fila
+    if ruta_diagnosticos is None:
+        base, ext = os.path.splitext(salida)
+        ruta_diagnosticos = f"{base}_diagnosticos{ext}"
+
+    # Totales por evaluación (paciente, modo): crece con las evaluaciones, no con las filas
+    evaluaciones = {}
+    escritor = _Escritor(salida, CAMPOS_ITEM)
+    filas = _leer_filas(entrada)
+    tam_bloque = max(1, chunk) * procesos * BLOQUES_POR_PROCESO
+    n_items = 0
+    inicio = time.perf_counter()
+    pool = Pool(procesos) if procesos > 1 else None
+    try:
+        while True:
+            bloque = list(itertools.islice(filas, tam_bloque))
+            if not bloque:
+                break
+            resultados = pool.imap(puntuar, bloque, chunk) if pool else map(puntuar, bloque)
+            for res in resultados:
+                escritor.escribir(res)
+                n_items += 1
+                acumular(evaluaciones, res)
+            escritor.vaciar()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        escritor.cerrar()
+
+    escritor = _Escritor(ruta_diagnosticos, CAMPOS_DIAGNOSTICO)
+    try:
+        for fila in diagnosticos(evaluaciones):
+            escritor.escribir(fila)
+    finally:
+        escritor.cerrar()
+    return n_items, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m teprosif.lote", description="Puntuación TEPROSIF-R por lotes.")
+    parser.add_argument("entrada", help="CSV con encabezado o JSONL con una fila por ítem")
+    parser.add_argument("salida", help="archivo de salida por ítem (.csv o .jsonl)")
+    parser.add_argument("--diagnosticos", help="archivo de diagnósticos por evaluación (por defecto <salida>_diagnosticos)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de trabajo (por defecto, uno por CPU)")
+    parser.add_argument("--chunk", type=int, default=256, help="filas por tarea enviada a cada proceso")
+    parser.add_argument("--detectores", help="detectores a correr, separados por comas (por defecto, todos: "
+                        + ",".join(d.nombre for d in DETECTORES) + ")")
+    args = parser.parse_args(argv)
+
+    detectores = None
+    if args.detectores:
+        detectores = [d.strip() for d in args.detectores.split(",") if d.strip()]
+        try:
+            seleccionar(detectores)
+        except ValueError as e:
+            parser.error(str(e))
+
+    n_items, segundos = puntuar_archivo(args.entrada, args.salida, args.diagnosticos, args.procesos, args.chunk, detectores)
+    velocidad = n_items / segundos if segundos > 0 else 0.0
+    print(f"{n_items} ítems en {segundos:.2f} s ({velocidad:,.0f} ítems/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
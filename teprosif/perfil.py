@@ -0,0 +1,215 @@
+"""Tramos de tiempo livianos para perfilar cada re-ejecución de la interfaz.
+
+Las funciones del núcleo marcadas con ``@medir("etapa")`` (silabeo, alineación,
+procesos, diff, pdf) y los bloques ``with tramo("html"):`` de la interfaz se
+anotan en la *corrida* activa del hilo actual. Sin corrida activa —o mientras el
+perfilado esté apagado, que es lo habitual— el costo es una llamada extra y una
+comprobación de una variable global (unos 0,3 µs), por eso no se decoran
+funciones más baratas que eso, como ``texto_a_fonemas``.
+
+    perfil.activar()
+    with perfil.corrida("rerun", destino=historial):
+        ...                               # todo lo medido queda en historial[-1]
+    perfil.volcar_jsonl(historial, "tramos.jsonl")
+"""
+
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# Apagado por defecto: medir() llama directo a la función original
+ACTIVO = False
+
+Tramo = namedtuple("Tramo", [
+    "nombre",       # etapa: "fonemas", "procesos", "item", ...
+    "inicio",       # segundos desde el inicio de la corrida
+    "duracion",     # segundos
+    "profundidad",  # anidamiento (0 = tramo de primer nivel)
+    "atributos",    # dict con datos extra (ítem, caché, ...) o None
+])
+
+_local = threading.local()
+_ids = itertools.count(1)
+_lock_archivo = threading.Lock()
+
+
+def activar(valor=True):
+    global ACTIVO
+    ACTIVO = bool(valor)
+
+
+class Corrida:
+    """Tramos de una re-ejecución (completa o de un fragmento)"""
+
+    def __init__(self, etiqueta):
+        self.id = next(_ids)
+        self.etiqueta = etiqueta
+        self.fecha = datetime.now()
+        self.duracion = None
+        self.tramos = []
+        self._t0 = time.perf_counter()
+        self._profundidad = 0
+
+    def resumen(self):
+        """Por etapa: llamadas, tiempo total y tiempo propio (sin sus tramos anidados), en segundos"""
+        etapas = {}
+        hijos = [0.0] * len(self.tramos)
+        pila = []
+        # Los tramos se anotan al cerrarse: un tramo contiene a los anteriores de mayor profundidad
+        for k, t in enumerate(self.tramos):
+            while pila and self.tramos[pila[-1]].profundidad > t.profundidad:
+                hijos[k] += self.tramos[pila.pop()].duracion
+            pila.append(k)
+        for k, t in enumerate(self.tramos):
+            e = etapas.setdefault(t.nombre, {"llamadas": 0, "total": 0.0, "propio": 0.0})
+            e["llamadas"] += 1
+            e["total"] += t.duracion
+            e["propio"] += t.duracion - hijos[k]
+        return etapas
+
+    def lineas_json(self):
+        """Una línea JSON por tramo, para análisis fuera de la aplicación"""
+        cabecera = {"corrida": self.id, "etiqueta": self.etiqueta, "fecha": self.fecha.isoformat(timespec="milliseconds"),
+                    "corrida_ms": round(self.duracion * 1000, 3) if self.duracion is not None else None}
+        for t in self.tramos:
+            fila = dict(cabecera, tramo=t.nombre, inicio_ms=round(t.inicio * 1000, 3),
+                        duracion_ms=round(t.duracion * 1000, 3), profundidad=t.profundidad)
+            if t.atributos: fila.update(t.atributos)
+            yield json.dumps(fila, ensure_ascii=False, default=str)
+
+
+class _TramoActivo:
+    __slots__ = ("corrida", "nombre", "atributos", "inicio")
+
+    def __init__(self, corrida, nombre, atributos):
+        self.corrida, self.nombre, self.atributos = corrida, nombre, atributos
+
+    def __enter__(self):
+        self.corrida._profundidad += 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fin = time.perf_counter()
+        corrida = self.corrida
+        corrida._profundidad -= 1
+        corrida.tramos.append(Tramo(self.nombre, self.inicio - corrida._t0, fin - self.inicio,
+                                    corrida._profundidad, self.atributos or None))
+        return False
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULO = _TramoNulo()
+
+
+def corrida_actual():
+    return getattr(_local, "corrida", None) if ACTIVO else None
+
+
+def tramo(nombre, **atributos):
+    """Contexto que mide un bloque dentro de la corrida actual (no hace nada sin corrida)"""
+    corrida = corrida_actual()
+    if corrida is None:
+        return _NULO
+    return _TramoActivo(corrida, nombre, atributos)
+
+
+def medir(nombre):
+    """Decorador: cada llamada a la función es un tramo `nombre` de la corrida actual"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            if not ACTIVO:
+                return funcion(*args, **kwargs)
+            corrida = getattr(_local, "corrida", None)
+            if corrida is None:
+                return funcion(*args, **kwargs)
+            with _TramoActivo(corrida, nombre, None):
+                return funcion(*args, **kwargs)
+        return medida
+    return decorador
+
+
+# --- Corridas ---
+
+def iniciar(etiqueta):
+    """Abre una corrida nueva en este hilo (descarta la anterior si quedó abierta)"""
+    if not ACTIVO:
+        return None
+    _local.corrida = Corrida(etiqueta)
+    return _local.corrida
+
+
+def terminar(destino=None, archivo=None):
+    """Cierra la corrida del hilo, la agrega a `destino` y la anexa al JSONL `archivo`"""
+    corrida = getattr(_local, "corrida", None)
+    _local.corrida = None
+    if corrida is None:
+        return None
+    corrida.duracion = time.perf_counter() - corrida._t0
+    if destino is not None:
+        destino.append(corrida)
+    if archivo:
+        volcar_jsonl([corrida], archivo, modo="a")
+    return corrida
+
+
+class corrida:
+    """Contexto para una corrida; si ya hay una abierta en el hilo, es un tramo más de ella"""
+
+    def __init__(self, nombre, destino=None, archivo=None, **atributos):
+        self.nombre, self.destino, self.archivo, self.atributos = nombre, destino, archivo, atributos
+        self._contexto = None
+
+    def __enter__(self):
+        if corrida_actual() is not None:
+            self._contexto = tramo(self.nombre, **self.atributos)
+            self._contexto.__enter__()
+        elif ACTIVO and (self.destino is not None or self.archivo):
+            etiqueta = " ".join([self.nombre] + [f"{k}={v}" for k, v in self.atributos.items()])
+            iniciar(etiqueta)
+        return self
+
+    def __exit__(self, *exc):
+        if self._contexto is not None:
+            return self._contexto.__exit__(*exc)
+        terminar(self.destino, self.archivo)
+        return False
+
+
+def propagar(funcion, nombre, destino=None, archivo=None):
+    """Envuelve `funcion` (que correrá en otro hilo) para medirla como una corrida propia.
+
+    Si se encola desde una corrida, la nueva lleva su id en el atributo ``origen``.
+    """
+    if not ACTIVO or (destino is None and not archivo):
+        return funcion
+    origen = corrida_actual()
+    atributos = {"origen": origen.id} if origen is not None else {}
+    @functools.wraps(funcion)
+    def medida(*args, **kwargs):
+        with corrida(nombre, destino, archivo, **atributos):
+            return funcion(*args, **kwargs)
+    return medida
+
+
+def volcar_jsonl(corridas, archivo, modo="w"):
+    """Escribe los tramos de `corridas` como JSON lines en una ruta o archivo abierto"""
+    lineas = [linea + "\n" for c in corridas for linea in c.lineas_json()]
+    if hasattr(archivo, "write"):
+        archivo.writelines(lineas)
+        return
+    with _lock_archivo, open(archivo, modo, encoding="utf-8") as f:
+        f.writelines(lineas)
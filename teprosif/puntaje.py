@@ -0,0 +1,36 @@
+"""Totales E/A/S de una evaluación, mantenidos de forma incremental por ítem."""
+
+
+class AgregadoPuntajes:
+    """Suma E/A/S por ítem; actualizar un ítem solo ajusta la diferencia"""
+
+    def __init__(self):
+        self._items = {}
+        self.e = self.a = self.s = 0
+        # Aumenta con cada cambio real, para saber si hay que redibujar algo
+        self.version = 0
+
+    @property
+    def total(self):
+        return self.e + self.a + self.s
+
+    def actualizar(self, clave, e=0, a=0, s=0):
+        """Fija los puntajes del ítem `clave` y ajusta los totales"""
+        previo = self._items.get(clave, (0, 0, 0))
+        if previo == (e, a, s):
+            return
+        self.e += e - previo[0]
+        self.a += a - previo[1]
+        self.s += s - previo[2]
+        self._items[clave] = (e, a, s)
+        self.version += 1
+
+    def conservar(self, claves):
+        """Descarta los ítems que no están en `claves` (p. ej. al pasar a Barrido)"""
+        claves = set(claves)
+        for clave in [c for c in self._items if c not in claves]:
+            self.actualizar(clave)
+            del self._items[clave]
+
+    def item(self, clave):
+        return self._items.get(clave, (0, 0, 0))
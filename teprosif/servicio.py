@@ -0,0 +1,299 @@
+"""Servicio HTTP de puntuación TEPROSIF-R para integrarlo con otros sistemas (historia clínica, ...).
+
+Uso (requiere uvicorn, o cualquier otro servidor ASGI):
+    python -m teprosif.servicio [--host 127.0.0.1] [--puerto 8080] [--procesos 4]
+    uvicorn teprosif.servicio:app --workers 4
+
+Rutas (JSON en ambos sentidos):
+    GET  /salud   el proceso responde (liveness)
+    GET  /listo   200 cuando las tablas y cachés ya están precalentadas; 503 antes (readiness)
+    POST /item    una fila como las de ``teprosif.lote``:
+                  {"item": "22", "transcripcion": "ten", "tipo": "Respuesta Válida"}
+                  → la fila puntuada: procesos (lista de códigos), e, a, s, total, error, ...
+    POST /lote    {"filas": [fila, ...]}, con ``paciente``, ``edad`` y ``modo`` en cada fila
+                  → {"items": [...], "diagnosticos": [...]}: por evaluación (paciente + modo),
+                  los totales E/A/S y la categoría de ``obtener_diagnostico``
+
+Una ``edad`` que no es un número de años o un ``modo`` que no tiene normas
+("Completo", "Barrido") se rechazan con 400 en vez de puntuarse con valores
+por defecto.
+
+``app`` es una aplicación ASGI sin dependencias. ``python -m teprosif.servicio``
+la sirve con uvicorn al estilo "preload" de gunicorn: el proceso principal abre
+el socket y precalienta todo (transcripciones e índice de las metas, planes de
+detectores, tabla de rasgos, un análisis por ítem), congela esos objetos con
+gc.freeze() y recién entonces bifurca los trabajadores, que heredan las tablas
+ya armadas en páginas compartidas. Las cachés LRU que se llenan después con
+cada petición son de cada trabajador: no se comparten entre ellos.
+
+Con ``uvicorn --workers`` (u otro servidor ASGI) cada trabajador es un
+intérprete nuevo y precalienta por su cuenta, en segundo plano después del
+arranque: ya acepta conexiones y /listo responde 503 hasta terminar. La
+puntuación corre en el ejecutor del bucle, así un /lote grande no detiene a
+/salud ni a /listo en ese trabajador.
+"""
+
+import argparse
+import asyncio
+import functools
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from .datos import NORMAS_RANGOS
+from .indice import ITEMS_TEST
+from .detectores import seleccionar
+from .lote import EDAD_MAXIMA, acumular, diagnosticos, leer_edad, puntuar_fila
+
+# Topes por petición
+MAX_CUERPO = 1 << 20        # bytes
+MAX_FILAS = 2000            # filas por /lote
+
+_LISTO = False
+
+
+class ErrorPeticion(Exception):
+    """Petición inválida: se responde con `estado` y el mensaje como error"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def calentar():
+    """Precalienta tablas y cachés del núcleo (idempotente); devuelve los segundos usados"""
+    global _LISTO
+    inicio = time.perf_counter()
+    seleccionar()
+    for item in ITEMS_TEST:
+        # Una producción con omisión recorre silabeo, alineación y todos los detectores
+        puntuar_fila({"item": item.num, "transcripcion": item.palabra[:-1]}, con_edad=False)
+    _LISTO = True
+    return time.perf_counter() - inicio
+
+
+# --- Aplicación ASGI ---
+
+def _leer_json(cuerpo):
+    try:
+        return json.loads(cuerpo)
+    except (UnicodeDecodeError, ValueError):
+        raise ErrorPeticion(400, "El cuerpo no es JSON válido")
+
+
+def _validar_fila(fila, posicion=None, con_edad=False):
+    """`con_edad`: la fila entra a un diagnóstico (/lote) y la edad es obligatoria"""
+    donde = "" if posicion is None else f" (fila {posicion})"
+    if not isinstance(fila, dict):
+        raise ErrorPeticion(400, f"Se esperaba un objeto JSON{donde}")
+    for campo in ("transcripcion", "tipo", "modo"):
+        if not isinstance(fila.get(campo) or "", str):
+            raise ErrorPeticion(400, f"{campo!r} debe ser texto{donde}")
+    for campo in ("paciente", "item"):
+        if isinstance(fila.get(campo), (list, dict)):
+            raise ErrorPeticion(400, f"{campo!r} debe ser texto o número{donde}")
+    if fila.get("modo") and fila["modo"] not in NORMAS_RANGOS:
+        raise ErrorPeticion(400, f"'modo' debe ser {' o '.join(map(repr, NORMAS_RANGOS))}{donde}")
+    edad = fila.get("edad")
+    if con_edad and edad in (None, ""):
+        raise ErrorPeticion(400, f"Falta 'edad'{donde}")
+    if edad not in (None, "") and leer_edad(edad) is None:
+        raise ErrorPeticion(400, f"'edad' debe ser un número de años entre 0 y {EDAD_MAXIMA}{donde}")
+    return fila
+
+
+def _salida_item(res):
+    return dict(res, procesos=res["procesos"].split(", ") if res["procesos"] else [])
+
+
+async def _salud(cuerpo):
+    return 200, {"estado": "ok", "pid": os.getpid()}
+
+
+async def _listo(cuerpo):
+    if _LISTO: return 200, {"estado": "listo"}
+    return 503, {"estado": "calentando"}
+
+
+def _en_ejecutor(funcion, *args):
+    # La puntuación es CPU: fuera del bucle, que sigue atendiendo /salud y /listo
+    return asyncio.get_running_loop().run_in_executor(None, funcion, *args)
+
+
+def _puntuar_lote(filas):
+    items, evaluaciones = [], {}
+    for fila in filas:
+        res = puntuar_fila(fila)
+        items.append(_salida_item(res))
+        acumular(evaluaciones, res)
+    return {"items": items, "diagnosticos": list(diagnosticos(evaluaciones))}
+
+
+async def _item(cuerpo):
+    fila = _validar_fila(_leer_json(cuerpo))
+    return 200, _salida_item(await _en_ejecutor(functools.partial(puntuar_fila, con_edad=False), fila))
+
+
+async def _lote(cuerpo):
+    datos = _leer_json(cuerpo)
+    filas = datos.get("filas") if isinstance(datos, dict) else datos
+    if not isinstance(filas, list):
+        raise ErrorPeticion(400, 'Se esperaba {"filas": [...]} o una lista de filas')
+    if len(filas) > MAX_FILAS:
+        raise ErrorPeticion(413, f"Demasiadas filas: {len(filas)} (máximo {MAX_FILAS})")
+    for k, fila in enumerate(filas):
+        _validar_fila(fila, k, con_edad=True)
+    return 200, await _en_ejecutor(_puntuar_lote, filas)
+
+
+# Ruta → {método: manejador(cuerpo) -> (estado, datos)}
+RUTAS = {
+    "/salud": {"GET": _salud},
+    "/listo": {"GET": _listo},
+    "/item": {"POST": _item},
+    "/lote": {"POST": _lote},
+}
+
+
+async def _leer_cuerpo(receive):
+    partes, largo = [], 0
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "http.disconnect":
+            raise ErrorPeticion(400, "Conexión cerrada por el cliente")
+        parte = mensaje.get("body", b"")
+        largo += len(parte)
+        if largo > MAX_CUERPO:
+            raise ErrorPeticion(413, f"Cuerpo demasiado grande (máximo {MAX_CUERPO} bytes)")
+        partes.append(parte)
+        if not mensaje.get("more_body"):
+            return b"".join(partes)
+
+
+async def _responder(send, estado, datos):
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    await send({"type": "http.response.start", "status": estado, "headers": [
+        (b"content-type", b"application/json; charset=utf-8"),
+        (b"content-length", str(len(cuerpo)).encode("ascii")),
+    ]})
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+async def _ciclo_de_vida(receive, send):
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+            # Después de aceptar conexiones: mientras tanto /salud responde y /listo da 503
+            if not _LISTO:
+                asyncio.get_running_loop().run_in_executor(None, calentar)
+        elif mensaje["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """Aplicación ASGI 3 del servicio"""
+    if scope["type"] == "lifespan":
+        return await _ciclo_de_vida(receive, send)
+    if scope["type"] != "http":
+        return
+    metodos = RUTAS.get(scope["path"])
+    try:
+        if metodos is None:
+            raise ErrorPeticion(404, f"Ruta desconocida: {scope['path']}")
+        manejador = metodos.get(scope["method"])
+        if manejador is None:
+            raise ErrorPeticion(405, f"Método no permitido: {scope['method']} (usar {', '.join(metodos)})")
+        estado, datos = await manejador(await _leer_cuerpo(receive))
+    except ErrorPeticion as e:
+        estado, datos = e.estado, {"error": str(e)}
+    except Exception:
+        traceback.print_exc()
+        estado, datos = 500, {"error": "Error interno del servicio"}
+    await _responder(send, estado, datos)
+
+
+# --- Servidor ---
+
+def _trabajador(uvicorn, sock):
+    uvicorn.Server(uvicorn.Config(app, lifespan="on")).run(sockets=[sock])
+
+
+def servir(host="127.0.0.1", puerto=8080, procesos=1):
+    """Abre el socket, precalienta y atiende con `procesos` trabajadores uvicorn (bifurcados del actual)"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("Falta uvicorn. Instala con: pip install uvicorn")
+    sock = socket.create_server((host, puerto), backlog=1024)
+    segundos = calentar()
+    # Lo armado hasta aquí queda fuera del recolector: los trabajadores lo comparten sin copiarlo
+    gc.freeze()
+    print(f"Servicio TEPROSIF-R en http://{host}:{sock.getsockname()[1]} "
+          f"({procesos} proceso(s), precalentado en {segundos * 1000:.0f} ms)", file=sys.stderr)
+    if procesos <= 1 or not hasattr(os, "fork"):
+        _trabajador(uvicorn, sock)
+        return
+
+    hijos = set()
+    deteniendo = False
+
+    def lanzar():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _trabajador(uvicorn, sock)
+            finally:
+                os._exit(0)
+        hijos.add(pid)
+
+    def detener(senal, marco):
+        nonlocal deteniendo
+        deteniendo = True
+        for pid in hijos:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+    for _ in range(procesos):
+        lanzar()
+    # Supervisor: relanza a los trabajadores que mueran mientras el servicio siga activo
+    while hijos:
+        try:
+            pid, estado = os.wait()
+        except ChildProcessError:
+            break
+        hijos.discard(pid)
+        if not deteniendo:
+            print(f"Trabajador {pid} terminó (estado {estado}); se relanza", file=sys.stderr)
+            lanzar()
+    sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m teprosif.servicio", description="Servicio HTTP de puntuación TEPROSIF-R.")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección en la que escuchar (por defecto, solo local)")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de trabajo (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+    try:
+        servir(args.host, args.puerto, args.procesos or os.cpu_count() or 1)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""Almacén de evaluaciones guardadas en SQLite (modo WAL), con una fila por ítem.
+
+Reemplaza a los archivos ``sesion_<nombre>.json`` del directorio de trabajo:
+cada evaluación tiene su propio id (dos pacientes con el mismo nombre ya no se
+pisan), se consulta por paciente, fecha de evaluación y modo con índices, y
+cada guardado es una transacción atómica. ``importar_json`` migra los
+archivos antiguos una sola vez.
+
+El autoguardado (ver ``autoguardado.py``) no reescribe la evaluación: agrega
+las claves cambiadas a la tabla ``diario`` (solo inserciones) y ``compactar``
+las incorpora periódicamente a ``evaluaciones``/``items``. ``cargar`` aplica
+encima las entradas del diario aún no compactadas.
+
+Cada escritura sobre una evaluación (``guardar``, ``anotar``, ``compactar``)
+le asigna una ``revision`` creciente y, en la misma transacción, recalcula su
+fila de ``resumenes`` (puntajes, diagnóstico y PSF sugeridos, ver
+``cohorte.py``) con los ítems más lo que haya en el diario. El panel de
+cohorte solo relee los resúmenes de revisión posterior a la que ya tiene.
+"""
+
+import glob
+import json
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import date, datetime
+
+from .datos import TIPOS_RESPUESTA
+from .cohorte import resumir_evaluacion
+
+RUTA_POR_DEFECTO = os.environ.get("TEPROSIF_DB", "sesiones_teprosif.db")
+
+# Prefijo de la clave de sesión (type_3, ok_3, ...) → columna de la tabla items
+COLUMNAS_ITEM = {"type_": "tipo", "ok_": "ok", "in_": "transcripcion", "e_": "e", "a_": "a", "s_": "s"}
+VALORES_ITEM = {"tipo": TIPOS_RESPUESTA[0], "ok": False, "transcripcion": "", "e": 0, "a": 0, "s": 0}
+
+# Datos de la evaluación que se guardan junto a los ítems (columna → clave de sesión)
+CLAVES_EVALUACION = {
+    "paciente": "nombre_paciente_temp", "fecha_nac": "fecha_nac", "fecha_eval": "fecha_eval",
+    "sexo": "sexo", "modo": "modo", "observaciones": "observaciones",
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS evaluaciones (
+    id INTEGER PRIMARY KEY,
+    paciente TEXT NOT NULL,
+    fecha_nac TEXT,
+    fecha_eval TEXT NOT NULL,
+    sexo TEXT,
+    modo TEXT NOT NULL DEFAULT 'Completo',
+    observaciones TEXT NOT NULL DEFAULT '',
+    actualizado TEXT NOT NULL,
+    origen TEXT UNIQUE,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_paciente ON evaluaciones(paciente);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_fecha ON evaluaciones(fecha_eval);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_modo ON evaluaciones(modo);
+CREATE TABLE IF NOT EXISTS items (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    item INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    transcripcion TEXT NOT NULL,
+    e INTEGER NOT NULL,
+    a INTEGER NOT NULL,
+    s INTEGER NOT NULL,
+    PRIMARY KEY (evaluacion_id, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS diario (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    clave TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    momento TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_diario_evaluacion ON diario(evaluacion_id, seq);
+CREATE TABLE IF NOT EXISTS resumenes (
+    evaluacion_id INTEGER PRIMARY KEY REFERENCES evaluaciones(id) ON DELETE CASCADE,
+    revision INTEGER NOT NULL,
+    anos INTEGER NOT NULL,
+    meses INTEGER NOT NULL,
+    e INTEGER NOT NULL,
+    a INTEGER NOT NULL,
+    s INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    z REAL,
+    diagnostico TEXT NOT NULL,
+    procesos BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resumenes_revision ON resumenes(revision);
+"""
+
+# Bases creadas antes de que existiera la columna revision
+_MIGRACIONES = (
+    ("evaluaciones", "revision", "ALTER TABLE evaluaciones ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"),
+)
+_INDICES_MIGRADOS = "CREATE INDEX IF NOT EXISTS idx_evaluaciones_revision ON evaluaciones(revision);"
+# Resúmenes de antes de que la edad desconocida fuera -1: las evaluaciones sin fecha de
+# nacimiento (todas las importadas de JSON) tenían edad 0. Se borran y sin_resumen las rehace.
+_RESUMENES_EDAD_CERO = (
+    "DELETE FROM resumenes WHERE anos = 0 AND evaluacion_id IN "
+    "(SELECT id FROM evaluaciones WHERE fecha_nac IS NULL OR fecha_nac = '')"
+)
+
+_SIGUIENTE_REVISION = "(SELECT COALESCE(MAX(revision), 0) + 1 FROM evaluaciones)"
+
+COLUMNAS_RESUMEN = ("revision", "anos", "meses", "e", "a", "s", "total", "z", "diagnostico", "procesos")
+
+
+def _texto_fecha(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor) if valor else None
+
+
+def _valor_columna(columna, valor):
+    """Normaliza el valor de un widget al tipo de su columna en items"""
+    if columna == "ok": return int(bool(valor))
+    if columna in ("e", "a", "s"): return int(valor or 0)
+    if columna == "transcripcion": return valor or ""
+    return valor
+
+
+def clave_item(clave):
+    """'in_12' → (12, 'transcripcion'); None si no es una clave de ítem"""
+    prefijo, _, indice = clave.rpartition("_")
+    columna = COLUMNAS_ITEM.get(prefijo + "_")
+    if columna and indice.isdigit():
+        return int(indice), columna
+    return None
+
+
+def items_desde_estado(estados):
+    """Agrupa las claves de sesión de ítems en filas {item: {columna: valor}}"""
+    filas = {}
+    for clave, valor in estados.items():
+        destino = clave_item(clave)
+        if destino:
+            filas.setdefault(destino[0], dict(VALORES_ITEM))[destino[1]] = valor
+    return filas
+
+
+def _codificar(valor):
+    return json.dumps(_texto_fecha(valor) if isinstance(valor, (date, datetime)) else valor, ensure_ascii=False)
+
+
+def _decodificar(clave, texto):
+    valor = json.loads(texto)
+    if clave.startswith("fecha_") and valor:
+        valor = date.fromisoformat(valor)
+    return valor
+
+
+def estado_desde_items(filas):
+    """Inverso de items_desde_estado: filas de la tabla items → claves de sesión"""
+    estados = {}
+    for fila in filas:
+        i = fila["item"]
+        for prefijo, columna in COLUMNAS_ITEM.items():
+            valor = fila[columna]
+            estados[f"{prefijo}{i}"] = bool(valor) if columna == "ok" else valor
+    return estados
+
+
+class AlmacenSesiones:
+    """Evaluaciones guardadas en un archivo SQLite local"""
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        with self._conexion() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+            for tabla, columna, sql in _MIGRACIONES:
+                if columna not in {f["name"] for f in con.execute(f"PRAGMA table_info({tabla})")}:
+                    con.execute(sql)
+            con.executescript(_INDICES_MIGRADOS)
+            con.execute(_RESUMENES_EDAD_CERO)
+
+    @contextmanager
+    def _conexion(self):
+        # Una conexión por operación: cada sesión de Streamlit corre en su propio hilo
+        with closing(sqlite3.connect(self.ruta, timeout=30)) as con:
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA foreign_keys=ON")
+            con.execute("PRAGMA synchronous=NORMAL")
+            with con:  # transacción: commit al salir, rollback si hay excepción
+                yield con
+
+    def guardar(self, estados, evaluacion_id=None, **datos):
+        """Guarda (de forma atómica) una evaluación y sus ítems; devuelve su id.
+
+        `estados` es el session_state (o un dict con sus claves); los datos de la
+        evaluación se toman de ahí salvo que se pasen explícitamente en `datos`.
+        """
+        fila = {col: datos.get(col, estados.get(clave)) for col, clave in CLAVES_EVALUACION.items()}
+        if not fila["paciente"]:
+            raise ValueError("La evaluación necesita el nombre del paciente")
+        fila["fecha_nac"] = _texto_fecha(fila["fecha_nac"])
+        fila["fecha_eval"] = _texto_fecha(fila["fecha_eval"]) or date.today().isoformat()
+        fila["modo"] = fila["modo"] or "Completo"
+        fila["observaciones"] = fila["observaciones"] or ""
+        fila["actualizado"] = datetime.now().isoformat(timespec="seconds")
+        fila["origen"] = datos.get("origen")
+        items = items_desde_estado(estados)
+
+        with self._conexion() as con:
+            if evaluacion_id is None:
+                columnas = ", ".join(fila)
+                marcas = ", ".join(f":{c}" for c in fila)
+                evaluacion_id = con.execute(
+                    f"INSERT INTO evaluaciones ({columnas}, revision) VALUES ({marcas}, {_SIGUIENTE_REVISION})", fila
+                ).lastrowid
+            else:
+                del fila["origen"]
+                asignaciones = ", ".join(f"{c} = :{c}" for c in fila)
+                cur = con.execute(
+                    f"UPDATE evaluaciones SET {asignaciones}, revision = {_SIGUIENTE_REVISION} WHERE id = :id",
+                    dict(fila, id=evaluacion_id),
+                )
+                if cur.rowcount == 0:
+                    raise KeyError(f"No existe la evaluación {evaluacion_id}")
+                con.execute("DELETE FROM items WHERE evaluacion_id = ?", (evaluacion_id,))
+                # La foto completa reemplaza a lo que quedaba pendiente en el diario
+                con.execute("DELETE FROM diario WHERE evaluacion_id = ?", (evaluacion_id,))
+            con.executemany(
+                "INSERT INTO items (evaluacion_id, item, tipo, ok, transcripcion, e, a, s) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(evaluacion_id, i, *(_valor_columna(c, f[c]) for c in VALORES_ITEM))
+                 for i, f in sorted(items.items())],
+            )
+            self._resumir(con, [evaluacion_id])
+        return evaluacion_id
+
+    def listar(self, paciente=None, fecha_eval=None, modo=None, limite=500):
+        """Evaluaciones (sin ítems), las más recientes primero, con filtros opcionales (limite=None: todas)"""
+        condiciones, parametros = [], []
+        for columna, valor in (("paciente", paciente), ("fecha_eval", _texto_fecha(fecha_eval)), ("modo", modo)):
+            if valor:
+                condiciones.append(f"{columna} = ?")
+                parametros.append(valor)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        with self._conexion() as con:
+            filas = con.execute(
+                f"SELECT id, paciente, fecha_nac, fecha_eval, sexo, modo, actualizado FROM evaluaciones "
+                f"{donde} ORDER BY actualizado DESC, id DESC LIMIT ?", (*parametros, -1 if limite is None else limite)
+            ).fetchall()
+        return [dict(f) for f in filas]
+
+    def cargar(self, evaluacion_id):
+        """Claves de sesión de una evaluación (ítems + datos del paciente)"""
+        with self._conexion() as con:
+            evaluacion = con.execute("SELECT * FROM evaluaciones WHERE id = ?", (evaluacion_id,)).fetchone()
+            if evaluacion is None:
+                raise KeyError(f"No existe la evaluación {evaluacion_id}")
+            items = con.execute("SELECT * FROM items WHERE evaluacion_id = ? ORDER BY item", (evaluacion_id,)).fetchall()
+            diario = con.execute("SELECT clave, valor FROM diario WHERE evaluacion_id = ? ORDER BY seq", (evaluacion_id,)).fetchall()
+        estados = estado_desde_items(items)
+        for columna, clave in CLAVES_EVALUACION.items():
+            valor = evaluacion[columna]
+            if columna.startswith("fecha_") and valor:
+                valor = date.fromisoformat(valor)
+            if valor is not None:
+                estados[clave] = valor
+        for fila in diario:
+            estados[fila["clave"]] = _decodificar(fila["clave"], fila["valor"])
+        return estados
+
+    def anotar(self, evaluacion_id, cambios):
+        """Agrega al diario las claves de sesión cambiadas; devuelve cuántas"""
+        momento = datetime.now().isoformat(timespec="seconds")
+        with self._conexion() as con:
+            con.executemany(
+                "INSERT INTO diario (evaluacion_id, clave, valor, momento) VALUES (?, ?, ?, ?)",
+                [(evaluacion_id, clave, _codificar(valor), momento) for clave, valor in cambios.items()],
+            )
+            # Lo autoguardado ya cuenta en la cohorte, sin esperar a la compactación
+            con.execute(f"UPDATE evaluaciones SET revision = {_SIGUIENTE_REVISION} WHERE id = ?", (evaluacion_id,))
+            self._resumir(con, [evaluacion_id])
+        return len(cambios)
+
+    def compactar(self):
+        """Incorpora el diario a evaluaciones/items y lo vacía; devuelve las entradas aplicadas"""
+        columnas_evaluacion = {clave: col for col, clave in CLAVES_EVALUACION.items()}
+        with self._conexion() as con:
+            filas = con.execute("SELECT seq, evaluacion_id, clave, valor, momento FROM diario ORDER BY seq").fetchall()
+            if not filas:
+                return 0
+            # Solo importa el último valor de cada clave
+            ultimos, momentos = {}, {}
+            for fila in filas:
+                ultimos.setdefault(fila["evaluacion_id"], {})[fila["clave"]] = json.loads(fila["valor"])
+                momentos[fila["evaluacion_id"]] = fila["momento"]
+            for evaluacion_id, cambios in ultimos.items():
+                datos = {"actualizado": momentos[evaluacion_id]}
+                items = {}
+                for clave, valor in cambios.items():
+                    destino = clave_item(clave)
+                    if destino:
+                        items.setdefault(destino[0], {})[destino[1]] = _valor_columna(destino[1], valor)
+                    elif clave in columnas_evaluacion:
+                        datos[columnas_evaluacion[clave]] = valor
+                asignaciones = ", ".join(f"{c} = :{c}" for c in datos)
+                con.execute(
+                    f"UPDATE evaluaciones SET {asignaciones}, revision = {_SIGUIENTE_REVISION} WHERE id = :id",
+                    dict(datos, id=evaluacion_id),
+                )
+                for item, valores in items.items():
+                    fila = dict(VALORES_ITEM, **valores)
+                    actualizar = ", ".join(f"{c} = excluded.{c}" for c in valores)
+                    con.execute(
+                        f"INSERT INTO items (evaluacion_id, item, {', '.join(fila)}) VALUES (?, ?, {', '.join('?' * len(fila))}) "
+                        f"ON CONFLICT (evaluacion_id, item) DO UPDATE SET {actualizar}",
+                        (evaluacion_id, item, *(_valor_columna(c, v) for c, v in fila.items())),
+                    )
+            con.execute("DELETE FROM diario WHERE seq <= ?", (filas[-1]["seq"],))
+            self._resumir(con, ultimos)
+        return len(filas)
+
+    # --- Resúmenes por evaluación (los consume cohorte.py) ---
+
+    def _resumir(self, con, evaluacion_ids):
+        """Recalcula en la transacción `con` el resumen de cada evaluación (ítems + diario)"""
+        columnas_evaluacion = {clave: col for col, clave in CLAVES_EVALUACION.items()}
+        resumenes = []
+        for evaluacion_id in evaluacion_ids:
+            evaluacion = dict(con.execute("SELECT * FROM evaluaciones WHERE id = ?", (evaluacion_id,)).fetchone())
+            items = {f["item"]: dict(f) for f in con.execute("SELECT * FROM items WHERE evaluacion_id = ?", (evaluacion_id,))}
+            for fila in con.execute("SELECT clave, valor FROM diario WHERE evaluacion_id = ? ORDER BY seq", (evaluacion_id,)):
+                valor = json.loads(fila["valor"])
+                destino = clave_item(fila["clave"])
+                if destino:
+                    item = items.setdefault(destino[0], dict(VALORES_ITEM, item=destino[0]))
+                    item[destino[1]] = _valor_columna(destino[1], valor)
+                elif fila["clave"] in columnas_evaluacion:
+                    evaluacion[columnas_evaluacion[fila["clave"]]] = valor
+            resumenes.append(resumir_evaluacion(evaluacion, [items[i] for i in sorted(items)]))
+        self._insertar_resumenes(con, resumenes)
+
+    def _insertar_resumenes(self, con, resumenes):
+        columnas = ("evaluacion_id",) + COLUMNAS_RESUMEN
+        con.executemany(
+            f"INSERT OR REPLACE INTO resumenes ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+            [tuple(r[c] for c in columnas) for r in resumenes],
+        )
+
+    def sin_resumen(self, limite=1000):
+        """Evaluaciones sin resumen o con resumen anterior a su última revisión, con sus ítems.
+
+        Las escrituras ya dejan su resumen al día: solo aparecen aquí las bases
+        escritas antes de eso o modificadas por fuera del almacén.
+        """
+        with self._conexion() as con:
+            evaluaciones = [dict(f) for f in con.execute(
+                "SELECT e.* FROM evaluaciones e LEFT JOIN resumenes r ON r.evaluacion_id = e.id "
+                "WHERE r.revision IS NULL OR r.revision < e.revision ORDER BY e.id LIMIT ?", (limite,)
+            )]
+            items = {}
+            for fila in con.execute(
+                f"SELECT * FROM items WHERE evaluacion_id IN ({', '.join('?' * len(evaluaciones))}) ORDER BY evaluacion_id, item",
+                [ev["id"] for ev in evaluaciones],
+            ):
+                items.setdefault(fila["evaluacion_id"], []).append(dict(fila))
+        return [(ev, items.get(ev["id"], [])) for ev in evaluaciones]
+
+    def guardar_resumenes(self, resumenes):
+        """Inserta o reemplaza resúmenes {evaluacion_id, revision, anos, ..., procesos}"""
+        with self._conexion() as con:
+            self._insertar_resumenes(con, resumenes)
+
+    def leer_resumenes(self, desde_revision=-1):
+        """Resúmenes (con paciente y modo) de revisión posterior a `desde_revision`.
+
+        Devuelve (nombres de columna, filas como tuplas); solo trae las columnas
+        que usan las agregaciones de cohorte.
+        """
+        with self._conexion() as con:
+            cur = con.cursor()
+            cur.row_factory = None  # tuplas simples: se cargan directo en columnas
+            cur.execute(
+                "SELECT r.evaluacion_id, r.revision, r.anos, r.e, r.a, r.s, r.procesos, "
+                "e.paciente, e.modo FROM resumenes r "
+                "JOIN evaluaciones e ON e.id = r.evaluacion_id WHERE r.revision > ? ORDER BY r.revision",
+                (desde_revision,),
+            )
+            columnas = [d[0] for d in cur.description]
+            return columnas, cur.fetchall()
+
+    def contar_resumenes(self):
+        with self._conexion() as con:
+            return con.execute("SELECT COUNT(*) FROM resumenes").fetchone()[0]
+
+    def eliminar(self, evaluacion_id):
+        with self._conexion() as con:
+            con.execute("DELETE FROM evaluaciones WHERE id = ?", (evaluacion_id,))
+
+    def importar_json(self, patron="sesion_*.json"):
+        """Migra los archivos de sesión JSON antiguos; los ya importados se omiten"""
+        with self._conexion() as con:
+            importados = {f["origen"] for f in con.execute("SELECT origen FROM evaluaciones WHERE origen IS NOT NULL")}
+        nuevos = 0
+        for archivo in sorted(glob.glob(patron)):
+            origen = os.path.abspath(archivo)
+            if origen in importados:
+                continue
+            with open(archivo, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            paciente = datos.get("_paciente") or os.path.basename(archivo)[len("sesion_"):-len(".json")].replace("_", " ")
+            self.guardar(datos, paciente=paciente, fecha_eval=datos.get("_timestamp"), origen=origen)
+            nuevos += 1
+        return nuevos
@@ -0,0 +1,82 @@
+"""Alineación meta ↔ producción: emparejamiento por rasgos y transposiciones (metátesis)."""
+
+import pytest
+
+from teprosif import alinear, analizar_procesos, texto_a_fonemas
+from teprosif.alineacion import COSTO_TRANSPOSICION, COSTOS_SUSTITUCION, _alinear
+
+
+def _columnas(alineacion):
+    """Columnas (fonema meta, fonema producido) con None donde hay omisión o inserción"""
+    return [(alineacion.meta[i] if i is not None else None, alineacion.prod[j] if j is not None else None)
+            for i, j in alineacion.pares]
+
+
+@pytest.mark.parametrize("meta, prod, esperadas", [
+    # La líquida se empareja con la líquida y se omite la oclusiva, no al revés
+    ("alfombra", "alfomRa", [("b", None), ("r", "R")]),
+    # El grupo /pl/ pierde la /p/: la /l/ pasa a /y/ (semiconsonantización)
+    ("planĉa", "yanĉa", [("p", None), ("l", "y")]),
+    # Posteriorización con una vocal agregada: /d/ → /g/ y la /u/ es una inserción
+    ("indio", "inguio", [("d", "g"), (None, "u")]),
+    ("tren", "ten", [("r", None)]),
+])
+def test_empareja_por_rasgos(meta, prod, esperadas):
+    distintas = [(m, p) for m, p in _columnas(alinear(meta, prod)) if m != p]
+    assert distintas == esperadas
+
+
+def test_opcodes_cubren_ambas_transcripciones():
+    alineacion = alinear("bisikleta", "bisiketa")
+    assert alineacion.opcodes[0][1] == alineacion.opcodes[0][3] == 0
+    for (_, _, i2, _, j2), (_, i1, _, j1, _) in zip(alineacion.opcodes, alineacion.opcodes[1:]):
+        assert (i2, j2) == (i1, j1)
+    assert alineacion.opcodes[-1][2:5:2] == (len("bisikleta"), len("bisiketa"))
+    assert alineacion.costo == 1.0
+
+
+def test_igual_no_tiene_costo():
+    alineacion = alinear("mariposa", "mariposa")
+    assert alineacion.costo == 0.0
+    assert alineacion.opcodes == (("equal", 0, 8, 0, 8),)
+    assert alineacion.transposiciones == ()
+
+
+@pytest.mark.parametrize("meta, prod, tramo", [
+    ("mariposa", "ramiposa", (0, 3, 0, 3)),
+    ("gitaRa", "tigaRa", (0, 3, 0, 3)),
+    ("arbol", "abrol", (1, 3, 1, 3)),
+    # Ejemplo de la guía: /l/ y /n/ separadas por tres fonemas
+    ("telefono", "tenefolo", (2, 7, 2, 7)),
+])
+def test_metatesis_es_una_transposicion(meta, prod, tramo):
+    alineacion = alinear(meta, prod)
+    assert alineacion.transposiciones == (tramo,)
+    assert alineacion.costo == COSTO_TRANSPOSICION
+    # Más barata que cualquier par de sustituciones
+    assert COSTO_TRANSPOSICION < 2 * min(COSTOS_SUSTITUCION.values())
+
+
+def test_transposicion_con_otro_proceso():
+    # /mariposa/ → /ramipota/: metátesis más oclusivización de la /s/
+    alineacion = alinear("mariposa", "ramipota")
+    assert alineacion.transposiciones == ((0, 3, 0, 3),)
+    assert ("s", "t") in _columnas(alineacion)
+
+
+@pytest.mark.parametrize("meta, prod, item, esperados", [
+    ("mariposa", "ramiposa", "3", {"E.8"}),
+    ("mariposa", "ramipota", "3", {"E.8", "S.5"}),
+    ("telefono", "tenefolo", "13", {"E.8"}),
+    ("jirafa", "jifara", "29", {"E.8"}),
+])
+def test_metatesis_no_suma_sustituciones(meta, prod, item, esperados):
+    sugeridos = set(analizar_procesos(texto_a_fonemas(meta), texto_a_fonemas(prod), item))
+    assert esperados <= sugeridos
+    # Los fonemas intercambiados no se leen como asimilaciones ni sustituciones
+    assert not {c for c in sugeridos if c[0] in "AS"} - esperados
+
+
+def test_memoizada():
+    assert alinear("kaperusita", "kapeusita") is alinear("kaperusita", "kapeusita")
+    assert _alinear("kaperusita", "kapeusita") == alinear("kaperusita", "kapeusita")
@@ -0,0 +1,51 @@
+"""Analizador de PSF: corpus de referencia, tabla de rasgos y entradas sin fonemas."""
+
+import pytest
+
+from benchmarks import corpus_dorado, fuzz_entradas, verificar_tabla_rasgos
+from teprosif import obtener_item, texto_a_fonemas
+from teprosif.analisis import AVISO_SIN_FONEMAS, Analisis, analizar_item
+from teprosif.lote import puntuar_fila
+
+
+def test_corpus_dorado_coincide_con_el_registro():
+    """Las sugerencias registradas en corpus_dorado.json siguen saliendo igual"""
+    casos = corpus_dorado.casos_definiciones() + corpus_dorado.casos_extra(corpus_dorado.PARES_DORADOS)
+    casos = [c for c in corpus_dorado.unir_casos(casos) if not c.error]
+    registro = corpus_dorado.leer_registro(corpus_dorado.REGISTRO)
+    assert {c.clave for c in casos} == set(registro["casos"])
+    sugerencias, _ = corpus_dorado.evaluar(casos, {"casos": {}}, None, procesos=1)
+    distintos = {clave: (registro["casos"][clave]["sugeridos"], sugeridos)
+                 for clave, sugeridos in sugerencias.items() if registro["casos"][clave]["sugeridos"] != sugeridos}
+    assert distintos == {}
+
+
+def test_pares_dorados_incluyen_metatesis():
+    casos = corpus_dorado.casos_extra(corpus_dorado.PARES_DORADOS)
+    assert sum("E.8" in c.esperados for c in casos) >= 5
+    assert all(not c.error for c in casos)
+
+
+def test_tabla_rasgos_coincide_con_la_funcion_original():
+    total, diferencias = verificar_tabla_rasgos.verificar(mostrar=0)
+    assert total > 400_000
+    assert diferencias == []
+
+
+@pytest.mark.parametrize("texto", ["123", "-", "??", "😀", "  "])
+def test_transcripcion_sin_fonemas_no_se_analiza(texto):
+    item = obtener_item("22")
+    pf = texto_a_fonemas(texto)
+    assert pf == ""
+    assert analizar_item(item.meta_fon, pf, item.num) == Analisis([], False, AVISO_SIN_FONEMAS)
+
+
+def test_transcripcion_sin_fonemas_no_suma_puntos():
+    res = puntuar_fila({"item": "22", "transcripcion": "123", "edad": 4})
+    assert (res["procesos"], res["total"]) == ("", 0)
+    assert AVISO_SIN_FONEMAS in res["error"]
+
+
+def test_entradas_al_azar_no_fallan():
+    _, fallos = fuzz_entradas.fuzz(500, semilla=0, colgado=30.0)
+    assert fallos == []
@@ -0,0 +1,20 @@
+"""Arranque en frío: el núcleo no carga dependencias pesadas y puntúa sin ellas."""
+
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import bench_arranque
+
+
+@pytest.mark.parametrize("modulo", bench_arranque.MODULOS)
+def test_importar_no_carga_dependencias_pesadas(modulo):
+    _, cargadas = bench_arranque.tiempo_importacion(modulo)
+    assert cargadas == []
+
+
+def test_puntuar_sin_site_packages():
+    proc = subprocess.run([sys.executable, "-S", "-c", bench_arranque._PUNTUAR_SIN_DEPENDENCIAS],
+                          cwd=bench_arranque.RAIZ, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,66 @@
+"""Hilo de autoguardado: diario por sesión, compactación y errores por sesión."""
+
+import sqlite3
+
+import pytest
+
+from teprosif.autoguardado import AutoGuardado
+from teprosif.sesiones import AlmacenSesiones
+
+
+class AlmacenQueFalla(AlmacenSesiones):
+    """Almacén cuyas próximas `fallos` anotaciones fallan como un bloqueo de SQLite"""
+
+    fallos = 0
+
+    def anotar(self, evaluacion_id, cambios):
+        if self.fallos:
+            self.fallos -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().anotar(evaluacion_id, cambios)
+
+
+@pytest.fixture
+def autoguardado(tmp_path):
+    guardado = AutoGuardado(AlmacenQueFalla(str(tmp_path / "sesiones.db")), espera=0.01)
+    yield guardado
+    guardado.cerrar()
+
+
+def test_primer_envio_crea_la_evaluacion_y_los_siguientes_van_al_diario(autoguardado):
+    autoguardado.registrar("s1", {"nombre_paciente_temp": "Ana", "in_1": "pancha"})
+    assert autoguardado.vaciar()
+    evaluacion_id = autoguardado.evaluacion("s1")
+    assert evaluacion_id is not None
+    autoguardado.registrar("s1", {"in_1": "pansa"})
+    autoguardado.registrar("s1", {"in_1": "plancha", "in_2": "ten"})
+    assert autoguardado.vaciar()
+    # vaciar también compacta: lo autoguardado queda en items
+    with sqlite3.connect(autoguardado.almacen.ruta) as con:
+        assert con.execute("SELECT COUNT(*) FROM diario").fetchone()[0] == 0
+    estados = autoguardado.almacen.cargar(evaluacion_id)
+    assert (estados["in_1"], estados["in_2"]) == ("plancha", "ten")
+    assert autoguardado.ultimo_guardado("s1") is not None
+
+
+def test_error_es_de_la_sesion_y_se_borra_con_el_siguiente_guardado(autoguardado):
+    for token, paciente in (("s1", "Ana"), ("s2", "Beto")):
+        autoguardado.registrar(token, {"nombre_paciente_temp": paciente})
+    assert autoguardado.vaciar()
+    autoguardado.almacen.fallos = 1
+    autoguardado.registrar("s1", {"in_1": "pancha"})
+    assert autoguardado.vaciar()
+    assert isinstance(autoguardado.error("s1"), sqlite3.OperationalError)
+    assert autoguardado.error("s2") is None
+    autoguardado.registrar("s1", {"in_1": "plancha"})
+    assert autoguardado.vaciar()
+    assert autoguardado.error("s1") is None
+    assert autoguardado.almacen.cargar(autoguardado.evaluacion("s1"))["in_1"] == "plancha"
+
+
+def test_olvidar_descarta_el_token(autoguardado):
+    autoguardado.registrar("s1", {"nombre_paciente_temp": "Ana"})
+    autoguardado.olvidar("s1")
+    assert autoguardado.vaciar()
+    assert autoguardado.evaluacion("s1") is None
+    assert [ev["paciente"] for ev in autoguardado.almacen.listar()] == ["Ana"]
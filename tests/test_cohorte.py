@@ -0,0 +1,47 @@
+"""Panel de cohorte: edades desconocidas y actualización incremental de los resúmenes."""
+
+from datetime import date
+
+import pytest
+
+from teprosif.cohorte import CacheCohorte
+from teprosif.sesiones import AlmacenSesiones
+
+pd = pytest.importorskip("pandas")
+
+
+def _guardar(almacen, paciente, fecha_nac, transcripcion="pancha"):
+    return almacen.guardar({"nombre_paciente_temp": paciente, "fecha_nac": fecha_nac, "fecha_eval": date(2024, 6, 1),
+                            "type_0": "Respuesta Válida", "ok_0": False, "in_0": transcripcion, "e_0": 1})
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    almacen = AlmacenSesiones(str(tmp_path / "sesiones.db"))
+    _guardar(almacen, "Ana", date(2020, 1, 1))
+    _guardar(almacen, "Beto", None)
+    _guardar(almacen, "Carla", date(2019, 1, 1))
+    return almacen
+
+
+def test_edad_desconocida_queda_fuera_de_las_bandas(almacen):
+    cohorte = CacheCohorte(almacen)
+    assert cohorte.actualizar() == 3
+    bandas = cohorte.evaluaciones.set_index("paciente")["banda"]
+    assert (bandas["Ana"], bandas["Carla"]) == (4, 5) and pd.isna(bandas["Beto"])
+    por_banda = cohorte.distribucion_diagnosticos(por="banda")
+    assert list(por_banda.index) == [4, 5]
+    assert por_banda.to_numpy().sum() == 2
+    totales = cohorte.distribucion_diagnosticos()
+    assert totales["Sin Datos"] == 1 and totales.sum() == 3
+
+
+def test_actualizar_solo_relee_lo_nuevo(almacen):
+    cohorte = CacheCohorte(almacen)
+    cohorte.actualizar()
+    assert cohorte.actualizar() == 0
+    beto = int(cohorte.evaluaciones.index[cohorte.evaluaciones["paciente"] == "Beto"][0])
+    almacen.anotar(beto, {"fecha_nac": date(2021, 1, 1)})
+    assert cohorte.actualizar() == 1
+    assert cohorte.evaluaciones.loc[beto, "banda"] == 3
+    assert cohorte.distribucion_diagnosticos()["Sin Datos"] == 0
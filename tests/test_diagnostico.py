@@ -0,0 +1,43 @@
+"""Diagnóstico por lotes contra el escalar, y edades desconocidas."""
+
+import math
+
+import pytest
+
+from benchmarks import bench_diagnostico
+from teprosif import diagnosticar_lote, obtener_diagnostico
+from teprosif.diagnostico import calcular_edad_exacta
+
+pd = pytest.importorskip("pandas")
+
+
+def test_lote_igual_al_escalar_en_toda_la_grilla():
+    errores, casos = bench_diagnostico.verificar()
+    assert casos == 121 * 11 * 3
+    assert errores == []
+
+
+def test_edad_desconocida_da_sin_datos():
+    assert obtener_diagnostico(10, None, "Completo") == ("Sin Datos", "gray", "", None, {})
+    lote = diagnosticar_lote([10, 10, 10], [float("nan"), None, 4], ["Completo", "Barrido", "Completo"])
+    assert list(lote["diagnostico"]) == ["Sin Datos", "Sin Datos", obtener_diagnostico(10, 4, "Completo")[0]]
+    assert list(lote["color"][:2]) == ["gray", "gray"]
+    assert math.isnan(lote["z"][0]) and math.isnan(lote["z"][1])
+    assert lote["z"][2] == obtener_diagnostico(10, 4, "Completo")[3]
+
+
+def test_lote_conserva_el_indice_de_la_serie():
+    totales = pd.Series([3, 40], index=["a", "b"])
+    lote = diagnosticar_lote(totales, [5, 5], "Barrido")
+    assert list(lote.index) == ["a", "b"]
+    assert list(lote["diagnostico"]) == [obtener_diagnostico(t, 5, "Barrido")[0] for t in (3, 40)]
+
+
+@pytest.mark.parametrize("nacimiento, evaluacion, esperada", [
+    ("2020-05-10", "2024-05-10", (4, 0)),
+    ("2020-05-10", "2024-05-09", (3, 11)),
+    ("2020-05-10", "2024-03-01", (3, 10)),
+])
+def test_edad_exacta(nacimiento, evaluacion, esperada):
+    from datetime import date
+    assert calcular_edad_exacta(date.fromisoformat(nacimiento), date.fromisoformat(evaluacion)) == esperada
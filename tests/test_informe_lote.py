@@ -0,0 +1,84 @@
+"""Informes por lotes: ZIP como punto de control y recuperación tras un corte."""
+
+import os
+import shutil
+import zipfile
+from datetime import date
+
+import pytest
+
+from teprosif import informe
+from teprosif.informe_lote import abrir_zip, generar_informes, nombre_entrada, recuperar_zip
+from teprosif.sesiones import AlmacenSesiones
+
+CONTENIDOS = {"1_Informe_Ana_2024-06-01.pdf": b"%PDF-uno" * 500, "2_Informe_Beto_2024-06-02.pdf": b"%PDF-dos" * 700}
+
+
+def _zip_cortado(ruta, contenidos, parcial=None):
+    """Copia del ZIP tal como está en disco antes de cerrarlo (sin directorio central)"""
+    copia = ruta + ".vivo"
+    zf = zipfile.ZipFile(copia, "w", compression=zipfile.ZIP_DEFLATED)
+    for nombre, datos in contenidos.items():
+        zf.writestr(nombre, datos)
+    zf.fp.flush()
+    shutil.copyfile(copia, ruta)
+    if parcial:
+        # Una entrada que quedó a medio escribir
+        zf.writestr("3_Informe_Carla_2024-06-03.pdf", parcial)
+        zf.fp.flush()
+        with open(copia, "rb") as f:
+            datos = f.read()
+        with open(ruta, "wb") as f:
+            f.write(datos[:os.path.getsize(ruta) + len(parcial) // 2])
+    zf.close()
+
+
+def test_recupera_las_entradas_completas(tmp_path):
+    ruta = str(tmp_path / "informes.zip")
+    _zip_cortado(ruta, CONTENIDOS, parcial=os.urandom(4000))
+    assert not zipfile.is_zipfile(ruta)
+    assert recuperar_zip(ruta) == 2
+    with zipfile.ZipFile(ruta) as zf:
+        assert zf.testzip() is None
+        assert {nombre: zf.read(nombre) for nombre in zf.namelist()} == CONTENIDOS
+
+
+def test_abrir_zip_recupera_y_devuelve_los_ids_hechos(tmp_path):
+    ruta = str(tmp_path / "informes.zip")
+    _zip_cortado(ruta, CONTENIDOS)
+    zf, hechos = abrir_zip(ruta)
+    zf.close()
+    assert hechos == {1, 2}
+    assert zipfile.is_zipfile(ruta)
+
+
+def test_zip_inexistente_empieza_vacio(tmp_path):
+    zf, hechos = abrir_zip(str(tmp_path / "nuevo.zip"))
+    zf.close()
+    assert hechos == set()
+
+
+def test_nombre_entrada_sin_caracteres_raros():
+    assert nombre_entrada({"id": 7, "paciente": "José / Pérez", "fecha_eval": "2024-06-01"}) == \
+        "7_Informe_José_Pérez_2024-06-01.pdf"
+
+
+@pytest.mark.skipif(not informe.fpdf_available, reason="requiere fpdf")
+def test_generar_informes_completa_un_zip_cortado(tmp_path):
+    ruta_db, salida = str(tmp_path / "sesiones.db"), str(tmp_path / "informes.zip")
+    almacen = AlmacenSesiones(ruta_db)
+    for paciente in ("Ana", "Beto", "Carla"):
+        almacen.guardar({"nombre_paciente_temp": paciente, "fecha_nac": date(2020, 1, 1), "fecha_eval": date(2024, 6, 1),
+                         "type_0": "Respuesta Válida", "ok_0": False, "in_0": "pancha", "e_0": 1})
+    generados, omitidos, errores, _ = generar_informes(salida, ruta_db, procesos=1)
+    assert (generados, omitidos, errores) == (3, 0, [])
+
+    # Se corta el ZIP después del segundo informe y se vuelve a correr
+    with zipfile.ZipFile(salida) as zf:
+        contenidos = {nombre: zf.read(nombre) for nombre in zf.namelist()[:2]}
+    assert all(datos.startswith(b"%PDF") for datos in contenidos.values())
+    _zip_cortado(salida, contenidos)
+    generados, omitidos, errores, _ = generar_informes(salida, ruta_db, procesos=1)
+    assert (generados, omitidos, errores) == (1, 2, [])
+    with zipfile.ZipFile(salida) as zf:
+        assert sorted(int(nombre.split("_")[0]) for nombre in zf.namelist()) == [1, 2, 3]
@@ -0,0 +1,74 @@
+"""Puntuación por lotes: edades por fila, diagnóstico por evaluación y archivos CSV/JSONL."""
+
+import csv
+import json
+
+import pytest
+
+from teprosif import obtener_diagnostico
+from teprosif.lote import acumular, diagnosticos, leer_edad, puntuar_archivo, puntuar_fila
+
+
+@pytest.mark.parametrize("valor, edad", [
+    (4, 4), (4.9, 4), ("5", 5), (" 6 ", 6), (0, 0), (120, 120),
+    (-1, None), (121, None), ("cuatro", None), ("", None), (None, None), (True, None), (float("nan"), None), ([4], None),
+])
+def test_leer_edad(valor, edad):
+    assert leer_edad(valor) == edad
+
+
+def test_edad_faltante_o_invalida_queda_en_error():
+    assert puntuar_fila({"item": "22", "transcripcion": "ten"})["error"] == "Falta la edad"
+    assert puntuar_fila({"item": "22", "transcripcion": "ten"}, con_edad=False)["error"] == ""
+    assert puntuar_fila({"item": "22", "transcripcion": "ten", "edad": "x"})["error"].startswith("Edad inválida")
+    assert puntuar_fila({"item": "22", "transcripcion": "ten", "edad": "x"}, con_edad=False)["error"].startswith("Edad inválida")
+    # La fila se puntúa igual: el error solo avisa
+    assert puntuar_fila({"item": "22", "transcripcion": "ten", "edad": "x"})["total"] > 0
+
+
+def test_item_desconocido():
+    res = puntuar_fila({"item": "99", "transcripcion": "ten", "edad": 4})
+    assert res["error"] == "Ítem desconocido: '99'" and res["total"] == 0
+
+
+def test_diagnostico_usa_la_primera_edad_valida():
+    evaluaciones = {}
+    for edad in ("", "x", 5, 3):
+        acumular(evaluaciones, puntuar_fila({"paciente": "P1", "edad": edad, "item": "22", "transcripcion": "ten"}))
+    (fila,) = diagnosticos(evaluaciones)
+    assert fila["edad"] == 5 and fila["items"] == 4
+    assert fila["diagnostico"] == obtener_diagnostico(fila["total"], 5, "Completo")[0]
+
+
+def test_sin_edad_valida_el_diagnostico_es_sin_datos():
+    evaluaciones = {}
+    for edad in ("", "x"):
+        acumular(evaluaciones, puntuar_fila({"paciente": "P1", "edad": edad, "item": "22", "transcripcion": "ten"}))
+    (fila,) = diagnosticos(evaluaciones)
+    assert (fila["edad"], fila["diagnostico"], fila["z"]) == ("", "Sin Datos", "")
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+def test_puntuar_archivo(tmp_path, extension):
+    filas = [{"paciente": "P1", "edad": "4", "modo": "Completo", "item": str(k), "transcripcion": t}
+             for k, t in (("1", "pancha"), ("3", "ramiposa"), ("22", "ten"))]
+    entrada, salida = str(tmp_path / f"entrada{extension}"), str(tmp_path / f"salida{extension}")
+    with open(entrada, "w", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            escritor = csv.DictWriter(f, fieldnames=list(filas[0]))
+            escritor.writeheader()
+            escritor.writerows(filas)
+        else:
+            f.writelines(json.dumps(fila) + "\n" for fila in filas)
+    assert puntuar_archivo(entrada, salida, procesos=1)[0] == 3
+
+    def leer(ruta):
+        with open(ruta, encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f)) if extension == ".csv" else [json.loads(linea) for linea in f]
+
+    esperadas = [puntuar_fila(fila) for fila in filas]
+    if extension == ".csv":
+        esperadas = [{k: str(v) for k, v in fila.items()} for fila in esperadas]
+    assert leer(salida) == esperadas
+    (diagnostico,) = leer(str(tmp_path / f"salida_diagnosticos{extension}"))
+    assert diagnostico["paciente"] == "P1" and str(diagnostico["items"]) == "3"
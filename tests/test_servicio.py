@@ -0,0 +1,95 @@
+"""Servicio ASGI: validación de peticiones (400/404/405/413) y respuestas de /item y /lote."""
+
+import asyncio
+import json
+
+import pytest
+
+from teprosif import servicio
+
+
+def _pedir(metodo, ruta, cuerpo=b""):
+    """(estado, JSON) de una petición a la aplicación ASGI, sin servidor"""
+    if not isinstance(cuerpo, bytes):
+        cuerpo = json.dumps(cuerpo).encode("utf-8")
+    enviados = []
+
+    async def receive():
+        return {"type": "http.request", "body": cuerpo, "more_body": False}
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    asyncio.run(servicio.app({"type": "http", "method": metodo, "path": ruta}, receive, send))
+    return enviados[0]["status"], json.loads(enviados[1]["body"])
+
+
+def _fila(**campos):
+    return dict({"paciente": "P1", "edad": 4, "modo": "Completo", "item": "22", "transcripcion": "ten"}, **campos)
+
+
+@pytest.mark.parametrize("ruta, cuerpo", [
+    ("/item", b"{no es json"),
+    ("/item", b"\xff\xfe"),
+    ("/item", [1, 2]),
+    ("/item", {"item": "22", "transcripcion": 5}),
+    ("/item", {"item": ["22"], "transcripcion": "ten"}),
+    ("/item", {"item": "22", "transcripcion": "ten", "modo": "Rapido"}),
+    ("/item", {"item": "22", "transcripcion": "ten", "edad": "cuatro"}),
+    ("/item", {"item": "22", "transcripcion": "ten", "edad": True}),
+    ("/item", {"item": "22", "transcripcion": "ten", "edad": -1}),
+    ("/lote", {"filas": "no es una lista"}),
+    ("/lote", {"filas": [_fila(), _fila(edad=None)]}),
+    ("/lote", {"filas": [_fila(edad="")]}),
+    ("/lote", {"filas": [_fila(edad=200)]}),
+    ("/lote", {"filas": [_fila(paciente={"id": 1})]}),
+])
+def test_peticion_invalida_da_400(ruta, cuerpo):
+    estado, datos = _pedir("POST", ruta, cuerpo)
+    assert estado == 400
+    assert datos["error"]
+
+
+def test_error_indica_la_fila():
+    _, datos = _pedir("POST", "/lote", {"filas": [_fila(), _fila(edad="x")]})
+    assert "(fila 1)" in datos["error"]
+
+
+def test_demasiadas_filas_da_413():
+    estado, _ = _pedir("POST", "/lote", {"filas": [_fila()] * (servicio.MAX_FILAS + 1)})
+    assert estado == 413
+
+
+def test_cuerpo_demasiado_grande_da_413():
+    estado, _ = _pedir("POST", "/item", b" " * (servicio.MAX_CUERPO + 1))
+    assert estado == 413
+
+
+def test_ruta_y_metodo_desconocidos():
+    assert _pedir("GET", "/nada")[0] == 404
+    assert _pedir("GET", "/item")[0] == 405
+
+
+def test_item_puntuado():
+    estado, datos = _pedir("POST", "/item", {"item": "22", "transcripcion": "ten"})
+    assert estado == 200
+    assert "E.1" in datos["procesos"]
+    assert datos["total"] == datos["e"] + datos["a"] + datos["s"] == len(datos["procesos"])
+    # Sin edad /item puntúa igual: la edad solo hace falta para diagnosticar
+    assert datos["error"] == ""
+
+
+def test_lote_diagnostica_por_evaluacion():
+    filas = [_fila(), _fila(item="3", transcripcion="ramiposa"), _fila(paciente="P2", edad="5", modo="Barrido")]
+    estado, datos = _pedir("POST", "/lote", {"filas": filas})
+    assert estado == 200
+    assert len(datos["items"]) == 3
+    diagnosticos = {d["paciente"]: d for d in datos["diagnosticos"]}
+    assert diagnosticos["P1"]["items"] == 2 and diagnosticos["P1"]["diagnostico"] != "Sin Datos"
+    assert diagnosticos["P2"]["modo"] == "Barrido"
+
+
+def test_salud_y_listo():
+    assert _pedir("GET", "/salud")[0] == 200
+    servicio.calentar()
+    assert _pedir("GET", "/listo") == (200, {"estado": "listo"})
@@ -0,0 +1,152 @@
+"""Almacén SQLite: ida y vuelta, diario, compactación, resúmenes y migraciones."""
+
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from teprosif.cohorte import EDAD_DESCONOCIDA
+from teprosif.sesiones import AlmacenSesiones
+
+
+def _estados(paciente="Ana", **extra):
+    estados = {
+        "nombre_paciente_temp": paciente, "fecha_nac": date(2020, 3, 1), "fecha_eval": date(2024, 6, 1),
+        "sexo": "F", "modo": "Completo", "observaciones": "",
+        "type_1": "Respuesta Válida", "ok_1": False, "in_1": "pancha", "e_1": 1, "a_1": 0, "s_1": 0,
+        "type_2": "Respuesta Válida", "ok_2": True, "in_2": "", "e_2": 0, "a_2": 0, "s_2": 0,
+    }
+    estados.update(extra)
+    return estados
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenSesiones(str(tmp_path / "sesiones.db"))
+
+
+def _resumen(almacen, evaluacion_id):
+    columnas, filas = almacen.leer_resumenes()
+    return next(dict(zip(columnas, f)) for f in filas if f[0] == evaluacion_id)
+
+
+def test_guardar_y_cargar(almacen):
+    estados = _estados()
+    evaluacion_id = almacen.guardar(estados)
+    assert almacen.cargar(evaluacion_id) == estados
+    assert [ev["paciente"] for ev in almacen.listar()] == ["Ana"]
+
+
+def test_pacientes_con_el_mismo_nombre_no_se_pisan(almacen):
+    primero = almacen.guardar(_estados(in_1="pancha"))
+    segundo = almacen.guardar(_estados(in_1="plancha"))
+    assert primero != segundo
+    assert almacen.cargar(primero)["in_1"] == "pancha"
+    assert almacen.cargar(segundo)["in_1"] == "plancha"
+
+
+def test_guardar_sin_paciente_falla(almacen):
+    with pytest.raises(ValueError):
+        almacen.guardar(_estados(paciente=""))
+
+
+def test_reemplazar_evaluacion_inexistente_falla(almacen):
+    with pytest.raises(KeyError):
+        almacen.guardar(_estados(), evaluacion_id=99)
+
+
+def test_diario_se_ve_al_cargar_y_en_el_resumen(almacen):
+    evaluacion_id = almacen.guardar(_estados())
+    revision = _resumen(almacen, evaluacion_id)["revision"]
+    cambios = {"ok_2": False, "in_2": "ten", "e_2": 2, "fecha_eval": date(2024, 7, 1)}
+    assert almacen.anotar(evaluacion_id, cambios) == 4
+    cargado = almacen.cargar(evaluacion_id)
+    assert {clave: cargado[clave] for clave in cambios} == cambios
+    resumen = _resumen(almacen, evaluacion_id)
+    assert resumen["revision"] > revision
+    # El ítem 2 ya no está marcado como correcto: sus puntos se suman
+    assert resumen["e"] == 3
+
+
+def test_compactar_vacia_el_diario_sin_cambiar_lo_cargado(almacen):
+    evaluacion_id = almacen.guardar(_estados())
+    almacen.anotar(evaluacion_id, {"in_2": "te", "e_2": 1})
+    almacen.anotar(evaluacion_id, {"in_2": "ten", "e_2": 2, "in_3": "bufanda"})
+    antes = almacen.cargar(evaluacion_id)
+    assert almacen.compactar() == 5
+    assert almacen.compactar() == 0
+    despues = almacen.cargar(evaluacion_id)
+    # El ítem 3 nuevo se completa con los valores por defecto de sus otras columnas
+    assert {clave: despues[clave] for clave in antes} == antes
+    assert (despues["in_2"], despues["e_2"], despues["in_3"], despues["ok_3"]) == ("ten", 2, "bufanda", False)
+    with sqlite3.connect(almacen.ruta) as con:
+        assert con.execute("SELECT COUNT(*) FROM diario").fetchone()[0] == 0
+        assert con.execute("SELECT transcripcion, e FROM items WHERE evaluacion_id = ? AND item = 2",
+                           (evaluacion_id,)).fetchone() == ("ten", 2)
+    assert almacen.sin_resumen() == []
+
+
+def test_guardar_reemplaza_el_diario_pendiente(almacen):
+    evaluacion_id = almacen.guardar(_estados())
+    almacen.anotar(evaluacion_id, {"in_1": "pansa"})
+    almacen.guardar(_estados(in_1="plancha"), evaluacion_id=evaluacion_id)
+    assert almacen.cargar(evaluacion_id)["in_1"] == "plancha"
+    assert almacen.compactar() == 0
+
+
+def test_edad_desconocida_no_es_cero(almacen):
+    evaluacion_id = almacen.guardar(_estados(fecha_nac=None))
+    assert _resumen(almacen, evaluacion_id)["anos"] == EDAD_DESCONOCIDA
+    with sqlite3.connect(almacen.ruta) as con:
+        assert con.execute("SELECT diagnostico FROM resumenes").fetchone() == ("Sin Datos",)
+
+
+def test_migra_base_sin_revision(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    with sqlite3.connect(ruta) as con:
+        con.execute("CREATE TABLE evaluaciones (id INTEGER PRIMARY KEY, paciente TEXT NOT NULL, fecha_nac TEXT, "
+                    "fecha_eval TEXT NOT NULL, sexo TEXT, modo TEXT NOT NULL DEFAULT 'Completo', "
+                    "observaciones TEXT NOT NULL DEFAULT '', actualizado TEXT NOT NULL, origen TEXT UNIQUE)")
+        con.execute("INSERT INTO evaluaciones (paciente, fecha_eval, actualizado) VALUES ('Ana', '2024-06-01', '2024-06-01')")
+    almacen = AlmacenSesiones(ruta)
+    with sqlite3.connect(ruta) as con:
+        assert "revision" in {f[1] for f in con.execute("PRAGMA table_info(evaluaciones)")}
+    pendientes = almacen.sin_resumen()
+    assert [ev["paciente"] for ev, _ in pendientes] == ["Ana"]
+    evaluacion_id = almacen.guardar(_estados())
+    assert almacen.cargar(evaluacion_id)["nombre_paciente_temp"] == "Ana"
+
+
+def test_migracion_borra_resumenes_con_edad_cero(tmp_path):
+    ruta = str(tmp_path / "sesiones.db")
+    almacen = AlmacenSesiones(ruta)
+    sin_fecha = almacen.guardar(_estados(fecha_nac=None))
+    con_fecha = almacen.guardar(_estados(paciente="Beto"))
+    # Así quedaban antes las evaluaciones sin fecha de nacimiento
+    with sqlite3.connect(ruta) as con:
+        con.execute("UPDATE resumenes SET anos = 0 WHERE evaluacion_id = ?", (sin_fecha,))
+    almacen = AlmacenSesiones(ruta)
+    assert [ev["id"] for ev, _ in almacen.sin_resumen()] == [sin_fecha]
+    assert _resumen(almacen, con_fecha)["anos"] == 4
+
+
+def test_importar_json_una_sola_vez(tmp_path, almacen):
+    archivo = tmp_path / "sesion_Juan_Perez.json"
+    archivo.write_text(json.dumps({"in_1": "pancha", "ok_1": False, "e_1": 1, "_timestamp": "2023-01-02"}), encoding="utf-8")
+    patron = str(tmp_path / "sesion_*.json")
+    assert almacen.importar_json(patron) == 1
+    assert almacen.importar_json(patron) == 0
+    (evaluacion,) = almacen.listar()
+    assert (evaluacion["paciente"], evaluacion["fecha_eval"]) == ("Juan Perez", "2023-01-02")
+    assert almacen.cargar(evaluacion["id"])["in_1"] == "pancha"
+
+
+def test_eliminar_borra_items_y_resumen(almacen):
+    evaluacion_id = almacen.guardar(_estados())
+    almacen.anotar(evaluacion_id, {"in_2": "ten"})
+    almacen.eliminar(evaluacion_id)
+    assert almacen.listar() == []
+    assert almacen.contar_resumenes() == 0
+    with pytest.raises(KeyError):
+        almacen.cargar(evaluacion_id)